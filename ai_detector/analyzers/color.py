@@ -1,27 +1,24 @@
 """Renk ve ışık tutarlılığı analizi"""
 
 import numpy as np
-import cv2
-from typing import Dict
+from typing import Dict, Union
+from ..context import AnalysisContext
 from ..decision.thresholds import ANALYSIS_THRESHOLDS
+from ..results import ColorResult
 
 
 class ColorAnalyzer:
     """RGB channel ve renk tutarlılığı analizi"""
     
-    def analyze_rgb_correlation(self, image: np.ndarray) -> Dict:
+    requires = ('working',)  # Piramit seviyesi yeterli - renk istatistikleri ölçekten bağımsız
+    
+    def analyze_rgb_correlation(self, ctx: AnalysisContext) -> Dict:
         """RGB channel korelasyon analizi"""
-        r, g, b = cv2.split(image)
-        
-        # Flatten
-        r_flat = r.flatten()
-        g_flat = g.flatten()
-        b_flat = b.flatten()
-        
-        # Korelasyonlar
-        r_g_corr = np.corrcoef(r_flat, g_flat)[0, 1]
-        r_b_corr = np.corrcoef(r_flat, b_flat)[0, 1]
-        g_b_corr = np.corrcoef(g_flat, b_flat)[0, 1]
+        # Korelasyonlar (tek geçişte hesaplanan 3x3 kovaryanstan)
+        corr = ctx.working.image_stats.correlation()
+        r_g_corr = corr[0, 1]
+        r_b_corr = corr[0, 2]
+        g_b_corr = corr[1, 2]
         
         avg_corr = (r_g_corr + r_b_corr + g_b_corr) / 3
         
@@ -38,15 +35,11 @@ class ColorAnalyzer:
             'confidence': 0.6 if is_high else 0.0
         }
     
-    def analyze_color_cast(self, image: np.ndarray) -> Dict:
+    def analyze_color_cast(self, ctx: AnalysisContext) -> Dict:
         """Renk cast ve histogram uniformity"""
-        r, g, b = cv2.split(image)
+        r_hist, g_hist, b_hist = ctx.working.image_stats.channel_hist
         
         # Her channel için histogram mode
-        r_hist, _ = np.histogram(r, bins=256, range=(0, 256))
-        g_hist, _ = np.histogram(g, bins=256, range=(0, 256))
-        b_hist, _ = np.histogram(b, bins=256, range=(0, 256))
-        
         r_mode = np.argmax(r_hist)
         g_mode = np.argmax(g_hist)
         b_mode = np.argmax(b_hist)
@@ -63,15 +56,10 @@ class ColorAnalyzer:
             'confidence': 0.4 if is_uniform else 0.0
         }
     
-    def analyze_saturation(self, image: np.ndarray) -> Dict:
+    def analyze_saturation(self, ctx: AnalysisContext) -> Dict:
         """Saturation analizi"""
-        # RGB to HSV
-        hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
-        saturation = hsv[:, :, 1]
-        
-        # Saturation statistics
-        mean_sat = np.mean(saturation)
-        std_sat = np.std(saturation)
+        # Saturation statistics (S kanalı histogramından)
+        mean_sat, std_sat = ctx.working.image_stats.saturation_mean_std()
         
         # AI images: bazen aşırı yüksek veya düşük saturation
         is_extreme = mean_sat > 200 or mean_sat < 30
@@ -83,17 +71,18 @@ class ColorAnalyzer:
             'confidence': 0.3 if is_extreme else 0.0
         }
     
-    def analyze(self, image: np.ndarray) -> Dict:
+    def analyze(self, image: Union[np.ndarray, AnalysisContext]) -> ColorResult:
         """Tüm renk analizlerini çalıştır"""
-        rgb_result = self.analyze_rgb_correlation(image)
-        cast_result = self.analyze_color_cast(image)
-        sat_result = self.analyze_saturation(image)
+        ctx = AnalysisContext.wrap(image)
+        rgb_result = self.analyze_rgb_correlation(ctx)
+        cast_result = self.analyze_color_cast(ctx)
+        sat_result = self.analyze_saturation(ctx)
         
-        return {
-            'rgb_correlation_high': rgb_result['is_high'],
-            'details': {
+        return ColorResult(
+            rgb_correlation_high=bool(rgb_result['is_high']),
+            details={
                 'rgb_correlation': rgb_result,
                 'color_cast': cast_result,
                 'saturation': sat_result
             }
-        }
+        )
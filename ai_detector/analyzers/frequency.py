@@ -1,27 +1,66 @@
 """Frekans domain analizi (DCT/FFT)"""
 
+import math
 import numpy as np
 import cv2
-from typing import Dict
-from ..utils.image_utils import compute_dct, compute_fft, to_grayscale, compute_autocorrelation_2d
+from typing import Dict, Tuple, Union
+from ..config import GAN_GRID_PERIODS
+from ..context import AnalysisContext
 from ..decision.thresholds import ANALYSIS_THRESHOLDS
+from ..results import FrequencyResult
+
+
+_SMOOTH_KERNEL = np.array([1, 2, 1], dtype=np.float32)
+_IDENTITY_KERNEL = np.array([1], dtype=np.float32)
+
+
+def _line_gradient_energy(gray: np.ndarray, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her step'inci satır/sütunda ortalama |Sobel| gradyanı (y = step, 2*step, ...)
+    
+    Sobel(ksize=3) merkezi fark ile dik yönde [1, 2, 1] yumuşatmadır; yalnızca
+    gereken satır/sütunların komşuları okunur (BORDER_REFLECT_101 kenarıyla).
+    Döner: (satır enerjileri - grad_y, sütun enerjileri - grad_x)
+    """
+    def line_energy(lines: np.ndarray, length: int, axis: int) -> np.ndarray:
+        idx = np.arange(step, length, step)
+        if idx.size == 0:
+            return np.zeros(0)
+        after = np.where(idx + 1 < length, idx + 1, idx - 1)
+        
+        diff = (np.take(lines, after, axis=axis).astype(np.float32) -
+                np.take(lines, idx - 1, axis=axis))
+        if axis == 0:
+            grad = cv2.sepFilter2D(diff, -1, _SMOOTH_KERNEL, _IDENTITY_KERNEL,
+                                   borderType=cv2.BORDER_REFLECT_101)
+        else:
+            grad = cv2.sepFilter2D(diff, -1, _IDENTITY_KERNEL, _SMOOTH_KERNEL,
+                                   borderType=cv2.BORDER_REFLECT_101)
+        return np.abs(grad).mean(axis=1 - axis, dtype=np.float64)
+    
+    h, w = gray.shape
+    return line_energy(gray, h, 0), line_energy(gray, w, 1)
 
 
 class FrequencyAnalyzer:
     """DCT/FFT spektrum ve artefact analizi"""
     
-    def analyze_dct_ratio(self, image: np.ndarray) -> Dict:
+    requires = ('tiles',)  # Grid ve spektrum artefact'ları tam çözünürlükte aranır
+    
+    def analyze_dct_ratio(self, ctx: AnalysisContext) -> Dict:
         """DCT frekans oranı analizi"""
-        dct = compute_dct(image)
-        h, w = dct.shape
-        
-        # Yüksek frekans (sağ-alt köşe)
-        high_freq = dct[h//2:, w//2:]
-        high_freq_energy = np.sum(np.abs(high_freq))
+        high_freq_energy = 0
+        low_freq_energy = 0
         
-        # Düşük frekans (sol-üst köşe)
-        low_freq = dct[:h//4, :w//4]
-        low_freq_energy = np.sum(np.abs(low_freq))
+        for tile in ctx.tiles:
+            dct = tile.dct
+            h, w = dct.shape
+            
+            # Yüksek frekans (sağ-alt köşe)
+            high_freq_energy += np.sum(np.abs(dct[h//2:, w//2:]))
+            
+            # Düşük frekans (sol-üst köşe)
+            low_freq_energy += np.sum(np.abs(dct[:h//4, :w//4]))
         
         # Oran hesapla
         ratio = high_freq_energy / (low_freq_energy + 1e-10)
@@ -36,42 +75,47 @@ class FrequencyAnalyzer:
             'confidence': 0.8 if is_ai else 0.0
         }
     
-    def detect_checkerboard_pattern(self, image: np.ndarray) -> Dict:
+    def detect_checkerboard_pattern(self, ctx: AnalysisContext) -> Dict:
         """Diffusion model checkerboard artifact tespiti"""
-        # 2D autocorrelation ile periyodik pattern ara
-        autocorr = compute_autocorrelation_2d(image)
+        # 2D autocorrelation ile periyodik pattern ara (karo başına, sonra ortalama)
+        tile_peaks = []
         
-        h, w = autocorr.shape
-        center = (h // 2, w // 2)
-        
-        # 8x8 ve 16x16 grid'de peak ara
-        peaks_8 = []
-        peaks_16 = []
-        
-        # 8-pixel offset'lerde peak kontrol
-        for offset in [8, 16]:
-            positions = [
-                (center[0] + offset, center[1]),
-                (center[0] - offset, center[1]),
-                (center[0], center[1] + offset),
-                (center[0], center[1] - offset),
-            ]
+        for tile in ctx.tiles:
+            autocorr = tile.autocorrelation
+            
+            h, w = autocorr.shape
+            center = (h // 2, w // 2)
             
-            peak_values = []
-            for pos in positions:
-                if 0 <= pos[0] < h and 0 <= pos[1] < w:
-                    peak_values.append(autocorr[pos[0], pos[1]])
+            # 8x8 ve 16x16 grid'de peak ara
+            peaks_8 = []
+            peaks_16 = []
             
-            avg_peak = np.mean(peak_values) if peak_values else 0
+            # 8-pixel offset'lerde peak kontrol
+            for offset in [8, 16]:
+                positions = [
+                    (center[0] + offset, center[1]),
+                    (center[0] - offset, center[1]),
+                    (center[0], center[1] + offset),
+                    (center[0], center[1] - offset),
+                ]
+                
+                peak_values = []
+                for pos in positions:
+                    if 0 <= pos[0] < h and 0 <= pos[1] < w:
+                        peak_values.append(autocorr[pos[0], pos[1]])
+                
+                avg_peak = np.mean(peak_values) if peak_values else 0
+                
+                if offset == 8:
+                    peaks_8.append(avg_peak)
+                else:
+                    peaks_16.append(avg_peak)
             
-            if offset == 8:
-                peaks_8.append(avg_peak)
-            else:
-                peaks_16.append(avg_peak)
+            max_peak_8 = max(peaks_8) if peaks_8 else 0
+            max_peak_16 = max(peaks_16) if peaks_16 else 0
+            tile_peaks.append(max(max_peak_8, max_peak_16))
         
-        max_peak_8 = max(peaks_8) if peaks_8 else 0
-        max_peak_16 = max(peaks_16) if peaks_16 else 0
-        max_peak = max(max_peak_8, max_peak_16)
+        max_peak = np.mean(tile_peaks)
         
         # Threshold - daha yüksek, sadece çok belirgin pattern'ler
         detected = max_peak > ANALYSIS_THRESHOLDS['checkerboard_threshold']
@@ -82,37 +126,26 @@ class FrequencyAnalyzer:
             'confidence': min(float(max_peak) * 2, 1.0) if detected else 0.0
         }
     
-    def detect_gan_grid_artifacts(self, image: np.ndarray) -> Dict:
-        """GAN grid artifacts (8x8, 16x16 block boundaries)"""
-        gray = to_grayscale(image)
-        
-        # Horizontal ve vertical gradients
-        grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        
-        # Her 8 ve 16 pixel'de gradient topla
-        h, w = gray.shape
-        
-        grid_scores = []
-        for grid_size in [8, 16]:
-            # Horizontal lines
-            h_scores = []
-            for y in range(grid_size, h, grid_size):
-                if y < h:
-                    line_strength = np.mean(np.abs(grad_y[y, :]))
-                    h_scores.append(line_strength)
-            
-            # Vertical lines
-            v_scores = []
-            for x in range(grid_size, w, grid_size):
-                if x < w:
-                    line_strength = np.mean(np.abs(grad_x[:, x]))
-                    v_scores.append(line_strength)
+    def detect_gan_grid_artifacts(self, ctx: AnalysisContext) -> Dict:
+        """GAN grid artifacts (GAN_GRID_PERIODS block boundaries, varsayılan 8x8, 16x16)"""
+        # Grid satırları (y = k*period) ve arası satırlar (y = k*period + period/2)
+        # aynı adımın katlarıdır - yalnızca o satır/sütunların gradyanı hesaplanır
+        step = math.gcd(*GAN_GRID_PERIODS, *(period // 2 for period in GAN_GRID_PERIODS))
+        energies = [line for tile in ctx.tiles for line in _line_gradient_energy(tile.gray, step)]
+        
+        grid_scores = {}
+        contrasts = {}
+        for period in GAN_GRID_PERIODS:
+            # energies[i] -> konum (i + 1) * step
+            stride = period // step
+            on_grid = np.concatenate([line[stride - 1::stride] for line in energies])
+            off_grid = np.concatenate([line[period // 2 // step - 1::stride] for line in energies])
             
-            avg_score = np.mean(h_scores + v_scores) if (h_scores or v_scores) else 0
-            grid_scores.append(avg_score)
+            grid_scores[period] = on_grid.mean() if on_grid.size else 0
+            contrasts[period] = grid_scores[period] / (off_grid.mean() + 1e-10) if off_grid.size else 0
         
-        max_grid_score = max(grid_scores) if grid_scores else 0
+        best_period = max(grid_scores, key=grid_scores.get)
+        max_grid_score = grid_scores[best_period]
         
         # Normalize ve threshold
         detected = max_grid_score > 15.0  # Empirical threshold
@@ -120,22 +153,25 @@ class FrequencyAnalyzer:
         return {
             'detected': detected,
             'grid_strength': float(max_grid_score),
+            'period': best_period,
+            'grid_contrast': float(contrasts[best_period]),
             'confidence': min(max_grid_score / 30.0, 1.0) if detected else 0.0
         }
     
-    def analyze(self, image: np.ndarray) -> Dict:
+    def analyze(self, image: Union[np.ndarray, AnalysisContext]) -> FrequencyResult:
         """Tüm frekans analizlerini çalıştır"""
-        dct_result = self.analyze_dct_ratio(image)
-        checkerboard_result = self.detect_checkerboard_pattern(image)
-        gan_result = self.detect_gan_grid_artifacts(image)
-        
-        return {
-            'freq_ratio_anomaly': dct_result['is_anomaly'],
-            'checkerboard_pattern': checkerboard_result['detected'],
-            'gan_grid_artifacts': gan_result['detected'],
-            'details': {
+        ctx = AnalysisContext.wrap(image)
+        dct_result = self.analyze_dct_ratio(ctx)
+        checkerboard_result = self.detect_checkerboard_pattern(ctx)
+        gan_result = self.detect_gan_grid_artifacts(ctx)
+        
+        return FrequencyResult(
+            freq_ratio_anomaly=bool(dct_result['is_anomaly']),
+            checkerboard_pattern=bool(checkerboard_result['detected']),
+            gan_grid_artifacts=bool(gan_result['detected']),
+            details={
                 'dct_ratio': dct_result,
                 'checkerboard': checkerboard_result,
                 'gan_grid': gan_result
             }
-        }
+        )
@@ -2,17 +2,40 @@
 
 import numpy as np
 import cv2
-from typing import Dict
-from ..utils.image_utils import detect_edges, to_grayscale
+from typing import Dict, Tuple, Union
+from ..context import AnalysisContext
 from ..decision.thresholds import ANALYSIS_THRESHOLDS
+from ..results import GeometryResult
+
+
+def _mirror_correlation(gray: np.ndarray, block_stats, first: Tuple[int, int, int, int],
+                        second: Tuple[int, int, int, int], axis: int) -> float:
+    """
+    İki bölge arasında Pearson korelasyonu, ikinci bölge axis boyunca aynalanmış
+    
+    Bölge toplamları integral image'dan gelir; kopya almadan yalnızca çapraz
+    çarpım toplamı taranır. Bölgeler (y0, y1, x0, x1) biçimindedir.
+    """
+    a = gray[first[0]:first[1], first[2]:first[3]]
+    b = np.flip(gray[second[0]:second[1], second[2]:second[3]], axis=axis)
+    n = a.size
+    
+    sum_a, sq_a = block_stats.region_sums(*first)
+    sum_b, sq_b = block_stats.region_sums(*second)
+    cross = np.einsum('ij,ij->', a, b, dtype=np.float64)
+    
+    cov = cross - sum_a * sum_b / n
+    return cov / np.sqrt((sq_a - sum_a * sum_a / n) * (sq_b - sum_b * sum_b / n))
 
 
 class GeometryAnalyzer:
     """Edge coherence, symmetry, perspective analizi"""
     
-    def analyze_edge_coherence(self, image: np.ndarray) -> Dict:
+    requires = ('working',)  # Çizgi ve simetri yapısı küçültülmüş seviyede korunur
+    
+    def analyze_edge_coherence(self, ctx: AnalysisContext) -> Dict:
         """Edge continuity ve coherence analizi"""
-        edges = detect_edges(image)
+        edges = ctx.working.edges
         
         # Hough line transform
         lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=50,
@@ -50,34 +73,21 @@ class GeometryAnalyzer:
             'confidence': 0.5 if is_fragmented else 0.0
         }
     
-    def analyze_symmetry(self, image: np.ndarray) -> Dict:
+    def analyze_symmetry(self, ctx: AnalysisContext) -> Dict:
         """Simetri ve pattern repetition analizi"""
-        gray = to_grayscale(image)
+        working = ctx.working
+        gray = working.gray
         h, w = gray.shape
         
-        # Horizontal symmetry
-        left_half = gray[:, :w//2]
-        right_half = gray[:, w//2:]
-        right_half_flipped = np.fliplr(right_half)
-        
-        # Boyutları eşitle
-        min_w = min(left_half.shape[1], right_half_flipped.shape[1])
-        left_half = left_half[:, :min_w]
-        right_half_flipped = right_half_flipped[:, :min_w]
+        # Horizontal symmetry - sol yarı ile aynalanmış sağ yarı (eşit genişlikte)
+        half_w = w // 2
+        h_symmetry = _mirror_correlation(gray, working.block_stats,
+                                         (0, h, 0, half_w), (0, h, w - half_w, w), axis=1)
         
-        # Correlation
-        h_symmetry = np.corrcoef(left_half.flatten(), right_half_flipped.flatten())[0, 1]
-        
-        # Vertical symmetry
-        top_half = gray[:h//2, :]
-        bottom_half = gray[h//2:, :]
-        bottom_half_flipped = np.flipud(bottom_half)
-        
-        min_h = min(top_half.shape[0], bottom_half_flipped.shape[0])
-        top_half = top_half[:min_h, :]
-        bottom_half_flipped = bottom_half_flipped[:min_h, :]
-        
-        v_symmetry = np.corrcoef(top_half.flatten(), bottom_half_flipped.flatten())[0, 1]
+        # Vertical symmetry - üst yarı ile aynalanmış alt yarı
+        half_h = h // 2
+        v_symmetry = _mirror_correlation(gray, working.block_stats,
+                                         (0, half_h, 0, w), (h - half_h, h, 0, w), axis=0)
         
         # Aşırı simetri = yapay
         max_symmetry = max(h_symmetry, v_symmetry)
@@ -90,9 +100,9 @@ class GeometryAnalyzer:
             'confidence': 0.4 if is_unnatural else 0.0
         }
     
-    def analyze_perspective(self, image: np.ndarray) -> Dict:
+    def analyze_perspective(self, ctx: AnalysisContext) -> Dict:
         """Perspektif tutarlılığı (basitleştirilmiş)"""
-        edges = detect_edges(image)
+        edges = ctx.working.edges
         
         # Hough lines
         lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=100)
@@ -122,17 +132,18 @@ class GeometryAnalyzer:
             'confidence': 0.3 if is_inconsistent else 0.0
         }
     
-    def analyze(self, image: np.ndarray) -> Dict:
+    def analyze(self, image: Union[np.ndarray, AnalysisContext]) -> GeometryResult:
         """Tüm geometri analizlerini çalıştır"""
-        edge_result = self.analyze_edge_coherence(image)
-        symmetry_result = self.analyze_symmetry(image)
-        perspective_result = self.analyze_perspective(image)
-        
-        return {
-            'edge_fragmented': edge_result['is_fragmented'],
-            'details': {
+        ctx = AnalysisContext.wrap(image)
+        edge_result = self.analyze_edge_coherence(ctx)
+        symmetry_result = self.analyze_symmetry(ctx)
+        perspective_result = self.analyze_perspective(ctx)
+        
+        return GeometryResult(
+            edge_fragmented=bool(edge_result['is_fragmented']),
+            details={
                 'edge_coherence': edge_result,
                 'symmetry': symmetry_result,
                 'perspective': perspective_result
             }
-        }
+        )
@@ -7,22 +7,22 @@ from PIL import Image
 from PIL.ExifTags import TAGS
 from ..config import AI_WATERMARK_STRINGS, AI_SOFTWARE_TAGS
 from ..utils.file_parser import (
-    read_png_chunks, extract_png_text_chunks,
+    Source, open_source, read_png_chunks, extract_png_text_chunks,
     read_jpeg_segments, parse_mp4_atoms
 )
+from ..results import MetadataResult
 
 
 class MetadataAnalyzer:
-    """Dosya metadata ve EXIF analizi"""
+    """Dosya metadata ve EXIF analizi (durumsuz - instance paylaşılabilir)"""
     
-    def __init__(self):
-        self.suspicious_indicators = []
+    requires = ('source',)
     
-    def analyze_exif(self, file_path: str) -> Dict:
+    def analyze_exif(self, source: Source) -> Dict:
         """EXIF metadata analizi"""
         try:
-            img = Image.open(file_path)
-            exif_data = img._getexif()
+            with open_source(source) as fp, Image.open(fp) as img:
+                exif_data = img._getexif()
             
             if not exif_data:
                 # EXIF yoksa şüpheli DEĞİL - birçok fotoğraf editörü EXIF'i siler
@@ -55,10 +55,6 @@ class MetadataAnalyzer:
             camera_fields = ['Make', 'Model', 'LensModel', 'FocalLength', 'ISOSpeedRatings']
             missing_camera_data = [f for f in camera_fields if f not in exif]
             
-            # Tüm kamera bilgileri eksikse şüpheli (telefon fotoğrafları da olabilir)
-            if len(missing_camera_data) >= 5:
-                self.suspicious_indicators.append("Missing all camera metadata")
-            
             return {
                 'has_exif': True,
                 'suspicious': len(ai_indicators) > 0,  # Sadece AI indicator varsa şüpheli
@@ -73,9 +69,9 @@ class MetadataAnalyzer:
                 'error': str(e)
             }
     
-    def analyze_png_metadata(self, file_path: str) -> Dict:
+    def analyze_png_metadata(self, source: Source) -> Dict:
         """PNG chunk metadata analizi"""
-        chunks = read_png_chunks(file_path)
+        chunks = read_png_chunks(source)
         text_data = extract_png_text_chunks(chunks)
         
         ai_indicators = []
@@ -101,16 +97,17 @@ class MetadataAnalyzer:
             'suspicious': len(ai_indicators) > 0
         }
     
-    def analyze_c2pa(self, file_path: str) -> Dict:
+    def analyze_c2pa(self, source: Source, file_ext: Optional[str] = None) -> Dict:
         """C2PA (Content Credentials) metadata kontrolü"""
         # C2PA genelde JPEG APP11 veya PNG chunk'ta bulunur
-        file_ext = Path(file_path).suffix.lower()
+        if file_ext is None:
+            file_ext = Path(source).suffix.lower()
         
         c2pa_found = False
         is_synthetic = False
         
         if file_ext in ['.jpg', '.jpeg']:
-            segments = read_jpeg_segments(file_path)
+            segments = read_jpeg_segments(source)
             for seg_name, data in segments.items():
                 data_str = data.decode('latin-1', errors='ignore').lower()
                 if 'c2pa' in data_str or 'content credentials' in data_str:
@@ -119,7 +116,7 @@ class MetadataAnalyzer:
                         is_synthetic = True
         
         elif file_ext == '.png':
-            chunks = read_png_chunks(file_path)
+            chunks = read_png_chunks(source)
             text_data = extract_png_text_chunks(chunks)
             for keyword, text in text_data.items():
                 combined = (keyword + text).lower()
@@ -128,18 +125,15 @@ class MetadataAnalyzer:
                     if 'synthetic' in combined or 'ai' in combined:
                         is_synthetic = True
         
-        if is_synthetic:
-            self.suspicious_indicators.append("C2PA indicates synthetic content")
-        
         return {
             'c2pa_found': c2pa_found,
             'is_synthetic': is_synthetic,
             'confidence': 1.0 if is_synthetic else 0.0
         }
     
-    def analyze_video_metadata(self, file_path: str) -> Dict:
+    def analyze_video_metadata(self, source: Source) -> Dict:
         """Video metadata analizi (MP4)"""
-        atoms = parse_mp4_atoms(file_path)
+        atoms = parse_mp4_atoms(source)
         
         ai_indicators = []
         
@@ -162,42 +156,54 @@ class MetadataAnalyzer:
             'suspicious': len(ai_indicators) > 0
         }
     
-    def analyze(self, file_path: str, is_video: bool = False) -> Dict:
-        """Tüm metadata analizini çalıştır"""
-        self.suspicious_indicators = []
+    def analyze(self, source: Source, is_video: bool = False,
+                file_ext: Optional[str] = None) -> MetadataResult:
+        """
+        Tüm metadata analizini çalıştır
         
-        file_ext = Path(file_path).suffix.lower()
+        source bir dosya yolu ya da upload buffer'ı olabilir; buffer
+        verildiğinde file_ext zorunludur.
+        """
+        if file_ext is None:
+            file_ext = Path(source).suffix.lower()
         
         if is_video:
-            video_result = self.analyze_video_metadata(file_path)
-            return {
-                'metadata_suspicious': video_result['suspicious'],
-                'indicators': video_result['ai_indicators']
-            }
+            video_result = self.analyze_video_metadata(source)
+            return MetadataResult(
+                metadata_suspicious=bool(video_result['suspicious']),
+                indicators=video_result['ai_indicators']
+            )
         
         # Image metadata
-        exif_result = self.analyze_exif(file_path)
-        c2pa_result = self.analyze_c2pa(file_path)
+        exif_result = self.analyze_exif(source)
+        c2pa_result = self.analyze_c2pa(source, file_ext)
         
         png_result = {}
         if file_ext == '.png':
-            png_result = self.analyze_png_metadata(file_path)
+            png_result = self.analyze_png_metadata(source)
         
         # Combine results
+        suspicious_indicators = []
+        # Tüm kamera bilgileri eksikse şüpheli (telefon fotoğrafları da olabilir)
+        if len(exif_result.get('missing_camera_fields', [])) >= 5:
+            suspicious_indicators.append("Missing all camera metadata")
+        if c2pa_result['is_synthetic']:
+            suspicious_indicators.append("C2PA indicates synthetic content")
+        
         all_indicators = (
             exif_result.get('ai_indicators', []) +
             png_result.get('ai_indicators', []) +
-            self.suspicious_indicators
+            suspicious_indicators
         )
         
-        return {
-            'metadata_suspicious': (exif_result.get('suspicious', False) or 
-                                   png_result.get('suspicious', False)),
-            'c2pa_synthetic': c2pa_result['is_synthetic'],
-            'indicators': all_indicators,
-            'details': {
+        return MetadataResult(
+            metadata_suspicious=bool(exif_result.get('suspicious', False) or
+                                     png_result.get('suspicious', False)),
+            c2pa_synthetic=bool(c2pa_result['is_synthetic']),
+            indicators=all_indicators,
+            details={
                 'exif': exif_result,
                 'c2pa': c2pa_result,
                 'png': png_result
             }
-        }
+        )
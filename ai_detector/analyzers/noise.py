@@ -2,17 +2,21 @@
 
 import numpy as np
 from scipy import stats
-from typing import Dict
-from ..utils.image_utils import extract_noise_residual, to_grayscale
+from typing import Dict, Union
+from ..config import HOMOGENEITY_BLOCK_SIZES
+from ..context import AnalysisContext, pooled
 from ..decision.thresholds import ANALYSIS_THRESHOLDS
+from ..results import NoiseResult
 
 
 class NoiseAnalyzer:
     """Sensor noise ve PRNU-like analiz"""
     
-    def analyze_noise_variance(self, image: np.ndarray) -> Dict:
+    requires = ('tiles',)  # Küçültme yüksek frekanslı gürültüyü siler - tam çözünürlük gerekir
+    
+    def analyze_noise_variance(self, ctx: AnalysisContext) -> Dict:
         """Gürültü varyansı analizi"""
-        noise = extract_noise_residual(image)
+        noise = pooled([tile.noise_residual for tile in ctx.tiles])
         
         # Global variance
         noise_variance = np.var(noise)
@@ -27,9 +31,9 @@ class NoiseAnalyzer:
             'confidence': 0.7 if is_low else 0.0
         }
     
-    def analyze_noise_entropy(self, image: np.ndarray) -> Dict:
+    def analyze_noise_entropy(self, ctx: AnalysisContext) -> Dict:
         """Gürültü entropy analizi"""
-        noise = extract_noise_residual(image)
+        noise = pooled([tile.noise_residual for tile in ctx.tiles])
         
         # Flatten ve histogram
         noise_flat = noise.flatten()
@@ -48,51 +52,46 @@ class NoiseAnalyzer:
             'confidence': 0.5 if is_low else 0.0
         }
     
-    def analyze_local_variance_map(self, image: np.ndarray) -> Dict:
-        """Lokal varyans haritası - homojenlik testi"""
-        gray = to_grayscale(image)
-        h, w = gray.shape
-        
-        # 32x32 bloklar halinde varyans hesapla
-        block_size = 32
-        variances = []
-        
-        for y in range(0, h - block_size, block_size):
-            for x in range(0, w - block_size, block_size):
-                block = gray[y:y+block_size, x:x+block_size]
-                block_var = np.var(block)
-                variances.append(block_var)
-        
-        if not variances:
+    def analyze_local_variance_map(self, ctx: AnalysisContext) -> Dict:
+        """Lokal varyans haritası - homojenlik testi (integral image ile, çok ölçekli)"""
+        # Blok varyans haritaları aynı integral image'dan her ölçek için çıkarılır
+        multiscale = {}
+        for block_size in HOMOGENEITY_BLOCK_SIZES:
+            variances = pooled([tile.block_stats.moments(block_size)[1] for tile in ctx.tiles])
+            if variances.size:
+                # Varyansların varyansı (meta-variance)
+                multiscale[str(block_size)] = float(np.var(variances))
+        
+        # Karar 32x32 bloklarla
+        if '32' not in multiscale:
             return {'homogeneity': 0.0, 'is_unnatural': False, 'confidence': 0.0}
         
-        # Varyansların varyansı (meta-variance)
-        variance_of_variances = np.var(variances)
+        variance_of_variances = multiscale['32']
         
         # AI images: çok homojen (düşük meta-variance)
         is_unnatural = variance_of_variances < 20.0  # Çok düşük gerekli
         
         return {
             'variance_of_variances': float(variance_of_variances),
+            'multiscale': multiscale,
             'is_unnatural': is_unnatural,
             'confidence': 0.4 if is_unnatural else 0.0
         }
     
-    def chi_square_test(self, image: np.ndarray) -> Dict:
+    def chi_square_test(self, ctx: AnalysisContext) -> Dict:
         """Pixel değer dağılımı chi-square testi"""
-        gray = to_grayscale(image)
-        
-        # Histogram
-        hist, _ = np.histogram(gray, bins=256, range=(0, 256))
+        # Histogram (karoların gri ton histogramları toplanır)
+        hist = sum(tile.gray_hist for tile in ctx.tiles)
+        pixels = sum(tile.gray.size for tile in ctx.tiles)
         
         # Beklenen: uniform distribution
-        expected = len(gray.flatten()) / 256
+        expected = pixels / 256
         
         # Chi-square
         chi2 = np.sum((hist - expected) ** 2 / (expected + 1e-10))
         
         # Normalize
-        chi2_normalized = chi2 / len(gray.flatten())
+        chi2_normalized = chi2 / pixels
         
         # Çok düşük chi2 = yapay uniform dağılım
         is_anomaly = chi2_normalized < 0.5  # Empirical
@@ -103,22 +102,23 @@ class NoiseAnalyzer:
             'confidence': 0.3 if is_anomaly else 0.0
         }
     
-    def analyze(self, image: np.ndarray) -> Dict:
+    def analyze(self, image: Union[np.ndarray, AnalysisContext]) -> NoiseResult:
         """Tüm gürültü analizlerini çalıştır"""
-        variance_result = self.analyze_noise_variance(image)
-        entropy_result = self.analyze_noise_entropy(image)
-        local_var_result = self.analyze_local_variance_map(image)
-        chi2_result = self.chi_square_test(image)
+        ctx = AnalysisContext.wrap(image)
+        variance_result = self.analyze_noise_variance(ctx)
+        entropy_result = self.analyze_noise_entropy(ctx)
+        local_var_result = self.analyze_local_variance_map(ctx)
+        chi2_result = self.chi_square_test(ctx)
         
         # Genel karar
-        noise_variance_low = variance_result['is_low']
+        noise_variance_low = bool(variance_result['is_low'])
         
-        return {
-            'noise_variance_low': noise_variance_low,
-            'details': {
+        return NoiseResult(
+            noise_variance_low=noise_variance_low,
+            details={
                 'variance': variance_result,
                 'entropy': entropy_result,
                 'local_variance': local_var_result,
                 'chi_square': chi2_result
             }
-        }
+        )
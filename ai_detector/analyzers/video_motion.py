@@ -1,30 +1,120 @@
-"""Video motion vector analizi"""
+"""Video motion vector analizi
+
+İki motor aynı metrikleri (çift başına ortalama hareket genliğinin varyansı,
+ardışık çiftler arasındaki ortalama genlik farkı) üretir:
+- dense: Farneback optical flow, her piksel; her çift için bir kez
+  hesaplanır (VideoFrameContext)
+- sparse: Lucas-Kanade ile izlenen özellik noktaları; fark, iki çiftte de
+  izlenen aynı noktalar üzerinden alınır
+Akış durumunda yalnızca önceki frame'in bağlamı ve son hareket örneği tutulur.
+"""
 
 import numpy as np
-from typing import List, Dict
-from ..utils.image_utils import compute_optical_flow
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+from ..config import MOTION_THRESHOLDS
+from ..context import VideoFrameContext
+from ..utils.feature_tracking import FeatureTracker
+from ..utils.online_stats import RunningStats
+from ..results import MotionResult
 
 
-class VideoMotionAnalyzer:
-    """Optical flow ve motion consistency analizi"""
+class MotionSample(NamedTuple):
+    """Tek frame'in motion ölçümleri (ölçülemeyen çiftte None)"""
+    mean_magnitude: Optional[float]   # Önceki frame'den bu frame'e ortalama hareket
+    difference: Optional[float]       # Önceki çiftin hareketiyle ortalama genlik farkı
+    scene_change: bool = False        # sparse: özellikler yeniden tespit edildi
+
+
+class MotionStream:
+    """Frame'leri tek tek alan motion analiz durumu"""
     
-    def analyze_motion_vectors(self, frames: List[np.ndarray]) -> Dict:
-        """Motion vector consistency"""
-        if len(frames) < 2:
-            return {'is_irregular': False, 'confidence': 0.0}
+    def __init__(self, engine: str = 'dense'):
+        self.engine = engine
+        self.frames = 0
+        self.scene_changes = 0
+        self._previous: Optional[VideoFrameContext] = None
+        self._tracker = FeatureTracker() if engine == 'sparse' else None
+        self._prev_sample = None
+        self._magnitudes = RunningStats()
+        self._differences = RunningStats()
+    
+    def update(self, frame: Union[np.ndarray, VideoFrameContext]):
+        """Sıradaki frame'i işle (RGB ya da gri ton, veya bağlamı)"""
+        self.add(self.measure(frame))
+    
+    def measure(self, frame: Union[np.ndarray, VideoFrameContext]) -> MotionSample:
+        """Sıradaki frame'in ölçümleri"""
+        frame = VideoFrameContext.wrap(frame)
+        redetections = self._tracker.redetections if self._tracker is not None else 0
+        sample = self.motion_vectors(self._previous, frame)
+        self._previous = frame
+        scene_change = self._tracker is not None and self._tracker.redetections > redetections
+        
+        # Kesmeden sağ çıkan az sayıdaki iz hatalıdır; kesme boyunca hareket ölçülemez
+        if sample is None or scene_change:
+            self._prev_sample = None
+            return MotionSample(None, None, scene_change)
+        
+        magnitude = sample[1] if self._tracker is not None else sample
+        return MotionSample(float(np.mean(magnitude)), self.motion_smoothness(sample),
+                            scene_change)
+    
+    def add(self, sample: MotionSample):
+        """Ölçümleri sayaçlara ekle (frame sırasıyla çağrılmalı)"""
+        if sample.mean_magnitude is not None:
+            self._magnitudes.update(sample.mean_magnitude)
+        if sample.difference is not None:
+            self._differences.update(sample.difference)
+        self.scene_changes += sample.scene_change
+        self.frames += 1
+    
+    def motion_vectors(self, previous: Optional[VideoFrameContext], frame: VideoFrameContext):
+        """
+        Çiftin hareket örneği
         
-        motion_magnitudes = []
+        dense: flow genlik haritası, sparse: (nokta kimlikleri, genlikler).
+        İlk frame'de ve ölçülemeyen çiftlerde None.
+        """
+        if self._tracker is not None:
+            sample = self._tracker.update(frame.gray)
+            # İzlenen nokta kalmayan çiftte (düz frame, sahne kesmesi) hareket ölçülemez
+            if sample is None or sample[1].size == 0:
+                return None
+            return sample
+        if previous is None:
+            return None
+        return frame.flow_magnitude(previous)
+    
+    def motion_smoothness(self, sample) -> Optional[float]:
+        """Önceki hareket örneğiyle ortalama genlik farkı (önceki yoksa None)"""
+        previous, self._prev_sample = self._prev_sample, sample
+        if previous is None:
+            return None
         
-        for i in range(len(frames) - 1):
-            magnitude, angle = compute_optical_flow(frames[i], frames[i + 1])
-            avg_magnitude = np.mean(magnitude)
-            motion_magnitudes.append(avg_magnitude)
+        if self._tracker is not None:
+            (prev_ids, prev_magnitude), (ids, magnitude) = previous, sample
+            _, prev_index, index = np.intersect1d(prev_ids, ids, assume_unique=True,
+                                                  return_indices=True)
+            if prev_index.size == 0:
+                return None
+            prev_magnitude, magnitude = prev_magnitude[prev_index], magnitude[index]
+        else:
+            prev_magnitude, magnitude = previous, sample
+        
+        return float(np.mean(np.abs(prev_magnitude - magnitude)))
+    
+    def motion_vectors_result(self) -> Dict:
+        """Motion vector consistency"""
+        if self._magnitudes.count == 0:
+            return {'is_irregular': False, 'confidence': 0.0}
         
         # Motion magnitude variance
-        motion_variance = np.var(motion_magnitudes)
+        motion_variance = self._magnitudes.variance
         
         # AI videos: erratic (high variance) or overly smooth (low variance)
-        is_irregular = motion_variance < 0.5 or motion_variance > 50.0  # Empirical
+        thresholds = MOTION_THRESHOLDS[self.engine]
+        is_irregular = (motion_variance < thresholds['variance_min'] or
+                        motion_variance > thresholds['variance_max'])
         
         return {
             'motion_variance': float(motion_variance),
@@ -32,25 +122,15 @@ class VideoMotionAnalyzer:
             'confidence': 0.6 if is_irregular else 0.0
         }
     
-    def analyze_motion_smoothness(self, frames: List[np.ndarray]) -> Dict:
+    def motion_smoothness_result(self) -> Dict:
         """Motion smoothness analizi"""
-        if len(frames) < 3:
+        if self._differences.count == 0:
             return {'is_unnatural': False, 'confidence': 0.0}
         
-        # Consecutive motion differences
-        motion_diffs = []
-        
-        for i in range(len(frames) - 2):
-            mag1, _ = compute_optical_flow(frames[i], frames[i + 1])
-            mag2, _ = compute_optical_flow(frames[i + 1], frames[i + 2])
-            
-            diff = np.mean(np.abs(mag1 - mag2))
-            motion_diffs.append(diff)
-        
-        avg_diff = np.mean(motion_diffs)
+        avg_diff = self._differences.mean
         
         # Çok düşük = overly smooth (AI)
-        is_unnatural = avg_diff < 0.1  # Empirical
+        is_unnatural = avg_diff < MOTION_THRESHOLDS[self.engine]['smoothness_min']
         
         return {
             'avg_motion_diff': float(avg_diff),
@@ -58,15 +138,37 @@ class VideoMotionAnalyzer:
             'confidence': 0.5 if is_unnatural else 0.0
         }
     
-    def analyze(self, frames: List[np.ndarray]) -> Dict:
-        """Tüm motion analizlerini çalıştır"""
-        vector_result = self.analyze_motion_vectors(frames)
-        smoothness_result = self.analyze_motion_smoothness(frames)
+    def result(self) -> MotionResult:
+        """Tüm motion analizlerinin sonucu"""
+        vector_result = self.motion_vectors_result()
+        smoothness_result = self.motion_smoothness_result()
         
-        return {
-            'motion_vector_irregular': vector_result['is_irregular'],
-            'details': {
-                'motion_vectors': vector_result,
-                'motion_smoothness': smoothness_result
-            }
+        details = {
+            'engine': self.engine,
+            'motion_vectors': vector_result,
+            'motion_smoothness': smoothness_result
         }
+        if self._tracker is not None:
+            details['scene_changes'] = self.scene_changes
+        
+        return MotionResult(
+            motion_vector_irregular=bool(vector_result['is_irregular']),
+            details=details
+        )
+
+
+class VideoMotionAnalyzer:
+    """Optical flow ve motion consistency analizi"""
+    
+    requires = ('frames',)
+    
+    def stream(self, engine: str = 'dense') -> MotionStream:
+        """Frame'leri tek tek alan akış tüketicisi (engine: 'dense' veya 'sparse')"""
+        return MotionStream(engine)
+    
+    def analyze(self, frames: Iterable[np.ndarray], engine: str = 'dense') -> MotionResult:
+        """Tüm motion analizlerini çalıştır"""
+        stream = self.stream(engine)
+        for frame in frames:
+            stream.update(frame)
+        return stream.result()
@@ -1,33 +1,91 @@
-"""Video temporal analiz modülü"""
+"""Video temporal analiz modülü
+
+Frame'ler tek geçişte akış olarak işlenir: önceki frame'in bağlamı ile
+sabit boyutlu sayaçlar (Welford varyansı, korelasyon toplamları, halka
+tamponda intensity zaman serisi) tutulur. Bellek analiz edilen frame
+sayısından bağımsızdır. Gri ton ve residual VideoFrameContext'ten gelir.
+
+Akış iki adımlıdır: measure() frame başına ölçümleri (TemporalSample)
+üretir, add() bunları sayaçlara ekler. Segmentli çözümlemede ölçümler
+farklı process'lerde üretilip sırayla tek akışa eklenir.
+"""
 
 import numpy as np
 import cv2
-from typing import List, Dict
-from ..utils.image_utils import to_grayscale, extract_noise_residual
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+from ..config import VIDEO_FLICKER_WINDOW
+from ..context import VideoFrameContext
+from ..utils.online_stats import RunningStats, RingBuffer
 from ..decision.thresholds import ANALYSIS_THRESHOLDS
+from ..results import TemporalResult
 
 
-class VideoTemporalAnalyzer:
-    """Frame-to-frame temporal consistency analizi"""
+class TemporalSample(NamedTuple):
+    """Tek frame'in temporal ölçümleri (çift ölçümleri ilk frame'de None)"""
+    noise_std: Optional[float]
+    correlation: Optional[float]
+    intensity: float
+
+
+class TemporalStream:
+    """Frame'leri tek tek alan temporal analiz durumu"""
+    
+    def __init__(self, flicker_window: int = VIDEO_FLICKER_WINDOW):
+        self.frames = 0
+        self._previous: Optional[VideoFrameContext] = None
+        self._noise = RunningStats()
+        self._correlation = RunningStats()
+        self._intensity = RingBuffer(flicker_window)
+    
+    def update(self, frame: Union[np.ndarray, VideoFrameContext]):
+        """Sıradaki frame'i işle (RGB ya da gri ton, veya bağlamı)"""
+        self.add(self.measure(frame))
     
-    def analyze_temporal_noise(self, frames: List[np.ndarray]) -> Dict:
-        """Frame-to-frame gürültü tutarlılığı"""
-        if len(frames) < 2:
+    def measure(self, frame: Union[np.ndarray, VideoFrameContext]) -> TemporalSample:
+        """Sıradaki frame'in ölçümleri (önceki frame ile çift ölçümleri dahil)"""
+        frame = VideoFrameContext.wrap(frame)
+        previous, self._previous = self._previous, frame
+        if previous is None:
+            return TemporalSample(None, None, self.intensity(frame))
+        return TemporalSample(self.temporal_noise(previous, frame),
+                              self.frame_correlation(previous, frame),
+                              self.intensity(frame))
+    
+    def add(self, sample: TemporalSample):
+        """Ölçümleri sayaçlara ekle (frame sırasıyla çağrılmalı)"""
+        if sample.noise_std is not None:
+            self._noise.update(sample.noise_std)
+        if sample.correlation is not None:
+            self._correlation.update(sample.correlation)
+        self._intensity.append(sample.intensity)
+        self.frames += 1
+    
+    def temporal_noise(self, previous: VideoFrameContext, frame: VideoFrameContext) -> float:
+        """Frame-to-frame gürültü seviyesi (fark görüntüsünün std'si)"""
+        diff = cv2.absdiff(previous.gray, frame.gray)
+        return float(cv2.meanStdDev(diff)[1][0, 0])
+    
+    def frame_correlation(self, previous: VideoFrameContext, frame: VideoFrameContext) -> float:
+        """Ardışık frame residual'larının Pearson korelasyonu"""
+        n, prev_total, prev_square = previous.residual_sums
+        _, total, square = frame.residual_sums
+        cross = np.einsum('i,i->', previous.noise_residual, frame.noise_residual,
+                          dtype=np.float64)
+        
+        covariance = n * cross - prev_total * total
+        variance = (n * prev_square - prev_total ** 2) * (n * square - total ** 2)
+        return float(covariance / np.sqrt(variance))
+    
+    def intensity(self, frame: VideoFrameContext) -> float:
+        """Flicker zaman serisi için ortalama intensity"""
+        return frame.intensity
+    
+    def temporal_noise_result(self) -> Dict:
+        if self._noise.count == 0:
             return {'temporal_noise_std': 0.0, 'is_anomaly': False, 'confidence': 0.0}
         
-        temporal_noise_values = []
-        
-        for i in range(len(frames) - 1):
-            frame1 = to_grayscale(frames[i])
-            frame2 = to_grayscale(frames[i + 1])
-            
-            # Frame difference
-            diff = cv2.absdiff(frame1, frame2)
-            noise_level = np.std(diff)
-            temporal_noise_values.append(noise_level)
-        
         # Temporal noise'un std'si
-        temporal_std = np.std(temporal_noise_values)
+        temporal_std = self._noise.std
         
         # Real video: smooth (2.5-8.0)
         # AI video: erratic or too smooth
@@ -40,22 +98,11 @@ class VideoTemporalAnalyzer:
             'confidence': 0.7 if is_anomaly else 0.0
         }
     
-    def analyze_frame_correlation(self, frames: List[np.ndarray]) -> Dict:
-        """Consecutive frame noise correlation"""
-        if len(frames) < 2:
+    def frame_correlation_result(self) -> Dict:
+        if self._correlation.count == 0:
             return {'avg_correlation': 0.0, 'is_anomaly': False, 'confidence': 0.0}
         
-        correlations = []
-        
-        for i in range(len(frames) - 1):
-            noise1 = extract_noise_residual(frames[i])
-            noise2 = extract_noise_residual(frames[i + 1])
-            
-            # Flatten ve correlation
-            corr = np.corrcoef(noise1.flatten(), noise2.flatten())[0, 1]
-            correlations.append(corr)
-        
-        avg_corr = np.mean(correlations)
+        avg_corr = self._correlation.mean
         
         # Real: high correlation (0.8+)
         # AI: low (<0.5) or perfect (1.0)
@@ -67,13 +114,12 @@ class VideoTemporalAnalyzer:
             'confidence': 0.6 if is_anomaly else 0.0
         }
     
-    def detect_diffusion_flicker(self, frames: List[np.ndarray]) -> Dict:
-        """Diffusion model karakteristik flicker tespiti"""
-        if len(frames) < 10:
+    def flicker_result(self) -> Dict:
+        """Diffusion model karakteristik flicker tespiti (son VIDEO_FLICKER_WINDOW frame)"""
+        if len(self._intensity) < 10:
             return {'flicker_detected': False, 'peak_frequency': 0.0, 'confidence': 0.0}
         
-        # Her frame'in ortalama intensity'si
-        intensity_timeline = [np.mean(to_grayscale(frame)) for frame in frames]
+        intensity_timeline = self._intensity.values()
         
         # FFT
         fft = np.fft.fft(intensity_timeline)
@@ -104,18 +150,35 @@ class VideoTemporalAnalyzer:
             'confidence': min(peak_normalized / 5.0, 1.0) if flicker_detected else 0.0
         }
     
-    def analyze(self, frames: List[np.ndarray]) -> Dict:
-        """Tüm temporal analizleri çalıştır"""
-        noise_result = self.analyze_temporal_noise(frames)
-        corr_result = self.analyze_frame_correlation(frames)
-        flicker_result = self.detect_diffusion_flicker(frames)
-        
-        return {
-            'temporal_flicker': flicker_result['flicker_detected'],
-            'temporal_noise_anomaly': noise_result['is_anomaly'],
-            'details': {
+    def result(self) -> TemporalResult:
+        """Tüm temporal analizlerin sonucu"""
+        noise_result = self.temporal_noise_result()
+        corr_result = self.frame_correlation_result()
+        flicker_result = self.flicker_result()
+        
+        return TemporalResult(
+            temporal_flicker=bool(flicker_result['flicker_detected']),
+            temporal_noise_anomaly=bool(noise_result['is_anomaly']),
+            details={
                 'temporal_noise': noise_result,
                 'frame_correlation': corr_result,
                 'flicker': flicker_result
             }
-        }
+        )
+
+
+class VideoTemporalAnalyzer:
+    """Frame-to-frame temporal consistency analizi"""
+    
+    requires = ('frames',)
+    
+    def stream(self) -> TemporalStream:
+        """Frame'leri tek tek alan akış tüketicisi"""
+        return TemporalStream()
+    
+    def analyze(self, frames: Iterable[np.ndarray]) -> TemporalResult:
+        """Tüm temporal analizleri çalıştır"""
+        stream = self.stream()
+        for frame in frames:
+            stream.update(frame)
+        return stream.result()
@@ -2,20 +2,22 @@
 
 import numpy as np
 import cv2
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 from ..config import AI_WATERMARK_STRINGS
+from ..context import AnalysisContext, pooled
+from ..results import WatermarkResult
+from ..utils import spectral
 
 
 class WatermarkDetector:
-    """Görünür ve görünmez watermark tespiti"""
+    """Görünür ve görünmez watermark tespiti (durumsuz - instance paylaşılabilir)"""
     
-    def __init__(self):
-        self.detected_watermarks = []
+    requires = ('working', 'tiles')  # Köşeler küçültülmüş seviyede, DCT/LSB tam çözünürlükte
     
-    def detect_text_watermarks(self, image: np.ndarray) -> Dict:
+    def detect_text_watermarks(self, ctx: AnalysisContext) -> Dict:
         """OCR-free text pattern detection (basit edge-based)"""
         # Bu basitleştirilmiş versiyonda corner/edge yoğunluğuna bakıyoruz
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gray = ctx.working.gray
         h, w = gray.shape
         
         # Corner bölgelerini kontrol et
@@ -40,7 +42,6 @@ class WatermarkDetector:
             if edge_density > 0.15:  # %15'ten fazla edge
                 detected = True
                 location = corner_names[i]
-                self.detected_watermarks.append(f"Corner watermark at {location}")
                 break
         
         return {
@@ -49,49 +50,45 @@ class WatermarkDetector:
             'confidence': 0.6 if detected else 0.0
         }
     
-    def detect_frequency_watermark(self, image: np.ndarray) -> Dict:
+    def detect_frequency_watermark(self, ctx: AnalysisContext) -> Dict:
         """FFT/DCT domain'de gömülü watermark tespiti"""
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        tile_peaks = []
         
-        # DCT hesapla
-        gray_float = np.float32(gray) / 255.0
-        dct = cv2.dct(gray_float)
-        
-        # Yüksek frekans bandında periyodik pattern ara
-        h, w = dct.shape
-        high_freq_band = dct[h//2:, w//2:]
-        
-        # Autocorrelation ile periyodik pattern tespit
-        fft_band = np.fft.fft2(high_freq_band)
-        power = np.abs(fft_band) ** 2
-        autocorr = np.fft.ifft2(power)
-        autocorr = np.abs(autocorr)
-        
-        # Merkez dışında güçlü peak var mı?
-        autocorr_normalized = autocorr / autocorr.max()
-        center = (autocorr.shape[0] // 2, autocorr.shape[1] // 2)
+        for tile in ctx.tiles:
+            # DCT FrequencyAnalyzer ile paylaşılır
+            dct = tile.dct
+            
+            # Yüksek frekans bandında periyodik pattern ara
+            h, w = dct.shape
+            high_freq_band = dct[h//2:, w//2:]
+            
+            # Autocorrelation ile periyodik pattern tespit (float32 rfft2)
+            autocorr_normalized = np.abs(spectral.autocorrelation(
+                spectral.power_spectrum(high_freq_band), shift=False))
+            
+            # Merkez dışında güçlü peak var mı?
+            center = (autocorr_normalized.shape[0] // 2, autocorr_normalized.shape[1] // 2)
+            
+            # Merkez dışı maksimum
+            autocorr_copy = autocorr_normalized.copy()
+            autocorr_copy[center[0]-5:center[0]+5, center[1]-5:center[1]+5] = 0
+            tile_peaks.append(autocorr_copy.max())
         
-        # Merkez dışı maksimum
-        autocorr_copy = autocorr_normalized.copy()
-        autocorr_copy[center[0]-5:center[0]+5, center[1]-5:center[1]+5] = 0
-        max_peak = autocorr_copy.max()
+        max_peak = np.mean(tile_peaks)
         
         # Daha yüksek threshold - normal fotoğraflarda da pattern olabilir
         detected = max_peak > 0.5  # Eşik değer
         
-        if detected:
-            self.detected_watermarks.append("Frequency domain watermark pattern")
-        
         return {
             'detected': detected,
             'peak_strength': float(max_peak),
             'confidence': min(float(max_peak), 1.0)
         }
     
-    def detect_lsb_steganography(self, image: np.ndarray) -> Dict:
+    def detect_lsb_steganography(self, ctx: AnalysisContext) -> Dict:
         """LSB (Least Significant Bit) steganografi tespiti"""
-        # LSB plane'i çıkar
-        lsb_plane = image & 1
+        # LSB plane'i çıkar (küçültme LSB'yi bozar - tam çözünürlüklü karolar)
+        lsb_plane = pooled([tile.image & 1 for tile in ctx.tiles])
         
         # LSB plane'de randomness testi (chi-square)
         lsb_flat = lsb_plane.flatten()
@@ -107,22 +104,27 @@ class WatermarkDetector:
         # Çok daha yüksek threshold - normal fotoğraflarda da LSB varyasyonu olabilir
         detected = chi_square > 20.0  # Çok güçlü anomali gerekli
         
-        if detected:
-            self.detected_watermarks.append("LSB steganography anomaly")
-        
         return {
             'detected': detected,
             'chi_square': float(chi_square),
             'confidence': min(chi_square / 10.0, 1.0) if detected else 0.0
         }
     
-    def analyze(self, image: np.ndarray) -> Dict:
+    def analyze(self, image: Union[np.ndarray, AnalysisContext]) -> WatermarkResult:
         """Tüm watermark testlerini çalıştır"""
-        self.detected_watermarks = []
+        ctx = AnalysisContext.wrap(image)
+        
+        text_result = self.detect_text_watermarks(ctx)
+        freq_result = self.detect_frequency_watermark(ctx)
+        lsb_result = self.detect_lsb_steganography(ctx)
         
-        text_result = self.detect_text_watermarks(image)
-        freq_result = self.detect_frequency_watermark(image)
-        lsb_result = self.detect_lsb_steganography(image)
+        detections = []
+        if text_result['detected']:
+            detections.append(f"Corner watermark at {text_result['location']}")
+        if freq_result['detected']:
+            detections.append("Frequency domain watermark pattern")
+        if lsb_result['detected']:
+            detections.append("LSB steganography anomaly")
         
         overall_detected = (text_result['detected'] or 
                           freq_result['detected'] or 
@@ -134,13 +136,13 @@ class WatermarkDetector:
             lsb_result['confidence']
         )
         
-        return {
-            'watermark_detected': overall_detected,
-            'confidence': max_confidence,
-            'detections': self.detected_watermarks,
-            'details': {
+        return WatermarkResult(
+            watermark_detected=bool(overall_detected),
+            confidence=float(max_confidence),
+            detections=detections,
+            details={
                 'text_watermark': text_result,
                 'frequency_watermark': freq_result,
                 'lsb_steganography': lsb_result
             }
-        }
+        )
@@ -0,0 +1,212 @@
+"""Kabul kontrolü - görüntü/video için ayrı eşzamanlılık slotları ve sınırlı bekleme kuyruğu"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from ..config import (
+    ADMISSION_IMAGE_SLOTS, ADMISSION_VIDEO_SLOTS, ADMISSION_IMAGE_QUEUE,
+    ADMISSION_VIDEO_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_ADAPTIVE,
+    ADMISSION_IMAGE_TARGET_LATENCY, ADMISSION_VIDEO_TARGET_LATENCY,
+    ADMISSION_MIN_SLOTS, ADMISSION_ADAPT_INTERVAL
+)
+
+
+class AdmissionTicket:
+    """Alınmış slot - release() birden fazla çağrılabilir"""
+    
+    def __init__(self, pool: "AdmissionPool"):
+        self.pool = pool
+        self.granted_at = time.monotonic()
+        self.released = False
+    
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        self.pool._release(time.monotonic() - self.granted_at)
+
+
+class AdmissionPool:
+    """
+    Tek medya tipi için slot havuzu
+    
+    Slot boşsa hemen, değilse FIFO kuyrukta en fazla queue_timeout kadar
+    beklenir. Kuyruk doluysa 429, bekleme süresi dolarsa 503 döner.
+    Adaptif modda gecikme (EWMA) hedefi aşınca limit azaltılır (AIMD).
+    """
+    
+    EWMA_ALPHA = 0.2
+    
+    def __init__(self, name: str, slots: int, max_queue: int,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 adaptive: bool = ADMISSION_ADAPTIVE,
+                 target_latency: float = 10.0,
+                 min_slots: int = ADMISSION_MIN_SLOTS,
+                 adapt_interval: int = ADMISSION_ADAPT_INTERVAL):
+        self.name = name
+        self.max_slots = max(1, slots)
+        self.min_slots = max(1, min(min_slots, self.max_slots))
+        self.limit = self.max_slots
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.adapt_interval = max(1, adapt_interval)
+        
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.latency_ewma: Optional[float] = None
+        self._samples_since_adapt = 0
+        
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+    
+    def _retry_after(self) -> str:
+        """Kuyruğun boşalma süresi tahmini (saniye)"""
+        latency = self.latency_ewma or self.target_latency
+        estimate = latency * (len(self._waiters) + 1) / self.limit
+        return str(min(60, max(1, math.ceil(estimate))))
+    
+    async def acquire(self, background: bool = False) -> AdmissionTicket:
+        """
+        Slot al; kuyruk doluysa 429, zaman aşımında 503
+        
+        background=True (iş kuyruğu worker'ları) kuyruk sınırı ve zaman aşımı
+        olmadan sırasını bekler; bu bekleyenlerin sayısı JOB_WORKERS ile sınırlı.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return AdmissionTicket(self)
+        
+        if not background and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many concurrent {self.name} analyses, please retry later",
+                headers={'Retry-After': self._retry_after()}
+            )
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, None if background else self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._remove_waiter(waiter)
+            self.timeouts += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy, {self.name} analysis queue timed out",
+                headers={'Retry-After': self._retry_after()}
+            )
+        except asyncio.CancelledError:
+            # İstemci koptu: slot verildiyse geri bırak
+            if waiter.done() and not waiter.cancelled():
+                self._release(None)
+            else:
+                self._remove_waiter(waiter)
+            raise
+        
+        self.admitted += 1
+        return AdmissionTicket(self)
+    
+    def _remove_waiter(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    def _wake_waiters(self):
+        """Boş slotları sıradaki bekleyenlere ver"""
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+    
+    def _release(self, latency: Optional[float]):
+        self.active -= 1
+        if latency is not None:
+            self._observe(latency)
+        self._wake_waiters()
+    
+    def _observe(self, latency: float):
+        """Gecikmeyi EWMA'ya ekle, adaptif modda limiti ayarla"""
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.EWMA_ALPHA * (latency - self.latency_ewma)
+        
+        if not self.adaptive:
+            return
+        
+        self._samples_since_adapt += 1
+        if self._samples_since_adapt < self.adapt_interval:
+            return
+        self._samples_since_adapt = 0
+        
+        # Çarpımsal azalt, toplamsal artır
+        if self.latency_ewma > self.target_latency:
+            self.limit = max(self.min_slots, int(self.limit * 0.75))
+        elif self.latency_ewma < self.target_latency * 0.8:
+            self.limit = min(self.max_slots, self.limit + 1)
+    
+    def stats(self) -> Dict:
+        return {
+            'active': self.active,
+            'limit': self.limit,
+            'max_slots': self.max_slots,
+            'queue_depth': len(self._waiters),
+            'max_queue': self.max_queue,
+            'saturation': round(self.active / self.limit, 3),
+            'latency_ewma_ms': round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts
+        }
+
+
+class AdmissionController:
+    """Görüntü ve video analizleri için ayrı slot havuzları"""
+    
+    def __init__(self, adaptive: bool = ADMISSION_ADAPTIVE):
+        self.adaptive = adaptive
+        self.image = AdmissionPool('image', ADMISSION_IMAGE_SLOTS, ADMISSION_IMAGE_QUEUE,
+                                   adaptive=adaptive,
+                                   target_latency=ADMISSION_IMAGE_TARGET_LATENCY)
+        self.video = AdmissionPool('video', ADMISSION_VIDEO_SLOTS, ADMISSION_VIDEO_QUEUE,
+                                   adaptive=adaptive,
+                                   target_latency=ADMISSION_VIDEO_TARGET_LATENCY)
+    
+    def pool(self, is_video: bool) -> AdmissionPool:
+        return self.video if is_video else self.image
+    
+    async def acquire(self, is_video: bool, background: bool = False) -> AdmissionTicket:
+        return await self.pool(is_video).acquire(background)
+    
+    @asynccontextmanager
+    async def slot(self, is_video: bool, background: bool = False):
+        """async with bloğu süresince slot tut"""
+        ticket = await self.acquire(is_video, background)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+    
+    def stats(self) -> Dict:
+        return {
+            'adaptive': self.adaptive,
+            'image': self.image.stats(),
+            'video': self.video.stats()
+        }
+
+
+# Uygulama genelinde paylaşılan kabul kontrolü
+admission_controller = AdmissionController()
@@ -0,0 +1,254 @@
+"""İçerik adresli sonuç cache'i - bellek (LRU) ve disk katmanı"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ..config import (
+    ANALYZER_VERSION, RESULT_CACHE_ENABLED, RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL, RESULT_CACHE_DIR,
+    RESULT_CACHE_DISK_MAX_BYTES
+)
+from ..decision.thresholds import SCORE_WEIGHTS, VERDICT_THRESHOLDS, ANALYSIS_THRESHOLDS
+from ..utils import serializer
+
+
+def compute_cache_version() -> str:
+    """Analyzer sürümü + eşik değerlerinden cache sürümü üret"""
+    payload = json.dumps({
+        'analyzer_version': ANALYZER_VERSION,
+        'score_weights': SCORE_WEIGHTS,
+        'verdict_thresholds': VERDICT_THRESHOLDS,
+        'analysis_thresholds': ANALYSIS_THRESHOLDS
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ResultCache:
+    """SHA-256 içerik hash'i + analiz seçenekleri ile anahtarlanan sonuç cache'i"""
+    
+    # Disk katmanını her N yazımda bir budama
+    DISK_PRUNE_INTERVAL = 100
+    
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 ttl_seconds: float = RESULT_CACHE_TTL,
+                 disk_dir: Optional[str] = RESULT_CACHE_DIR,
+                 disk_max_bytes: int = RESULT_CACHE_DISK_MAX_BYTES,
+                 enabled: bool = RESULT_CACHE_ENABLED):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.version = compute_cache_version()
+        
+        # key -> (expires_at, json payload)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+        if self.enabled and self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+    
+    def make_key(self, sha256: str, **options) -> str:
+        """İçerik hash'i, analiz seçenekleri ve sürümden cache anahtarı üret"""
+        payload = json.dumps({'v': self.version, 'sha256': sha256, 'options': options},
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    # --- Bellek katmanı ---
+    
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, payload = entry
+            if expires_at < time.time():
+                self._memory_remove(key)
+                self.expirations += 1
+                return None
+            
+            self._memory.move_to_end(key)
+            return payload
+    
+    def _memory_put(self, key: str, payload: bytes):
+        if len(payload) > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._memory:
+                self._memory_remove(key)
+            
+            self._memory[key] = (time.time() + self.ttl_seconds, payload)
+            self._memory_bytes += len(payload)
+            
+            # LRU: en eski kullanılanı at
+            while (len(self._memory) > self.max_entries or
+                   self._memory_bytes > self.max_bytes):
+                oldest = next(iter(self._memory))
+                self._memory_remove(oldest)
+                self.evictions += 1
+    
+    def _count(self, counter: str, amount: int = 1) -> int:
+        """Sayacı kilit altında artır (get/put thread'lerde eşzamanlı çalışır)"""
+        with self._lock:
+            value = getattr(self, counter) + amount
+            setattr(self, counter, value)
+            return value
+    
+    def _memory_remove(self, key: str):
+        _, payload = self._memory.pop(key)
+        self._memory_bytes -= len(payload)
+    
+    # --- Disk katmanı ---
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json.z")
+    
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl_seconds < time.time():
+                os.unlink(path)
+                self._count('expirations')
+                return None
+            with open(path, 'rb') as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+    
+    def _disk_put(self, key: str, payload: bytes):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Atomik yazım: yarım dosya okunmasın
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(payload))
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        
+        if self._count('_disk_writes') % self.DISK_PRUNE_INTERVAL == 0:
+            self._disk_prune()
+    
+    def _disk_prune(self):
+        """Süresi dolanları sil, boyut limitini aşan en eski dosyaları at"""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if stat.st_mtime + self.ttl_seconds < now:
+                    self._safe_unlink(path)
+                    self._count('expirations')
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            self._safe_unlink(path)
+            self._count('evictions')
+            total -= size
+    
+    @staticmethod
+    def _safe_unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    # --- Genel API ---
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Cache'ten sonuç oku (bellek, sonra disk)"""
+        if not self.enabled:
+            return None
+        
+        payload = self._memory_get(key)
+        if payload is not None:
+            self._count('memory_hits')
+            return serializer.loads(payload)
+        
+        if self.disk_dir:
+            payload = self._disk_get(key)
+            if payload is not None:
+                self._count('disk_hits')
+                self._memory_put(key, payload)
+                return serializer.loads(payload)
+        
+        self._count('misses')
+        return None
+    
+    def put(self, key: str, result: Dict):
+        """Sonucu cache'e yaz"""
+        if not self.enabled:
+            return
+        
+        payload = serializer.dumps(result)
+        self._memory_put(key, payload)
+        if self.disk_dir:
+            self._disk_put(key, payload)
+    
+    async def aget(self, key: str) -> Optional[Dict]:
+        """get() - disk katmanı varsa event loop dışında"""
+        if self.disk_dir:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+    
+    async def aput(self, key: str, result: Dict):
+        """put() - disk katmanı varsa event loop dışında"""
+        if self.disk_dir:
+            await asyncio.to_thread(self.put, key, result)
+        else:
+            self.put(key, result)
+    
+    def stats(self) -> Dict:
+        """Hit/miss/eviction sayaçları"""
+        with self._lock:
+            entries, memory_bytes = len(self._memory), self._memory_bytes
+            memory_hits, disk_hits, misses = self.memory_hits, self.disk_hits, self.misses
+            evictions, expirations = self.evictions, self.expirations
+        hits = memory_hits + disk_hits
+        lookups = hits + misses
+        return {
+            'enabled': self.enabled,
+            'version': self.version,
+            'entries': entries,
+            'bytes': memory_bytes,
+            'hits': hits,
+            'memory_hits': memory_hits,
+            'disk_hits': disk_hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'evictions': evictions,
+            'expirations': expirations,
+            'disk_enabled': bool(self.disk_dir)
+        }
+
+
+# Uygulama genelinde paylaşılan cache
+result_cache = ResultCache()
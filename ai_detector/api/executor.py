@@ -0,0 +1,130 @@
+"""Analiz iş havuzu - CPU-yoğun analizleri event loop dışında çalıştırır"""
+
+import asyncio
+import functools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from ..config import ANALYSIS_EXECUTOR, ANALYSIS_WORKERS
+from ..pipeline import AnalysisError
+
+
+def _warm_worker():
+    """Worker başlangıcında ağır modülleri önceden yükle"""
+    import cv2  # noqa: F401
+    import numpy  # noqa: F401
+    import scipy.stats  # noqa: F401
+    from .. import pipeline  # noqa: F401
+
+
+def _ping() -> bool:
+    """Worker'ın ayağa kalktığını doğrula"""
+    return True
+
+
+class AnalysisExecutor:
+    """Process veya thread havuzu üzerinde analiz çalıştırıcı"""
+    
+    def __init__(self, mode: str = ANALYSIS_EXECUTOR, max_workers: int = ANALYSIS_WORKERS):
+        if mode not in ('process', 'thread'):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[Executor] = None
+        self._manager = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+    
+    def _create_pool(self) -> Executor:
+        if self.mode == 'process':
+            # spawn: uvicorn thread'lerini fork etmekten kaçın, Windows ile aynı davranış
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warm_worker
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='analysis',
+            initializer=_warm_worker
+        )
+    
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._create_pool()
+            return self._pool
+    
+    def start(self):
+        """Havuzu oluştur ve tüm worker'ları ısıt"""
+        pool = self._get_pool()
+        # Eşzamanlı submit her seferinde yeni bir worker başlatır
+        futures = [pool.submit(_ping) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+    
+    def shutdown(self, wait: bool = True):
+        """Havuzu kapat"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+        
+        with self._lock:
+            manager, self._manager = self._manager, None
+        if manager is not None:
+            manager.shutdown()
+    
+    def create_progress_queue(self):
+        """Worker'dan ilerleme olayı taşıyacak kuyruk oluştur"""
+        if self.mode == 'thread':
+            return queue.Queue()
+        
+        # Process havuzunda düz Queue pickle edilemez; Manager proxy'si gerekir
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context('spawn').Manager()
+            return self._manager.Queue()
+    
+    def _discard_broken_pool(self, broken: Executor):
+        """Çöken process havuzunu bir sonraki istek için yenile"""
+        with self._lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+    
+    async def run(self, func: Callable, *args, **kwargs):
+        """Fonksiyonu havuzda çalıştır, hataları HTTP hatasına çevir"""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        except AnalysisError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except BrokenProcessPool:
+            self._discard_broken_pool(pool)
+            raise HTTPException(status_code=503, detail="Analysis worker crashed, please retry")
+        finally:
+            self._in_flight -= 1
+    
+    def stats(self) -> Dict:
+        """Havuz durumu"""
+        return {
+            'mode': self.mode,
+            'workers': self.max_workers,
+            'started': self._pool is not None,
+            'in_flight': self._in_flight
+        }
+
+
+# Uygulama genelinde paylaşılan havuz
+analysis_executor = AnalysisExecutor()
@@ -0,0 +1,470 @@
+"""Upload alımı - parça parça diske yazma ve erken boyut reddi"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, UploadFile, HTTPException
+from fastapi.responses import JSONResponse
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from ..config import (
+    SUPPORTED_IMAGE_FORMATS, SUPPORTED_VIDEO_FORMATS,
+    MAX_IMAGE_SIZE, MAX_VIDEO_SIZE, UPLOAD_CHUNK_SIZE, MULTIPART_OVERHEAD
+)
+from .metrics import BYTES_INGESTED, STAGE_DURATION
+
+IMAGE_TOO_LARGE = "Image too large (max 50MB)"
+VIDEO_TOO_LARGE = "Video too large (max 500MB)"
+
+
+class Upload:
+    """Alınmış upload: görüntüler bellekte (kuyruktaki işlerde diskte), videolar geçici dosyada"""
+    
+    def __init__(self, filename: str, file_ext: str, is_video: bool, sha256: str,
+                 data: Optional[bytes] = None, path: Optional[str] = None):
+        self.filename = filename
+        self.file_ext = file_ext
+        self.is_video = is_video
+        self.sha256 = sha256
+        self.data = data
+        self.path = path
+    
+    def spool(self):
+        """Bellekteki görüntüyü geçici dosyaya yaz (kuyrukta beklerken bellek tutmasın)"""
+        if self.data is None:
+            return
+        with tempfile.NamedTemporaryFile(delete=False, suffix=self.file_ext) as tmp:
+            tmp.write(self.data)
+        self.path, self.data = tmp.name, None
+    
+    def load(self):
+        """spool() edilmiş görüntüyü belleğe geri oku (analiz bellekten çalışır)"""
+        if self.is_video or self.path is None:
+            return
+        self.data = Path(self.path).read_bytes()
+        os.unlink(self.path)
+        self.path = None
+    
+    def cleanup(self):
+        """Geçici dosyayı sil, buffer'ı bırak"""
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = None
+        self.data = None
+
+
+def check_declared_size(file: UploadFile, max_size: int, too_large_detail: str):
+    """Parser'ın bildirdiği boyutla okumadan önce reddet"""
+    size = getattr(file, 'size', None)
+    if size is not None and size > max_size:
+        raise HTTPException(status_code=413, detail=too_large_detail)
+
+
+async def read_upload(file: UploadFile, max_size: int,
+                      too_large_detail: str) -> Tuple[bytes, str]:
+    """
+    Starlette'in parse ettiği upload'ı belleğe oku, (içerik, sha256) döndür
+    
+    Sadece limiti küçük olan görüntüler için; limit aşıldığı anda okuma durur.
+    """
+    check_declared_size(file, max_size, too_large_detail)
+    
+    chunks = []
+    total = 0
+    
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        
+        total += len(chunk)
+        if total > max_size:
+            raise HTTPException(status_code=413, detail=too_large_detail)
+        
+        chunks.append(chunk)
+    
+    data = b''.join(chunks)
+    digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+    return data, digest
+
+
+async def save_upload(file: UploadFile, suffix: str, max_size: int,
+                      too_large_detail: str) -> Tuple[str, str]:
+    """
+    Upload'ı sabit boyutlu parçalarla geçici dosyaya yaz, (yol, sha256) döndür
+    
+    Bellekte aynı anda en fazla bir parça tutulur; limit aşıldığı anda
+    yazma durur ve geçici dosya silinir.
+    """
+    check_declared_size(file, max_size, too_large_detail)
+    
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    tmp_path = tmp.name
+    hasher = hashlib.sha256()
+    total = 0
+    
+    def write_chunk(chunk: bytes):
+        tmp.write(chunk)
+        hasher.update(chunk)
+    
+    try:
+        with tmp:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                total += len(chunk)
+                if total > max_size:
+                    raise HTTPException(status_code=413, detail=too_large_detail)
+                
+                # Disk yazımı ve hash event loop'u bloklamasın
+                await asyncio.to_thread(write_chunk, chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    
+    return tmp_path, hasher.hexdigest()
+
+
+def is_video_upload(file: UploadFile) -> bool:
+    """Uzantıdan video olup olmadığını belirle (gövde okunmadan)"""
+    return Path(file.filename or '').suffix.lower() in SUPPORTED_VIDEO_FORMATS
+
+
+def check_format(filename: Optional[str]) -> Tuple[str, bool]:
+    """Uzantıyı doğrula, (uzantı, video mu) döndür"""
+    file_ext = Path(filename or '').suffix.lower()
+    if file_ext in SUPPORTED_VIDEO_FORMATS:
+        return file_ext, True
+    if file_ext in SUPPORTED_IMAGE_FORMATS:
+        return file_ext, False
+    raise HTTPException(
+        status_code=400,
+        detail=f"Unsupported format. Supported: {SUPPORTED_IMAGE_FORMATS + SUPPORTED_VIDEO_FORMATS}"
+    )
+
+
+def _record_ingest(is_video: bool, start: float, size: int):
+    media = 'video' if is_video else 'image'
+    STAGE_DURATION.observe(time.perf_counter() - start, media=media, stage='upload')
+    BYTES_INGESTED.inc(size, media=media)
+
+
+async def ingest_upload(file: UploadFile) -> Upload:
+    """Format kontrolü yap ve Starlette'in parse ettiği upload'ı tipine göre al (batch)"""
+    file_ext, is_video = check_format(file.filename)
+    
+    start = time.perf_counter()
+    if not is_video:
+        # Görüntüler bellekte kalır: tempfile yok, decode ve metadata aynı buffer'dan
+        data, digest = await read_upload(file, MAX_IMAGE_SIZE, IMAGE_TOO_LARGE)
+        upload = Upload(file.filename, file_ext, False, digest, data=data)
+        size = len(data)
+    else:
+        # Videolar parça parça geçici dosyaya yazılır (limit aşılırsa erken red)
+        path, digest = await save_upload(file, file_ext, MAX_VIDEO_SIZE, VIDEO_TOO_LARGE)
+        upload = Upload(file.filename, file_ext, True, digest, path=path)
+        size = os.path.getsize(path)
+    
+    _record_ingest(is_video, start, size)
+    return upload
+
+
+class FormUploadReader:
+    """Starlette'in zaten parse ettiği UploadFile için aynı open()/receive() arayüzü (batch)"""
+    
+    def __init__(self, file: UploadFile):
+        self.file = file
+        self.filename = file.filename
+        self.is_video = False
+    
+    async def open(self) -> bool:
+        _, self.is_video = check_format(self.filename)
+        return self.is_video
+    
+    async def receive(self) -> Upload:
+        return await ingest_upload(self.file)
+
+
+class MultipartUploadReader:
+    """
+    Tek dosyalı multipart gövdeyi request.stream() üzerinden akarken ayrıştır
+    
+    Starlette'in form parse'ı gövdeyi önce kendi spool dosyasına yazar; burada
+    dosya parçası doğrudan son yerine (görüntü: bellek, video: geçici dosya)
+    akar ve tip limiti byte'lar gelirken uygulanır. open() dosya parçasının
+    başlıklarına kadar okur - tip belli olur, kabul slotu gövde okunmadan
+    alınabilir; receive() veriyi ve gövdenin kalanını okur. Metin alanları
+    (ör. callback_url) fields'a toplanır.
+    """
+    
+    def __init__(self, request: Request, field: str = 'file'):
+        self.request = request
+        self.field = field
+        self.filename: Optional[str] = None
+        self.file_ext = ''
+        self.is_video = False
+        self.fields: Dict[str, str] = {}
+        self._stream = request.stream()
+        self._events = deque()  # ('part', (ad, dosya adı)) | ('data', bytes) | ('end', None)
+        self._parser: Optional[MultipartParser] = None
+        self._finished = False
+        self._header_field = b''
+        self._header_value = b''
+        self._disposition = b''
+    
+    # --- Parser callback'leri: olaylar bir sonraki gövde parçası okunana kadar kuyrukta ---
+    
+    def _on_part_begin(self):
+        self._disposition = b''
+    
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+    
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+    
+    def _on_header_end(self):
+        if self._header_field.lower() == b'content-disposition':
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b''
+    
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b'name', b'').decode('utf-8', 'replace')
+        filename = options.get(b'filename')
+        self._events.append(('part', (name, None if filename is None
+                                      else filename.decode('utf-8', 'replace'))))
+    
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        self._events.append(('data', data[start:end]))
+    
+    def _on_part_end(self):
+        self._events.append(('end', None))
+    
+    def _create_parser(self) -> MultipartParser:
+        content_type, options = parse_options_header(self.request.headers.get('content-type'))
+        boundary = options.get(b'boundary')
+        if content_type != b'multipart/form-data' or not boundary:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        return MultipartParser(boundary, {
+            'on_part_begin': self._on_part_begin,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end
+        })
+    
+    async def _next_event(self) -> Tuple[str, object]:
+        """Sıradaki olay; gövde bittiyse ('eof', None)"""
+        while not self._events:
+            if self._finished:
+                return 'eof', None
+            try:
+                chunk = await self._stream.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+            try:
+                if chunk is None:
+                    self._finished = True
+                    self._parser.finalize()
+                elif chunk:
+                    self._parser.write(chunk)
+            except FormParserError:
+                raise HTTPException(status_code=400, detail="Invalid multipart data")
+        return self._events.popleft()
+    
+    async def _read_field(self) -> str:
+        """Metin alanının değerini oku (tüm alanlar MULTIPART_OVERHEAD ile sınırlı)"""
+        value = bytearray()
+        while True:
+            kind, payload = await self._next_event()
+            if kind != 'data':
+                break
+            value += payload
+            if sum(map(len, self.fields.values())) + len(value) > MULTIPART_OVERHEAD:
+                raise HTTPException(status_code=413, detail="Form fields too large")
+        return value.decode('utf-8', 'replace')
+    
+    async def open(self) -> bool:
+        """Dosya parçasının başlıklarına kadar oku, formatı doğrula; video mu döndür"""
+        self._parser = self._create_parser()
+        while True:
+            kind, payload = await self._next_event()
+            if kind == 'eof':
+                raise HTTPException(status_code=400, detail=f"Missing '{self.field}' file field")
+            if kind != 'part':
+                continue
+            name, filename = payload
+            if filename is None:
+                self.fields[name] = await self._read_field()
+            elif name == self.field:
+                break
+            else:
+                raise HTTPException(status_code=400, detail=f"Unexpected file field '{name}'")
+        
+        self.filename = filename
+        self.file_ext, self.is_video = check_format(filename)
+        
+        # Bildirilen gövde tip limitini zaten aşıyorsa veri okunmadan reddet
+        max_size, detail = self._limit()
+        declared = self.request.headers.get('content-length', '')
+        if declared.isdigit() and int(declared) > max_size + MULTIPART_OVERHEAD:
+            raise HTTPException(status_code=413, detail=detail)
+        return self.is_video
+    
+    def _limit(self) -> Tuple[int, str]:
+        return (MAX_VIDEO_SIZE, VIDEO_TOO_LARGE) if self.is_video else (MAX_IMAGE_SIZE, IMAGE_TOO_LARGE)
+    
+    async def _read_file(self, write) -> int:
+        """Dosya parçasını UPLOAD_CHUNK_SIZE'lık bloklarla write'a ver; limit aşılırsa 413"""
+        max_size, detail = self._limit()
+        total = 0
+        block = bytearray()
+        while True:
+            kind, payload = await self._next_event()
+            if kind == 'data':
+                total += len(payload)
+                if total > max_size:
+                    raise HTTPException(status_code=413, detail=detail)
+                block += payload
+                if len(block) < UPLOAD_CHUNK_SIZE:
+                    continue
+            elif kind == 'eof':
+                raise HTTPException(status_code=400, detail="Invalid multipart data")
+            if block:
+                await write(bytes(block))
+                block.clear()
+            if kind == 'end':
+                return total
+    
+    async def receive(self) -> Upload:
+        """Dosya verisini ve kalan alanları oku; open()'dan sonra çağrılır"""
+        start = time.perf_counter()
+        hasher = hashlib.sha256()
+        
+        if not self.is_video:
+            # Görüntüler bellekte kalır: tempfile yok, decode ve metadata aynı buffer'dan
+            chunks = []
+            
+            async def write(block: bytes):
+                chunks.append(block)
+                hasher.update(block)
+            
+            size = await self._read_file(write)
+            await self._read_rest()
+            upload = Upload(self.filename, self.file_ext, False, hasher.hexdigest(),
+                            data=b''.join(chunks))
+        else:
+            # Videolar doğrudan son geçici dosyaya yazılır
+            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=self.file_ext)
+            
+            def write_block(block: bytes):
+                tmp.write(block)
+                hasher.update(block)
+            
+            async def write(block: bytes):
+                # Disk yazımı ve hash event loop'u bloklamasın
+                await asyncio.to_thread(write_block, block)
+            
+            try:
+                with tmp:
+                    size = await self._read_file(write)
+                await self._read_rest()
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+            upload = Upload(self.filename, self.file_ext, True, hasher.hexdigest(), path=tmp.name)
+        
+        _record_ingest(self.is_video, start, size)
+        return upload
+    
+    async def _read_rest(self):
+        """Dosyadan sonraki metin alanlarını oku (ikinci dosya reddedilir)"""
+        while True:
+            kind, payload = await self._next_event()
+            if kind == 'eof':
+                return
+            if kind != 'part':
+                continue
+            name, filename = payload
+            if filename is not None:
+                raise HTTPException(status_code=400, detail="Only one file is allowed")
+            self.fields[name] = await self._read_field()
+
+
+class UploadSizeLimitMiddleware:
+    """
+    İstek gövdesini multipart parser'dan önce sınırla
+    
+    Content-Length limiti aşıyorsa gövde hiç okunmadan, chunked
+    isteklerde ise akan byte sayısı limiti geçtiği anda 413 döner.
+    """
+    
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+    
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get('path')) if scope['type'] == 'http' else None
+        if limit is None or scope.get('method') != 'POST':
+            await self.app(scope, receive, send)
+            return
+        
+        content_length = dict(scope['headers']).get(b'content-length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send)
+            return
+        
+        received = 0
+        exceeded = False
+        rejected = False
+        
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {'type': 'http.disconnect'}
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    # Parser okumayı bıraksın; yanıtı aşağıda 413 ile değiştiriyoruz
+                    exceeded = True
+                    return {'type': 'http.disconnect'}
+            return message
+        
+        async def guarded_send(message):
+            nonlocal rejected
+            if not exceeded:
+                await send(message)
+            elif not rejected:
+                rejected = True
+                await self._reject(scope, receive, send)
+        
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not rejected:
+            await self._reject(scope, receive, send)
+    
+    @staticmethod
+    async def _reject(scope, receive, send):
+        response = JSONResponse(status_code=413, content={'detail': "Upload too large"})
+        await response(scope, receive, send)
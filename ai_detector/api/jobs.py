@@ -0,0 +1,373 @@
+"""Asenkron analiz işleri - uzun video analizleri için kuyruk ve sonuç deposu"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException
+
+from ..config import (
+    JOB_WORKERS, JOB_MAX_QUEUE, JOB_MAX_RETAINED, JOB_RESULT_TTL, JOB_CALLBACK_TIMEOUT,
+    JOB_CALLBACK_ALLOWED_HOSTS
+)
+from ..planner import AnalysisPlan
+from ..results import DETAIL_FULL
+from ..utils import serializer
+from .admission import admission_controller
+from .ingest import Upload
+
+logger = logging.getLogger(__name__)
+
+# İş durumları
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_callback_url(url: str):
+    """
+    Webhook adresini doğrula (SSRF'e karşı)
+    
+    Allowlist tanımlıysa host onda olmalı; değilse host'un çözüldüğü tüm
+    adresler genel olmalı (loopback, özel, link-local ve metadata adresleri
+    reddedilir). İşin sonunda gönderimden hemen önce tekrar çağrılır.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise HTTPException(status_code=400, detail="callback_url must be an http(s) URL")
+    
+    host = parsed.hostname.lower()
+    if JOB_CALLBACK_ALLOWED_HOSTS:
+        if host not in JOB_CALLBACK_ALLOWED_HOSTS:
+            raise HTTPException(status_code=400, detail="callback_url host is not allowed")
+        return
+    
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or None,
+                                                               proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, ValueError):
+        raise HTTPException(status_code=400, detail="callback_url host cannot be resolved")
+    if not addresses or not all(_is_public_address(address) for address in addresses):
+        raise HTTPException(status_code=400, detail="callback_url must resolve to a public address")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Webhook yönlendirmelerini izleme - 3xx hata olarak döner"""
+    
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class Job:
+    """Tek analiz işi"""
+    
+    def __init__(self, filename: str, plan: AnalysisPlan, detail: str = DETAIL_FULL,
+                 callback_url: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.plan = plan
+        self.detail = detail
+        self.callback_url = callback_url
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[Dict] = None
+        self.callback_status: Optional[str] = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+    
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'fast_mode': self.plan.profile == 'quick',
+            'profile': self.plan.profile,
+            'analyzers': list(self.plan.analyzers) if self.plan.analyzers else None,
+            'detail': self.detail,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+            'callback_url': self.callback_url,
+            'callback_status': self.callback_status
+        }
+
+
+class JobStore(ABC):
+    """İş deposu arayüzü - farklı backend'ler (Redis, DB) bunu uygular"""
+    
+    @abstractmethod
+    def save(self, job: Job):
+        """İşi ekle ya da güncelle"""
+    
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """İşi döndür (yoksa ya da süresi dolduysa None)"""
+    
+    @abstractmethod
+    def delete(self, job_id: str):
+        """İşi sil"""
+    
+    def stats(self) -> Dict:
+        return {}
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Process içi depo - biten işler sayı ve süre ile sınırlı tutulur
+    
+    Biten işler bitiş sırasıyla ayrı bir OrderedDict'te izlenir; budama
+    yalnızca kayıtta ve en eski uçtan yapılır, durum sorgusu (get) O(1).
+    """
+    
+    def __init__(self, max_retained: int = JOB_MAX_RETAINED, ttl_seconds: float = JOB_RESULT_TTL):
+        self.max_retained = max_retained
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, float]" = OrderedDict()  # İş id -> bitiş zamanı
+    
+    def save(self, job: Job):
+        self._jobs[job.id] = job
+        if job.finished and job.id not in self._finished:
+            self._finished[job.id] = job.finished_at
+        self._prune()
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and self._expired(job_id):
+            self.delete(job_id)
+            return None
+        return job
+    
+    def delete(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._finished.pop(job_id, None)
+    
+    def _expired(self, job_id: str) -> bool:
+        finished_at = self._finished.get(job_id)
+        return finished_at is not None and finished_at + self.ttl_seconds < time.time()
+    
+    def _prune(self):
+        """Süresi dolan ve limit dışında kalan biten işleri at (aktif işlere dokunma)"""
+        while self._finished:
+            oldest = next(iter(self._finished))
+            if len(self._finished) <= self.max_retained and not self._expired(oldest):
+                break
+            self.delete(oldest)
+    
+    def stats(self) -> Dict:
+        return {'retained': len(self._jobs)}
+
+
+class JobManager:
+    """Process içi iş kuyruğu ve worker'ları"""
+    
+    def __init__(self, store: Optional[JobStore] = None, workers: int = JOB_WORKERS,
+                 max_queue: int = JOB_MAX_QUEUE):
+        self.store = store or InMemoryJobStore()
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+        self._uploads: Dict[str, Upload] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()  # Kullanıcının iptal ettiği çalışan işler
+    
+    async def start(self):
+        """Worker görevlerini başlat"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        """Worker'ları durdur, bekleyen upload'ları temizle"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        
+        for upload in self._uploads.values():
+            upload.cleanup()
+        self._uploads.clear()
+    
+    async def submit(self, upload: Upload, plan: AnalysisPlan, detail: str = DETAIL_FULL,
+                     callback_url: Optional[str] = None) -> Job:
+        """
+        İşi kuyruğa al ve hemen döndür
+        
+        Görüntü upload'ları kuyrukta diskte bekler; bellekte yalnızca çalışan
+        işlerin görüntüleri bulunur.
+        """
+        if self._queue is None:
+            raise HTTPException(status_code=503, detail="Job queue is not running")
+        if self._queue.full():
+            raise HTTPException(status_code=503, detail="Job queue is full, please retry later",
+                                headers={'Retry-After': '5'})
+        
+        await asyncio.to_thread(upload.spool)
+        job = Job(upload.filename, plan, detail, callback_url)
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Job queue is full, please retry later",
+                                headers={'Retry-After': '5'})
+        
+        self._uploads[job.id] = upload
+        self.store.save(job)
+        return job
+    
+    def get(self, job_id: str) -> Job:
+        job = self.store.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    
+    def cancel(self, job_id: str) -> Job:
+        """Bekleyen işi iptal et; çalışan işin sonucunu bekleme"""
+        job = self.get(job_id)
+        if job.finished:
+            return job
+        
+        task = self._running.get(job_id)
+        if task is not None:
+            # Worker iptali (kapanış) ile ayırt etmek için işaretle
+            self._cancelled.add(job_id)
+            task.cancel()
+        
+        self._finish(job, CANCELLED)
+        # Kuyruktaki işin upload'ı burada, çalışanınki worker'da temizlenir
+        upload = self._uploads.pop(job_id, None)
+        if upload is not None:
+            upload.cleanup()
+        return job
+    
+    def _finish(self, job: Job, status: str, result: Optional[Dict] = None,
+                error: Optional[Dict] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        self.store.save(job)
+    
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self.store.get(job_id)
+            upload = self._uploads.pop(job_id, None)
+            
+            if job is None or job.finished or upload is None:
+                if upload is not None:
+                    upload.cleanup()
+                continue
+            
+            try:
+                await self._run(job, upload)
+            except asyncio.CancelledError:
+                # Worker durduruluyor (kapanış) - yarıda kalan iş askıda kalmasın
+                if not job.finished:
+                    self._finish(job, FAILED,
+                                 error={'status_code': 503, 'detail': "Server shutting down"})
+                raise
+            finally:
+                upload.cleanup()
+            
+            if job.callback_url:
+                await self._notify(job)
+    
+    async def _run(self, job: Job, upload: Upload):
+        """İşi /detect ile aynı kabul slotlarından biriyle çalıştır"""
+        # Döngüsel import'u önlemek için geç import
+        from .routes import run_analysis, _finalize_result
+        
+        async with admission_controller.slot(upload.is_video, background=True):
+            if job.finished:
+                return  # Slot beklerken iptal edildi
+            await asyncio.to_thread(upload.load)
+            
+            job.status = RUNNING
+            job.started_at = time.time()
+            self.store.save(job)
+            
+            task = asyncio.create_task(run_analysis(upload, job.plan, detail=job.detail))
+            self._running[job.id] = task
+            try:
+                result = await task
+                self._finish(job, COMPLETED,
+                             result=_finalize_result(result, job.filename, job.started_at,
+                                                     upload.is_video))
+            except asyncio.CancelledError:
+                # Yalnızca cancel() ile iptal edilen iş yutulur; worker iptali yükselir
+                if job.id not in self._cancelled:
+                    raise
+            except HTTPException as e:
+                self._finish(job, FAILED, error={'status_code': e.status_code, 'detail': e.detail})
+            except Exception as e:
+                logger.exception("Job %s failed", job.id)
+                self._finish(job, FAILED, error={'status_code': 500, 'detail': str(e)})
+            finally:
+                self._running.pop(job.id, None)
+                self._cancelled.discard(job.id)
+    
+    async def _notify(self, job: Job):
+        """Biten işi webhook'a POST et"""
+        body = serializer.dumps(job.to_dict())
+        request = urllib.request.Request(
+            job.callback_url, data=body, method='POST',
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        def send():
+            # Kayıttan bu yana DNS değişmiş olabilir
+            check_callback_url(job.callback_url)
+            with _callback_opener.open(request, timeout=JOB_CALLBACK_TIMEOUT) as response:
+                return response.status
+        
+        try:
+            status = await asyncio.to_thread(send)
+            job.callback_status = f"delivered ({status})"
+        except HTTPException as e:
+            logger.warning("Job %s callback rejected: %s", job.id, e.detail)
+            job.callback_status = f"failed: {e.detail}"
+        except Exception as e:
+            logger.warning("Job %s callback failed: %s", job.id, e)
+            job.callback_status = f"failed: {e}"
+        self.store.save(job)
+    
+    def stats(self) -> Dict:
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'running': len(self._running),
+            'workers': self.workers,
+            **self.store.stats()
+        }
+
+
+# Uygulama genelinde paylaşılan iş yöneticisi
+job_manager = JobManager()
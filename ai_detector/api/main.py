@@ -1,22 +1,60 @@
 """FastAPI ana uygulama"""
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from typing import List
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
 import tempfile
 import os
 from pathlib import Path
 import time
 
-from .routes import analyze_media, analyze_batch, health_check
-from ..config import SUPPORTED_IMAGE_FORMATS, SUPPORTED_VIDEO_FORMATS
+from .routes import (
+    analyze_media, analyze_batch, stream_batch_ndjson, stream_analysis_sse, health_check,
+    render_metrics, check_detail, build_plan, FastJSONResponse
+)
+from .executor import analysis_executor
+from .admission import admission_controller
+from .ingest import UploadSizeLimitMiddleware, MultipartUploadReader
+from .jobs import job_manager, check_callback_url
+from ..config import (
+    SUPPORTED_IMAGE_FORMATS, SUPPORTED_VIDEO_FORMATS,
+    MAX_VIDEO_SIZE, MULTIPART_OVERHEAD, MAX_BATCH_FILES, MAX_BATCH_BYTES
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Analiz havuzunu uygulama ömrü boyunca açık tut"""
+    analysis_executor.start()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    analysis_executor.shutdown()
+
 
 app = FastAPI(
     title="AI Detection API",
     description="Model-free AI-generated content detection system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Büyük upload'ları gövde parse edilmeden reddet (tip bazlı limit gövde okunurken).
+# CORS'tan önce eklenir: son eklenen middleware en dışta çalışır, 413 yanıtları
+# da CORS başlıklarını taşır ve tarayıcıdaki frontend okuyabilir
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/v1/detect": MAX_VIDEO_SIZE + MULTIPART_OVERHEAD,
+        "/api/v1/detect/stream": MAX_VIDEO_SIZE + MULTIPART_OVERHEAD,
+        "/api/v1/jobs": MAX_VIDEO_SIZE + MULTIPART_OVERHEAD,
+        "/api/v1/detect/batch": MAX_BATCH_BYTES + MULTIPART_OVERHEAD
+    }
 )
 
 # CORS middleware - Frontend bağlantısı için
@@ -45,16 +83,35 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "detect": "/api/v1/detect",
+            "stream": "/api/v1/detect/stream",
             "batch": "/api/v1/detect/batch",
-            "health": "/api/v1/health"
+            "jobs": "/api/v1/jobs",
+            "health": "/api/v1/health",
+            "metrics": "/metrics"
         }
     }
 
 
-@app.post("/api/v1/detect")
+def _upload_body(*fields: str) -> dict:
+    """Gövdeyi akışla okuyan endpoint'lerin OpenAPI multipart şeması"""
+    properties = {'file': {'type': 'string', 'format': 'binary'}}
+    properties.update({name: {'type': 'string'} for name in fields})
+    schema = {'type': 'object', 'required': ['file'], 'properties': properties}
+    return {'requestBody': {'required': True,
+                            'content': {'multipart/form-data': {'schema': schema}}}}
+
+
+@app.post("/api/v1/detect", openapi_extra=_upload_body())
 async def detect_endpoint(
-    file: UploadFile = File(...),
-    fast_mode: bool = False
+    request: Request,
+    fast_mode: bool = False,
+    timings: bool = False,
+    detail: str = "full",
+    cascade: bool = False,
+    profile: Optional[str] = None,
+    analyzers: Optional[str] = None,
+    budget_ms: Optional[float] = None,
+    motion_engine: Optional[str] = None
 ):
     """
     Tek dosya analizi
@@ -62,24 +119,166 @@ async def detect_endpoint(
     Parameters:
     - file: Image or video file
     - fast_mode: Skip expensive tests (optional)
+    - timings: Add per-analyzer / sub-test wall, CPU and peak memory profile (optional)
+    - detail: 'full' (default) or 'summary' (no analysis_details)
+    - cascade: Run analyzers cheap-to-expensive, stop once the verdict can no longer change (optional)
+    - profile: 'quick', 'standard' or 'forensic' (overrides fast_mode; forensic never skips analyzers)
+    - analyzers: Comma-separated analyzers to run instead of the profile (e.g. metadata,frequency)
+    - budget_ms: Latency budget; highest-value analyzers whose estimated cost fits are run
+    - motion_engine: 'dense' (Farneback) or 'sparse' (Lucas-Kanade feature tracking; profile default)
+    """
+    check_detail(detail)
+    plan = build_plan(fast_mode, profile, analyzers, budget_ms, cascade, motion_engine)
+    reader = MultipartUploadReader(request)
+    result = await analyze_media(reader, plan, timings, detail)
+    return FastJSONResponse(result, media='video' if reader.is_video else 'image')
+
+
+@app.post("/api/v1/detect/stream", openapi_extra=_upload_body())
+async def detect_stream_endpoint(
+    request: Request,
+    fast_mode: bool = False,
+    detail: str = "full",
+    cascade: bool = False,
+    profile: Optional[str] = None,
+    analyzers: Optional[str] = None,
+    budget_ms: Optional[float] = None,
+    motion_engine: Optional[str] = None
+):
+    """
+    Tek dosya analizi - ilerleme Server-Sent Events olarak
+    
+    Parameters:
+    - file: Image or video file
+    - fast_mode: Skip expensive tests (optional)
+    - detail: 'full' (default) or 'summary' (no analysis_details in the result event)
+    - cascade: Stop once the verdict can no longer change (optional)
+    - profile: 'quick', 'standard' or 'forensic' (overrides fast_mode; forensic never skips analyzers)
+    - analyzers: Comma-separated analyzers to run instead of the profile (e.g. metadata,frequency)
+    - budget_ms: Latency budget; highest-value analyzers whose estimated cost fits are run
+    - motion_engine: 'dense' (Farneback) or 'sparse' (Lucas-Kanade feature tracking; profile default)
+    
+    Events: started, progress (per analyzer / frame extraction), result | error
     """
-    return await analyze_media(file, fast_mode)
+    check_detail(detail)
+    plan = build_plan(fast_mode, profile, analyzers, budget_ms, cascade, motion_engine)
+    start_time = time.time()
+    # Kabul ve upload hataları (429/503/400/413) stream başlamadan normal HTTP hatası olarak döner
+    reader = MultipartUploadReader(request)
+    ticket = await admission_controller.acquire(await reader.open())
+    try:
+        upload = await reader.receive()
+    except BaseException:
+        ticket.release()
+        raise
+    
+    # Stream hiç başlamazsa (istemci erken koparsa) slot background task ile bırakılır
+    return StreamingResponse(
+        stream_analysis_sse(upload, plan, start_time, ticket, detail),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        background=BackgroundTask(ticket.release)
+    )
 
 
 @app.post("/api/v1/detect/batch")
 async def detect_batch_endpoint(
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    fast_mode: bool = True,
+    stream: bool = False,
+    detail: str = "full",
+    cascade: bool = False,
+    profile: Optional[str] = None,
+    analyzers: Optional[str] = None,
+    budget_ms: Optional[float] = None,
+    motion_engine: Optional[str] = None
 ):
     """
-    Batch analiz (max 10 dosya)
+    Batch analiz (eşzamanlı, max MAX_BATCH_FILES dosya)
     
     Parameters:
     - files: Array of image/video files
+    - fast_mode: Skip expensive tests (default: true)
+    - stream: Return NDJSON, one line per file as soon as it finishes
+    - detail: 'full' (default) or 'summary' (no analysis_details)
+    - cascade: Stop each analysis once its verdict can no longer change (optional)
+    - profile: 'quick', 'standard' or 'forensic' (overrides fast_mode; forensic never skips analyzers)
+    - analyzers: Comma-separated analyzers to run instead of the profile (e.g. metadata,frequency)
+    - budget_ms: Latency budget; highest-value analyzers whose estimated cost fits are run (per file)
+    - motion_engine: 'dense' (Farneback) or 'sparse' (Lucas-Kanade feature tracking; profile default)
     """
-    if len(files) > 10:
-        raise HTTPException(status_code=400, detail="Maximum 10 files allowed")
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_FILES} files allowed")
+    check_detail(detail)
+    plan = build_plan(fast_mode, profile, analyzers, budget_ms, cascade, motion_engine)
+    
+    if stream:
+        return StreamingResponse(
+            stream_batch_ndjson(files, plan, detail),
+            media_type="application/x-ndjson"
+        )
     
-    return await analyze_batch(files)
+    return FastJSONResponse(await analyze_batch(files, plan, detail))
+
+
+@app.post("/api/v1/jobs", status_code=202, openapi_extra=_upload_body('callback_url'))
+async def create_job_endpoint(
+    request: Request,
+    fast_mode: bool = False,
+    detail: str = "full",
+    cascade: bool = False,
+    profile: Optional[str] = None,
+    analyzers: Optional[str] = None,
+    budget_ms: Optional[float] = None,
+    motion_engine: Optional[str] = None
+):
+    """
+    Asenkron analiz işi oluştur (uzun videolar için)
+    
+    Parameters:
+    - file: Image or video file
+    - fast_mode: Skip expensive tests (optional)
+    - detail: 'full' (default) or 'summary' (omit analysis_details from the result)
+    - cascade: Stop once the verdict can no longer change (optional)
+    - profile: 'quick', 'standard' or 'forensic' (overrides fast_mode; forensic never skips analyzers)
+    - analyzers: Comma-separated analyzers to run instead of the profile (e.g. metadata,frequency)
+    - budget_ms: Latency budget; highest-value analyzers whose estimated cost fits are run
+    - motion_engine: 'dense' (Farneback) or 'sparse' (Lucas-Kanade feature tracking; profile default)
+    - callback_url: POST the finished job here (optional)
+    """
+    check_detail(detail)
+    plan = build_plan(fast_mode, profile, analyzers, budget_ms, cascade, motion_engine)
+    
+    reader = MultipartUploadReader(request)
+    await reader.open()
+    upload = await reader.receive()
+    try:
+        # Form alanı dosyadan sonra gelebilir - gövde okunduktan sonra doğrulanır
+        callback_url = reader.fields.get('callback_url') or None
+        if callback_url is not None:
+            await asyncio.to_thread(check_callback_url, callback_url)
+        job = await job_manager.submit(upload, plan, detail, callback_url)
+    except BaseException:
+        upload.cleanup()
+        raise
+    
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/api/v1/jobs/{job.id}"
+    }
+
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job_endpoint(job_id: str):
+    """İş durumu ve (bittiyse) sonucu"""
+    return FastJSONResponse(job_manager.get(job_id).to_dict())
+
+
+@app.delete("/api/v1/jobs/{job_id}")
+async def cancel_job_endpoint(job_id: str):
+    """İşi iptal et"""
+    return FastJSONResponse(job_manager.cancel(job_id).to_dict())
 
 
 @app.get("/api/v1/health")
@@ -88,6 +287,12 @@ async def health_endpoint():
     return health_check()
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrikleri"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,193 @@
+"""Prometheus uyumlu metrikler - harici bağımlılık olmadan text exposition formatı"""
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Saniye cinsinden gecikme bucket'ları (küçük görüntüden uzun videoya)
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str]) -> str:
+    if not labelnames:
+        return ''
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class Metric:
+    """Etiketli metrik tabanı"""
+    
+    type_name = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+    
+    def _render_sample(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    """Sadece artan sayaç"""
+    
+    type_name = 'counter'
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def set_total(self, value: float, **labels):
+        """Dış (monoton) sayacın toplamını yansıt - collector'lar için"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(Metric):
+    """Anlık değer"""
+    
+    type_name = 'gauge'
+    
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Kümülatif bucket'lı dağılım (p99 için histogram_quantile ile)"""
+    
+    type_name = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [bucket sayıları..., +Inf], toplam
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+    
+    def _render_sample(self, key, value) -> List[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames + ('le',), key + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrik kaydı; collector'lar render öncesi gauge ve sayaçları günceller"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+    
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Uygulama genelinde paylaşılan kayıt ve metrikler
+registry = MetricsRegistry()
+
+ANALYSES = registry.counter(
+    'ai_detector_analyses_total', 'Completed analyses by media type and verdict',
+    ('media', 'verdict')
+)
+REQUEST_DURATION = registry.histogram(
+    'ai_detector_request_duration_seconds', 'End-to-end analysis request latency', ('media',)
+)
+STAGE_DURATION = registry.histogram(
+    'ai_detector_stage_duration_seconds',
+    'Latency per stage (upload, decode, analyzer class, scoring, serialization)',
+    ('media', 'stage')
+)
+BYTES_INGESTED = registry.counter(
+    'ai_detector_ingested_bytes_total', 'Uploaded bytes accepted for analysis', ('media',)
+)
+VIDEO_FRAMES_DECODED = registry.histogram(
+    'ai_detector_video_frames_decoded', 'Frames decoded per video',
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+CACHE_LOOKUPS = registry.counter(
+    'ai_detector_cache_lookups_total', 'Result cache lookups by outcome', ('result',)
+)
+CACHE_HIT_RATIO = registry.gauge('ai_detector_cache_hit_ratio', 'Result cache hit ratio')
+IN_FLIGHT = registry.gauge(
+    'ai_detector_in_flight', 'In-flight work by component', ('component',)
+)
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    'ai_detector_admission_queue_depth', 'Requests waiting for an analysis slot', ('media',)
+)
+ADMISSION_SATURATION = registry.gauge(
+    'ai_detector_admission_saturation', 'Active slots / slot limit', ('media',)
+)
+ADMISSION_REJECTED = registry.counter(
+    'ai_detector_admission_rejected_total', 'Requests rejected by admission control', ('media', 'reason')
+)
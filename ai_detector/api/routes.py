@@ -1,300 +1,353 @@
 """API route handlers"""
 
-from fastapi import UploadFile, HTTPException
-from typing import List
-import tempfile
-import os
-from pathlib import Path
+from fastapi import UploadFile
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import queue
 import time
-import cv2
-import numpy as np
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
 
 from ..config import (
-    SUPPORTED_IMAGE_FORMATS, SUPPORTED_VIDEO_FORMATS,
-    MAX_IMAGE_SIZE, MAX_VIDEO_SIZE, VIDEO_FRAME_SAMPLE_RATE,
-    MAX_FRAMES_TO_ANALYZE
+    SUPPORTED_IMAGE_FORMATS, SUPPORTED_VIDEO_FORMATS, BATCH_CONCURRENCY,
+    SSE_POLL_INTERVAL, SSE_KEEPALIVE_INTERVAL, ANALYSIS_PROFILES, DEFAULT_PROFILE, MOTION_ENGINES,
+    IMAGE_ANALYZERS, VIDEO_ANALYZERS
+)
+from ..pipeline import analyze_image_bytes, analyze_video_file
+from ..planner import AnalysisPlan, cost_model
+from ..results import DETAIL_FULL, DETAIL_LEVELS
+from ..utils import serializer
+from .admission import AdmissionTicket, admission_controller
+from .executor import analysis_executor
+from .cache import result_cache
+from .ingest import FormUploadReader, Upload, is_video_upload
+from .jobs import job_manager
+from .metrics import (
+    registry, ANALYSES, REQUEST_DURATION, STAGE_DURATION, VIDEO_FRAMES_DECODED,
+    CACHE_LOOKUPS, CACHE_HIT_RATIO, IN_FLIGHT, ADMISSION_QUEUE_DEPTH,
+    ADMISSION_SATURATION, ADMISSION_REJECTED
 )
-from ..analyzers.watermark import WatermarkDetector
-from ..analyzers.metadata import MetadataAnalyzer
-from ..analyzers.frequency import FrequencyAnalyzer
-from ..analyzers.noise import NoiseAnalyzer
-from ..analyzers.color import ColorAnalyzer
-from ..analyzers.geometry import GeometryAnalyzer
-from ..analyzers.video_temporal import VideoTemporalAnalyzer
-from ..analyzers.video_motion import VideoMotionAnalyzer
-from ..decision.scorer import DecisionEngine
-from ..utils.image_utils import load_image
-
-
-async def analyze_media(file: UploadFile, fast_mode: bool = False):
-    """Tek dosya analizi"""
+
+
+def encode_result(result: dict, media: str) -> bytes:
+    """Analiz sonucunu JSON'a kodla, süreyi 'serialization' aşaması olarak kaydet"""
+    start = time.perf_counter()
+    body = serializer.dumps(result)
+    STAGE_DURATION.observe(time.perf_counter() - start, media=media, stage='serialization')
+    return body
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Tek geçişte kodlanan JSON yanıtı (numpy skalerleri dahil)
+    
+    Endpoint'ler bunu doğrudan döndürür; FastAPI'nin jsonable_encoder
+    dolaşması atlanır. media verilirse içerik tek analiz sonucudur ve
+    kodlama süresi ölçülür.
+    """
+    
+    def __init__(self, content, media: Optional[str] = None, **kwargs):
+        self.media = media
+        super().__init__(content, **kwargs)
+    
+    def render(self, content) -> bytes:
+        if self.media is not None:
+            return encode_result(content, self.media)
+        return serializer.dumps(content)
+
+
+def check_detail(detail: str) -> str:
+    """detail parametresini doğrula"""
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(status_code=400, detail=f"detail must be one of {list(DETAIL_LEVELS)}")
+    return detail
+
+
+def build_plan(fast_mode: bool = False, profile: Optional[str] = None,
+               analyzers: Optional[str] = None, budget_ms: Optional[float] = None,
+               cascade: bool = False, motion_engine: Optional[str] = None) -> AnalysisPlan:
+    """
+    Sorgu parametrelerinden analiz planı kur ve doğrula
+    
+    profile verilmezse fast_mode belirler (quick / standard); analyzers virgülle
+    ayrılmış isim listesidir ve verilirse profilin yerine geçer. motion_engine
+    verilmezse profilin motoru kullanılır.
+    """
+    if profile is None:
+        profile = 'quick' if fast_mode else DEFAULT_PROFILE
+    elif profile not in ANALYSIS_PROFILES:
+        raise HTTPException(status_code=400,
+                            detail=f"profile must be one of {list(ANALYSIS_PROFILES)}")
+    
+    selection = None
+    if analyzers:
+        selection = tuple(dict.fromkeys(name.strip() for name in analyzers.split(',') if name.strip()))
+        known = dict.fromkeys(IMAGE_ANALYZERS + VIDEO_ANALYZERS)
+        unknown = [name for name in selection if name not in known]
+        if unknown:
+            raise HTTPException(status_code=400,
+                                detail=f"Unknown analyzers {unknown}; available: {list(known)}")
+    
+    if budget_ms is not None and budget_ms <= 0:
+        raise HTTPException(status_code=400, detail="budget_ms must be positive")
+    
+    if motion_engine is not None and motion_engine not in MOTION_ENGINES:
+        raise HTTPException(status_code=400,
+                            detail=f"motion_engine must be one of {list(MOTION_ENGINES)}")
+    
+    # Maliyet tahminleri yalnızca bütçe varken gerekir
+    costs = cost_model.snapshot() if budget_ms is not None else None
+    return AnalysisPlan(profile=profile, analyzers=selection, budget_ms=budget_ms,
+                        cascade=cascade, costs=costs, motion_engine=motion_engine)
+
+
+async def analyze_media(reader, plan: AnalysisPlan, timings: bool = False,
+                        detail: str = DETAIL_FULL):
+    """
+    Tek dosya analizi
+    
+    reader: MultipartUploadReader (gövde akarken okunur) ya da FormUploadReader
+    (batch; Starlette gövdeyi zaten spool'ladı).
+    """
     start_time = time.time()
     
-    # Dosya uzantısı kontrolü
-    file_ext = Path(file.filename).suffix.lower()
+    # Tip dosya başlığından belli olur; slot, dosya verisi okunmadan alınır -
+    # yük altında 429/503 gövdeyi belleğe/diske almadan döner
+    async with admission_controller.slot(await reader.open()):
+        upload = await reader.receive()
+        try:
+            result = await run_analysis(upload, plan, timings=timings, detail=detail)
+        finally:
+            upload.cleanup()
     
-    is_video = file_ext in SUPPORTED_VIDEO_FORMATS
-    is_image = file_ext in SUPPORTED_IMAGE_FORMATS
+    return _finalize_result(result, upload.filename, start_time, upload.is_video)
+
+
+async def run_analysis(upload: Upload, plan: AnalysisPlan, progress=None,
+                       timings: bool = False, detail: str = DETAIL_FULL) -> dict:
+    """
+    Cache'e bak, yoksa analizi havuzda çalıştırıp cache'e yaz
     
-    if not (is_video or is_image):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported format. Supported: {SUPPORTED_IMAGE_FORMATS + SUPPORTED_VIDEO_FORMATS}"
-        )
+    timings=True profil ölçümü istediğinden cache okunmaz (sonuç yine yazılır).
+    """
+    media = 'video' if upload.is_video else 'image'
+    cache_key = result_cache.make_key(upload.sha256, media=media, detail=detail,
+                                      **plan.cache_options())
     
-    # Geçici dosyaya kaydet
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-        content = await file.read()
-        
-        # Boyut kontrolü
-        if is_image and len(content) > MAX_IMAGE_SIZE:
-            raise HTTPException(status_code=400, detail="Image too large (max 50MB)")
-        if is_video and len(content) > MAX_VIDEO_SIZE:
-            raise HTTPException(status_code=400, detail="Video too large (max 500MB)")
-        
-        tmp.write(content)
-        tmp_path = tmp.name
+    # Hit: decode dahil hiçbir analiz çalışmaz
+    cached = None if timings else await result_cache.aget(cache_key)
+    if cached is not None:
+        cached['cached'] = True
+        ANALYSES.inc(media=media, verdict=cached.get('verdict', 'unknown'))
+        return cached
     
+    # CPU-yoğun analiz havuzda çalışır, event loop serbest kalır
     try:
-        if is_video:
-            result = analyze_video_file(tmp_path, fast_mode)
+        if upload.is_video:
+            result = await analysis_executor.run(analyze_video_file, upload.path,
+                                                 progress=progress, timings=timings,
+                                                 detail=detail, plan=plan)
         else:
-            result = analyze_image_file(tmp_path, fast_mode)
-        
-        processing_time = (time.time() - start_time) * 1000  # ms
-        result['processing_time_ms'] = round(processing_time, 2)
-        result['filename'] = file.filename
-        
-        return result
-        
-    finally:
-        # Cleanup
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+            result = await analysis_executor.run(analyze_image_bytes, upload.data, upload.file_ext,
+                                                 progress=progress, timings=timings,
+                                                 detail=detail, plan=plan)
+    except HTTPException:
+        ANALYSES.inc(media=media, verdict='error')
+        raise
+    
+    _record_worker_metrics(media, result.pop('_metrics', None))
+    ANALYSES.inc(media=media, verdict=result.get('verdict', 'unknown'))
+    
+    # Profil isteğe özeldir, cache'e girmez
+    profile = result.pop('timings', None)
+    await result_cache.aput(cache_key, result)
+    result['cached'] = False
+    if profile is not None:
+        result['timings'] = profile
+    return result
+
+
+def _record_worker_metrics(media: str, worker_metrics: Optional[dict]):
+    """Worker'ın döndürdüğü aşama sürelerini histogramlara ve maliyet modeline yaz"""
+    if not worker_metrics:
+        return
+    cost_model.observe(media, worker_metrics)
+    for stage, seconds in worker_metrics.get('stages', {}).items():
+        STAGE_DURATION.observe(seconds, media=media, stage=stage)
+    if 'frames_decoded' in worker_metrics:
+        VIDEO_FRAMES_DECODED.observe(worker_metrics['frames_decoded'])
 
 
-def convert_to_native_types(obj):
-    """NumPy ve diğer tipleri Python native tiplerine çevir"""
-    import numpy as np
+def _collect_runtime_metrics():
+    """Scrape anında cache, havuz, kabul ve iş durumunu gauge ve sayaçlara aktar"""
+    cache_stats = result_cache.stats()
+    CACHE_LOOKUPS.set_total(cache_stats['memory_hits'], result='memory_hit')
+    CACHE_LOOKUPS.set_total(cache_stats['disk_hits'], result='disk_hit')
+    CACHE_LOOKUPS.set_total(cache_stats['misses'], result='miss')
+    CACHE_HIT_RATIO.set(cache_stats['hit_ratio'])
     
-    if isinstance(obj, dict):
-        return {key: convert_to_native_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_native_types(item) for item in obj]
-    elif isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
-    elif isinstance(obj, (np.bool_, bool)):
-        return bool(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    else:
-        return obj
-
-
-def analyze_image_file(file_path: str, fast_mode: bool = False):
-    """Görüntü dosyası analizi"""
+    IN_FLIGHT.set(analysis_executor.stats()['in_flight'], component='executor')
+    job_stats = job_manager.stats()
+    IN_FLIGHT.set(job_stats['running'], component='jobs')
+    IN_FLIGHT.set(job_stats['queued'], component='jobs_queued')
+    
+    for media, pool_stats in (('image', admission_controller.image.stats()),
+                              ('video', admission_controller.video.stats())):
+        IN_FLIGHT.set(pool_stats['active'], component=f'{media}_slots')
+        ADMISSION_QUEUE_DEPTH.set(pool_stats['queue_depth'], media=media)
+        ADMISSION_SATURATION.set(pool_stats['saturation'], media=media)
+        ADMISSION_REJECTED.set_total(pool_stats['rejected'], media=media, reason='queue_full')
+        ADMISSION_REJECTED.set_total(pool_stats['timeouts'], media=media, reason='queue_timeout')
+
+
+registry.add_collector(_collect_runtime_metrics)
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition çıktısı"""
+    return registry.render()
+
+
+def _finalize_result(result: dict, filename: str, start_time: float,
+                     is_video: bool = False) -> dict:
+    """İstek bazlı alanları sonuca ekle"""
+    elapsed = time.time() - start_time
+    REQUEST_DURATION.observe(elapsed, media='video' if is_video else 'image')
+    processing_time = elapsed * 1000  # ms
+    result['processing_time_ms'] = round(processing_time, 2)
+    result['filename'] = filename
+    return result
+
+
+async def _analyze_batch_item(file: UploadFile, plan: AnalysisPlan, detail: str) -> dict:
+    """Tek batch öğesi - hatalar sonuç kaydına çevrilir"""
     try:
-        # Load image
-        image = load_image(file_path)
-        
-        # Decision engine
-        engine = DecisionEngine()
-        
-        # 1. Metadata & Watermark (ÖNCELİK #1)
-        metadata_analyzer = MetadataAnalyzer()
-        metadata_result = metadata_analyzer.analyze(file_path, is_video=False)
-        
-        if metadata_result.get('c2pa_synthetic', False):
-            engine.add_detection('c2pa_synthetic', True, "C2PA metadata indicates synthetic origin")
-        
-        if metadata_result.get('metadata_suspicious', False):
-            engine.add_detection('metadata_suspicious', True, "Suspicious metadata patterns")
-        
-        # Watermark detection
-        watermark_detector = WatermarkDetector()
-        watermark_result = watermark_detector.analyze(image)
-        
-        if watermark_result.get('watermark_detected', False):
-            engine.add_detection('watermark_detected', True, 
-                               f"Watermark detected: {', '.join(watermark_result.get('detections', []))}")
-        
-        # 2. Frequency Analysis
-        freq_analyzer = FrequencyAnalyzer()
-        freq_result = freq_analyzer.analyze(image)
-        
-        if freq_result.get('freq_ratio_anomaly', False):
-            engine.add_detection('freq_ratio_anomaly', True, "DCT frequency ratio anomaly")
-        
-        if freq_result.get('checkerboard_pattern', False):
-            engine.add_detection('checkboard_pattern', True, "Diffusion checkerboard pattern detected")
-        
-        # 3. Noise Analysis (skip in fast mode)
-        noise_result = {}
-        if not fast_mode:
-            noise_analyzer = NoiseAnalyzer()
-            noise_result = noise_analyzer.analyze(image)
-            
-            if noise_result.get('noise_variance_low', False):
-                engine.add_detection('noise_variance_low', True, "Unnaturally low noise variance")
-        
-        # 4. Color Analysis
-        color_analyzer = ColorAnalyzer()
-        color_result = color_analyzer.analyze(image)
-        
-        if color_result.get('rgb_correlation_high', False):
-            engine.add_detection('rgb_correlation_high', True, "Abnormally high RGB channel correlation")
-        
-        # 5. Geometry Analysis (skip in fast mode)
-        geom_result = {}
-        if not fast_mode:
-            geom_analyzer = GeometryAnalyzer()
-            geom_result = geom_analyzer.analyze(image)
-            
-            if geom_result.get('edge_fragmented', False):
-                engine.add_detection('edge_fragmented', True, "Fragmented edge patterns")
-        
-        # Calculate verdict
-        verdict_data = engine.calculate_verdict()
-        
-        result = {
-            'verdict': verdict_data['verdict'],
-            'confidence': verdict_data['confidence'],
-            'total_score': verdict_data['total_score'],
-            'scores': verdict_data['scores'],
-            'evidence': verdict_data['evidence'],
-            'analysis_details': {
-                'metadata': metadata_result,
-                'watermark': watermark_result,
-                'frequency': freq_result,
-                'color': color_result
-            }
-        }
-        
-        # Convert all numpy types to native Python types
-        return convert_to_native_types(result)
-        
+        return await analyze_media(FormUploadReader(file), plan, detail=detail)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        return {
+            'filename': file.filename,
+            'error': str(e),
+            'verdict': 'ERROR'
+        }
+    finally:
+        # Spool dosyasını hemen bırak, batch boyunca birikmesin
+        await file.close()
 
 
-def analyze_video_file(file_path: str, fast_mode: bool = False):
-    """Video dosyası analizi"""
+async def iter_batch_results(files: List[UploadFile], plan: AnalysisPlan,
+                             concurrency: int = BATCH_CONCURRENCY, detail: str = DETAIL_FULL
+                             ) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Dosyaları eşzamanlı analiz et, (index, sonuç) çiftlerini bitiş sırasıyla üret
+    
+    Aynı anda en fazla `concurrency` dosya alınır/analiz edilir; yeni görev
+    ancak biri bittiğinde başlar, böylece bellek dosya sayısından bağımsızdır.
+    """
+    pending = {}
+    next_index = 0
+    
     try:
-        # Video metadata
-        metadata_analyzer = MetadataAnalyzer()
-        metadata_result = metadata_analyzer.analyze(file_path, is_video=True)
-        
-        # Decision engine
-        engine = DecisionEngine()
-        
-        if metadata_result.get('metadata_suspicious', False):
-            engine.add_detection('metadata_suspicious', True, "Suspicious video metadata")
-        
-        # Extract frames
-        cap = cv2.VideoCapture(file_path)
-        frames = []
-        frame_count = 0
-        
-        while len(frames) < MAX_FRAMES_TO_ANALYZE:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Sample every Nth frame
-            if frame_count % VIDEO_FRAME_SAMPLE_RATE == 0:
-                # BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frames.append(frame_rgb)
-            
-            frame_count += 1
-        
-        cap.release()
-        
-        if len(frames) == 0:
-            raise HTTPException(status_code=400, detail="Could not extract frames from video")
-        
-        # Analyze first frame (image tests)
-        first_frame = frames[0]
-        
-        # Watermark
-        watermark_detector = WatermarkDetector()
-        watermark_result = watermark_detector.analyze(first_frame)
-        
-        if watermark_result.get('watermark_detected', False):
-            engine.add_detection('watermark_detected', True, "Video watermark detected")
-        
-        # Frequency (first frame)
-        freq_analyzer = FrequencyAnalyzer()
-        freq_result = freq_analyzer.analyze(first_frame)
-        
-        if freq_result.get('checkerboard_pattern', False):
-            engine.add_detection('checkboard_pattern', True, "Diffusion artifacts in video frames")
-        
-        # Temporal analysis
-        temporal_result = {}
-        if len(frames) >= 2:
-            temporal_analyzer = VideoTemporalAnalyzer()
-            temporal_result = temporal_analyzer.analyze(frames)
-            
-            if temporal_result.get('temporal_flicker', False):
-                engine.add_detection('temporal_flicker', True, "Diffusion flicker detected")
-        
-        # Motion analysis (skip in fast mode)
-        motion_result = {}
-        if not fast_mode and len(frames) >= 2:
-            motion_analyzer = VideoMotionAnalyzer()
-            motion_result = motion_analyzer.analyze(frames)
+        while pending or next_index < len(files):
+            while next_index < len(files) and len(pending) < concurrency:
+                task = asyncio.create_task(_analyze_batch_item(files[next_index], plan, detail))
+                pending[task] = next_index
+                next_index += 1
             
-            if motion_result.get('motion_vector_irregular', False):
-                engine.add_detection('motion_vector_irregular', True, "Irregular motion vectors")
-        
-        # Calculate verdict
-        verdict_data = engine.calculate_verdict()
-        
-        result = {
-            'verdict': verdict_data['verdict'],
-            'confidence': verdict_data['confidence'],
-            'total_score': verdict_data['total_score'],
-            'scores': verdict_data['scores'],
-            'evidence': verdict_data['evidence'],
-            'frames_analyzed': len(frames),
-            'analysis_details': {
-                'metadata': metadata_result,
-                'watermark': watermark_result
-            }
-        }
-        
-        # Convert all numpy types to native Python types
-        return convert_to_native_types(result)
-        
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield pending.pop(task), task.result()
+    finally:
+        # İstemci bağlantıyı koparırsa kalan görevleri iptal et
+        for task in pending:
+            task.cancel()
 
 
-async def analyze_batch(files: List[UploadFile]):
-    """Batch analiz"""
-    results = []
+async def analyze_batch(files: List[UploadFile], plan: AnalysisPlan,
+                        detail: str = DETAIL_FULL):
+    """Batch analiz - sonuçlar giriş sırasıyla"""
+    results = [None] * len(files)
     
-    for file in files:
-        try:
-            result = await analyze_media(file, fast_mode=True)
-            results.append(result)
-        except Exception as e:
-            results.append({
-                'filename': file.filename,
-                'error': str(e),
-                'verdict': 'ERROR'
-            })
+    async for index, result in iter_batch_results(files, plan, detail=detail):
+        results[index] = result
     
     return {'results': results, 'total': len(results)}
 
 
+async def stream_batch_ndjson(files: List[UploadFile], plan: AnalysisPlan,
+                              detail: str = DETAIL_FULL) -> AsyncIterator[bytes]:
+    """Batch sonuçlarını biten sırayla NDJSON satırları olarak üret"""
+    async for index, result in iter_batch_results(files, plan, detail=detail):
+        result['index'] = index
+        media = 'video' if is_video_upload(files[index]) else 'image'
+        yield encode_result(result, media) + b'\n'
+
+
+def _sse_event(event: str, data: dict, media: Optional[str] = None) -> bytes:
+    """Tek Server-Sent Event çerçevesi (media: sonuç olayı, kodlama ölçülür)"""
+    payload = encode_result(data, media) if media is not None else serializer.dumps(data)
+    return b"event: " + event.encode('utf-8') + b"\ndata: " + payload + b"\n\n"
+
+
+async def stream_analysis_sse(upload: Upload, plan: AnalysisPlan, start_time: float,
+                              ticket: Optional[AdmissionTicket] = None,
+                              detail: str = DETAIL_FULL) -> AsyncIterator[bytes]:
+    """
+    Analiz ilerlemesini SSE olarak üret
+    
+    Her analyzer bitince 'progress' (ara sonuç + kısmi skor), sonunda
+    'result' veya 'error' olayı gönderilir. İstemci koparsa analiz iptal edilir.
+    """
+    progress = None
+    task = None
+    try:
+        yield _sse_event('started', {'filename': upload.filename, 'is_video': upload.is_video})
+        
+        # Manager başlatmak bloklayıcı olabilir (process modunda ilk çağrı)
+        progress = await asyncio.to_thread(analysis_executor.create_progress_queue)
+        task = asyncio.create_task(run_analysis(upload, plan, progress, detail=detail))
+        
+        last_sent = time.monotonic()
+        while not task.done():
+            try:
+                event = await asyncio.to_thread(progress.get, True, SSE_POLL_INTERVAL)
+            except queue.Empty:
+                # Proxy'lerin bağlantıyı kapatmaması için yorum satırı
+                if time.monotonic() - last_sent >= SSE_KEEPALIVE_INTERVAL:
+                    yield b": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                continue
+            yield _sse_event('progress', event)
+            last_sent = time.monotonic()
+        
+        # Worker dönmeden önce yazılan olayları kaçırma
+        while True:
+            try:
+                event = progress.get_nowait()
+            except queue.Empty:
+                break
+            yield _sse_event('progress', event)
+        
+        try:
+            result = await task
+        except HTTPException as e:
+            yield _sse_event('error', {'status_code': e.status_code, 'detail': e.detail})
+            return
+        except Exception as e:
+            yield _sse_event('error', {'status_code': 500, 'detail': str(e)})
+            return
+        
+        yield _sse_event('result', _finalize_result(result, upload.filename, start_time,
+                                                    upload.is_video),
+                         'video' if upload.is_video else 'image')
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
+        upload.cleanup()
+        if ticket is not None:
+            ticket.release()
+
+
 def health_check():
     """Health check"""
     return {
@@ -303,5 +356,10 @@ def health_check():
         'supported_formats': {
             'images': SUPPORTED_IMAGE_FORMATS,
             'videos': SUPPORTED_VIDEO_FORMATS
-        }
+        },
+        'executor': analysis_executor.stats(),
+        'cache': result_cache.stats(),
+        'jobs': job_manager.stats(),
+        'admission': admission_controller.stats(),
+        'cost_model': cost_model.stats()
     }
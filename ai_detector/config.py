@@ -1,5 +1,7 @@
 """Sistem konfigürasyonu ve sabitler"""
 
+import os
+
 # Desteklenen formatlar
 SUPPORTED_IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.webp']
 SUPPORTED_VIDEO_FORMATS = ['.mp4', '.mov', '.avi']
@@ -8,9 +10,139 @@ SUPPORTED_VIDEO_FORMATS = ['.mp4', '.mov', '.avi']
 MAX_IMAGE_SIZE = 50 * 1024 * 1024  # 50MB
 MAX_VIDEO_SIZE = 500 * 1024 * 1024  # 500MB
 
+# Upload okuma parça boyutu (bytes) - istek başına bellek tavanı
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Multipart başlıkları için Content-Length toleransı
+MULTIPART_OVERHEAD = 64 * 1024  # 64KB
+
 # Video analiz ayarları
-VIDEO_FRAME_SAMPLE_RATE = 10  # Her 10 frame'den 1'ini analiz et
-MAX_FRAMES_TO_ANALYZE = 100
+# Her 10 frame'den 1'ini analiz et
+VIDEO_FRAME_SAMPLE_RATE = int(os.getenv('AI_DETECTOR_VIDEO_SAMPLE_RATE', 10))
+# Örnekleme adımı bu değere ulaşırsa atlanan frame'ler grab() yerine seek ile geçilir
+# (tipik keyframe aralığı 30-250 frame; daha sık örneklemede seek decode'u artırır)
+VIDEO_SEEK_MIN_STEP = int(os.getenv('AI_DETECTOR_VIDEO_SEEK_STEP', 60))
+# Frame'ler akış olarak işlendiğinden bellek bu sınırdan bağımsızdır; süre doğrusal artar
+MAX_FRAMES_TO_ANALYZE = int(os.getenv('AI_DETECTOR_MAX_VIDEO_FRAMES', 100))
+VIDEO_STREAM_WINDOW = 4  # Akış tüketicisi başına kuyruktaki en fazla frame
+# Flicker FFT'si için intensity zaman serisi uzunluğu (son N örneklenen frame)
+VIDEO_FLICKER_WINDOW = int(os.getenv('AI_DETECTOR_VIDEO_FLICKER_WINDOW', 256))
+# Seyrek motion motoru - izlenen özellik sayısı; izlenebilen oran bunun altına düşerse
+# sahne değişimi sayılır ve özellikler yeniden tespit edilir
+MOTION_ENGINES = ('dense', 'sparse')
+SPARSE_MAX_FEATURES = int(os.getenv('AI_DETECTOR_SPARSE_FEATURES', 300))
+SPARSE_SCENE_CHANGE_RATIO = 0.5
+# Motion eşikleri (motora göre; genlik birimi piksel/frame çifti). Seyrek motorun
+# genlikleri sahne kesmesi çiftleri atıldığında kaydırma/ivme/sarsıntı kliplerinde
+# dense ile aynı ölçekte (±%1) ölçüldü, bu yüzden değerler şimdilik aynı
+MOTION_THRESHOLDS = {
+    'dense': {'variance_min': 0.5, 'variance_max': 50.0, 'smoothness_min': 0.1},
+    'sparse': {'variance_min': 0.5, 'variance_max': 50.0, 'smoothness_min': 0.1}
+}
+PROGRESS_FRAME_INTERVAL = 10  # Her 10 örneklenen frame'de bir ilerleme olayı
+SSE_POLL_INTERVAL = 0.5  # saniye - ilerleme kuyruğu bekleme süresi
+SSE_KEEPALIVE_INTERVAL = 15  # saniye
+
+# Çalışma çözünürlüğü - bu sınırı aşan görüntülerde analyzer'lar piramit seviyesi
+# veya tam çözünürlüklü karolar üzerinde çalışır; altındakiler tam kare analiz edilir
+WORKING_RESOLUTION_MP = float(os.getenv('AI_DETECTOR_WORKING_MP', 4.0))
+FULL_RES_TILE_SIZE = 512  # piksel
+FULL_RES_TILE_GRID = 3  # 3x3 karo
+HOMOGENEITY_BLOCK_SIZES = (16, 32, 64)  # Lokal varyans haritası ölçekleri (karar 32 ile)
+
+# GAN grid artefact periyotları (piksel, çift) - karo başlangıçları EKOK'larına hizalanır
+GAN_GRID_PERIODS = tuple(int(p) for p in os.getenv('AI_DETECTOR_GAN_GRID_PERIODS', '8,16').split(','))
+
+# Analiz profilleri - medya tipine göre çalışacak analyzer'lar (çalışma sırasıyla)
+IMAGE_ANALYZERS = ('metadata', 'watermark', 'frequency', 'noise', 'color', 'geometry')
+VIDEO_ANALYZERS = ('metadata', 'watermark', 'frequency', 'temporal', 'motion')
+# motion_engine: 'dense' (Farneback, tam kare) veya 'sparse' (Lucas-Kanade özellik takibi)
+ANALYSIS_PROFILES = {
+    'quick': {  # fast_mode=true ile aynı
+        'image': ('metadata', 'watermark', 'frequency', 'color'),
+        'video': ('metadata', 'watermark', 'frequency', 'temporal', 'motion'),
+        'motion_engine': 'sparse'
+    },
+    'standard': {'image': IMAGE_ANALYZERS, 'video': VIDEO_ANALYZERS, 'motion_engine': 'dense'},
+    'forensic': {'image': IMAGE_ANALYZERS, 'video': VIDEO_ANALYZERS, 'motion_engine': 'dense'}
+}
+DEFAULT_PROFILE = 'standard'
+EXHAUSTIVE_PROFILES = ('forensic',)  # budget_ms ve cascade yok sayılır, hiçbir analyzer atlanmaz
+
+# Analyzer maliyet modeli başlangıç değerleri (ms / birim) - ölçülen sürelerle kalibre edilir
+# Birim: görüntüde megapiksel (decode dışında WORKING_RESOLUTION_MP ile sınırlı); videoda
+# decode için okunan frame x MP, temporal/motion için örneklenen frame x MP, ilk frame
+# testleri için MP; metadata sabit
+DEFAULT_ANALYZER_COSTS = {
+    'image': {'decode': 18.0, 'metadata': 2.0, 'watermark': 55.0, 'frequency': 125.0,
+              'noise': 100.0, 'color': 110.0, 'geometry': 670.0},
+    'video': {'decode': 4.0, 'metadata': 5.0, 'watermark': 55.0, 'frequency': 125.0,
+              'temporal': 80.0, 'motion': 1000.0, 'motion_sparse': 40.0}
+}
+COST_MODEL_ALPHA = 0.2  # EWMA ağırlığı (yeni ölçüm)
+
+# Analiz iş havuzu ayarları
+ANALYSIS_EXECUTOR = os.getenv('AI_DETECTOR_EXECUTOR', 'process')  # 'process' veya 'thread'
+ANALYSIS_WORKERS = int(os.getenv('AI_DETECTOR_WORKERS', os.cpu_count() or 1))
+# İstek içinde bağımsız analyzer'ları paralel çalıştıran thread sayısı (1 = sıralı)
+ANALYZER_THREADS = int(os.getenv('AI_DETECTOR_ANALYZER_THREADS', min(6, os.cpu_count() or 1)))
+# FFT başına thread sayısı (analyzer thread'leriyle birlikte çekirdek sayısını aşmasın)
+FFT_WORKERS = int(os.getenv('AI_DETECTOR_FFT_WORKERS',
+                            max(1, (os.cpu_count() or 1) // max(1, ANALYZER_THREADS))))
+
+# Kabul kontrolü (eşzamanlı analiz slotları ve bekleme kuyruğu)
+ADMISSION_IMAGE_SLOTS = int(os.getenv('AI_DETECTOR_IMAGE_SLOTS', ANALYSIS_WORKERS * 2))
+ADMISSION_VIDEO_SLOTS = int(os.getenv('AI_DETECTOR_VIDEO_SLOTS', max(1, ANALYSIS_WORKERS // 2)))
+# Segmentli video çözümleme: video başına process sayısı (1 = kapalı) - eşzamanlı
+# video slotlarıyla birlikte çekirdek sayısını aşmasın
+VIDEO_SEGMENT_PROCESSES = int(os.getenv('AI_DETECTOR_VIDEO_PROCESSES',
+                                        max(1, (os.cpu_count() or 1) // ADMISSION_VIDEO_SLOTS)))
+VIDEO_SEGMENT_MIN_SAMPLES = 20  # Segment başına en az örnek (daha kısa videolar bölünmez)
+# Segment havuzu process başına sıcak tutulur; bu kadar saniye boşta kalırsa kapatılır
+VIDEO_SEGMENT_IDLE_TIMEOUT = float(os.getenv('AI_DETECTOR_VIDEO_PROCESS_IDLE', 300))
+# Segmentleme maliyeti (ms): soğuk havuzda process başlatma (spawn + numpy/cv2/scipy
+# import) ve segment başına capture açma + seek. Paralel kazanç bunların
+# VIDEO_SEGMENT_MIN_GAIN katını aşmıyorsa video sıralı çözülür
+VIDEO_SEGMENT_SPAWN_MS = 500.0
+VIDEO_SEGMENT_OVERHEAD_MS = 100.0
+VIDEO_SEGMENT_MIN_GAIN = 2.0
+ADMISSION_IMAGE_QUEUE = int(os.getenv('AI_DETECTOR_IMAGE_QUEUE', 64))  # Dolunca 429
+ADMISSION_VIDEO_QUEUE = int(os.getenv('AI_DETECTOR_VIDEO_QUEUE', 8))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('AI_DETECTOR_QUEUE_TIMEOUT', 30))  # saniye, aşılınca 503
+ADMISSION_ADAPTIVE = os.getenv('AI_DETECTOR_ADAPTIVE_ADMISSION', '0') == '1'
+ADMISSION_IMAGE_TARGET_LATENCY = 5.0  # saniye - adaptif modda hedef gecikme
+ADMISSION_VIDEO_TARGET_LATENCY = 60.0
+ADMISSION_MIN_SLOTS = 1
+ADMISSION_ADAPT_INTERVAL = 5  # Her 5 tamamlanan analizde bir limit ayarı
+
+# Batch analiz
+MAX_BATCH_FILES = 500
+# Batch isteğinin toplam gövde sınırı (bytes) - dosya başına sınırlar ayrıca geçerli
+MAX_BATCH_BYTES = int(os.getenv('AI_DETECTOR_MAX_BATCH_BYTES', 2 * 1024 * 1024 * 1024))  # 2GB
+BATCH_CONCURRENCY = int(os.getenv('AI_DETECTOR_BATCH_CONCURRENCY', 4))  # İstek başına paralel dosya
+
+# Asenkron iş kuyruğu
+JOB_WORKERS = int(os.getenv('AI_DETECTOR_JOB_WORKERS', 2))  # Eşzamanlı çalışan iş sayısı
+JOB_MAX_QUEUE = 1000  # Bekleyen iş sayısı (upload'lar diskte bekler)
+JOB_MAX_RETAINED = 1000  # Saklanan biten iş sayısı
+JOB_RESULT_TTL = 60 * 60  # Biten işin sonucu 1 saat saklanır
+JOB_CALLBACK_TIMEOUT = 10  # Webhook zaman aşımı (saniye)
+# Webhook host allowlist'i (virgülle); boşsa yalnızca genel (public) IP'lere çözülen host'lar
+JOB_CALLBACK_ALLOWED_HOSTS = tuple(
+    host.strip().lower() for host in os.getenv('AI_DETECTOR_JOB_CALLBACK_HOSTS', '').split(',')
+    if host.strip()
+)
+
+# Analyzer mantığı değiştiğinde artırın - cache'teki eski sonuçları geçersiz kılar
+ANALYZER_VERSION = "1.4.3"
+
+# Sonuç cache'i (içerik hash'i ile anahtarlanır)
+RESULT_CACHE_ENABLED = os.getenv('AI_DETECTOR_CACHE', '1') != '0'
+RESULT_CACHE_MAX_ENTRIES = 10000
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256MB bellek katmanı
+RESULT_CACHE_TTL = 24 * 60 * 60  # 24 saat
+RESULT_CACHE_DIR = os.getenv('AI_DETECTOR_CACHE_DIR')  # None = disk katmanı kapalı
+RESULT_CACHE_DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB (sıkıştırılmış)
 
 # Watermark template dizini
 WATERMARK_TEMPLATES_DIR = "templates/watermarks"
@@ -0,0 +1,269 @@
+"""Görüntü başına paylaşılan analiz bağlamı - türev temsiller bir kez hesaplanır"""
+
+import math
+import threading
+from typing import Callable, Dict, List, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .config import WORKING_RESOLUTION_MP, FULL_RES_TILE_SIZE, FULL_RES_TILE_GRID, GAN_GRID_PERIODS
+from .utils import spectral
+from .utils.block_stats import BlockStats
+from .utils.image_stats import ImageStats, compute_image_stats, gray_histogram
+from .utils.image_utils import to_grayscale, extract_noise_residual, compute_optical_flow
+
+
+class _Lazy:
+    """İlk erişimde hesaplanıp bağlamda saklanan türev (thread-safe)"""
+    
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+    
+    def __get__(self, ctx, owner=None):
+        if ctx is None:
+            return self
+        
+        cache = ctx._cache
+        if self.name in cache:
+            return cache[self.name]
+        
+        # Aynı türevi iki analyzer aynı anda isterse tek hesaplama yapılır
+        with ctx._locks[self.name]:
+            if self.name not in cache:
+                cache[self.name] = self.func(ctx)
+            return cache[self.name]
+
+
+class AnalysisContext:
+    """
+    Tek görüntü için tüm analyzer'ların paylaştığı bağlam
+    
+    Gri ton, DCT, güç spektrumu (FFT genliği ve autocorrelation bundan
+    türer), gürültü residual'ı, Canny kenarları, HSV, özet ve blok
+    istatistikleri ilk kullanıldıkları anda hesaplanır ve istek boyunca
+    saklanır.
+    Türevler salt okunur kabul edilir; değiştirecek analyzer kopya almalı.
+    
+    Büyük görüntülerde analyzer'lar tam kare yerine iki görünümden birini
+    kullanır: working (WORKING_RESOLUTION_MP'ye sığan piramit seviyesi) ve
+    tiles (tam çözünürlüklü karolar). Sınırın altındaki görüntülerde ikisi de
+    bağlamın kendisidir, yani sonuçlar tam kare analiziyle aynıdır.
+    """
+    
+    def __init__(self, image: np.ndarray):
+        self.image = image
+        self._cache: Dict[str, np.ndarray] = {}
+        self._locks = {name: threading.Lock() for name in DERIVED_FIELDS}
+        self._levels: List["AnalysisContext"] = [self]
+        self._levels_lock = threading.Lock()
+    
+    @classmethod
+    def wrap(cls, image: Union[np.ndarray, "AnalysisContext"]) -> "AnalysisContext":
+        """ndarray verilirse bağlam oluştur, bağlam verilirse aynen döndür"""
+        if isinstance(image, cls):
+            return image
+        return cls(image)
+    
+    @property
+    def shape(self):
+        return self.image.shape
+    
+    @property
+    def megapixels(self) -> float:
+        return self.image.shape[0] * self.image.shape[1] / 1e6
+    
+    def level(self, index: int) -> "AnalysisContext":
+        """Piramit seviyesi (0 = kendisi, her seviye pyrDown ile yarı boyut)"""
+        with self._levels_lock:
+            while len(self._levels) <= index:
+                self._levels.append(AnalysisContext(cv2.pyrDown(self._levels[-1].image)))
+            return self._levels[index]
+    
+    @_Lazy
+    def working(self) -> "AnalysisContext":
+        """WORKING_RESOLUTION_MP'ye sığan ilk piramit seviyesi (renk, simetri, geometri)"""
+        index = 0
+        h, w = self.image.shape[:2]
+        while h * w / 1e6 > WORKING_RESOLUTION_MP and min(h, w) > 1:
+            h, w = (h + 1) // 2, (w + 1) // 2
+            index += 1
+        return self.level(index)
+    
+    @_Lazy
+    def tiles(self) -> List["AnalysisContext"]:
+        """
+        Tam çözünürlüklü karolar (gürültü ve grid artefact testleri)
+        
+        Görüntü sınırı aşıyorsa FULL_RES_TILE_GRID x FULL_RES_TILE_GRID karo
+        eşit aralıklarla alınır. Başlangıçlar GAN_GRID_PERIODS'un EKOK'una
+        hizalanır, böylece blok ızgarasının fazı kaynak görüntüyle aynı kalır.
+        """
+        if self.megapixels <= WORKING_RESOLUTION_MP:
+            return [self]
+        
+        h, w = self.image.shape[:2]
+        tile_h, tile_w = min(h, FULL_RES_TILE_SIZE), min(w, FULL_RES_TILE_SIZE)
+        align = math.lcm(*GAN_GRID_PERIODS)
+        
+        def origins(length, tile):
+            span = length - tile
+            points = np.linspace(0, span, FULL_RES_TILE_GRID) if span > 0 else [0]
+            return sorted({int(p) // align * align for p in points})
+        
+        return [
+            AnalysisContext(np.ascontiguousarray(self.image[y:y + tile_h, x:x + tile_w]))
+            for y in origins(h, tile_h) for x in origins(w, tile_w)
+        ]
+    
+    @_Lazy
+    def gray(self) -> np.ndarray:
+        """uint8 gri ton"""
+        return to_grayscale(self.image)
+    
+    @_Lazy
+    def gray_float(self) -> np.ndarray:
+        """[0, 1] aralığında float32 gri ton"""
+        return np.float32(self.gray) / 255.0
+    
+    @_Lazy
+    def dct(self) -> np.ndarray:
+        """2D DCT (gray_float üzerinden)"""
+        return cv2.dct(self.gray_float)
+    
+    @_Lazy
+    def spectrum(self) -> spectral.Spectrum:
+        """Gri tonun güç spektrumu (float32 rfft2, doldurmasız - autocorrelation ile paylaşılır)"""
+        return spectral.power_spectrum(self.gray)
+    
+    @_Lazy
+    def fft_magnitude(self) -> np.ndarray:
+        """Merkezlenmiş 2D FFT genliği (spectrum'dan)"""
+        return spectral.magnitude(self.spectrum)
+    
+    @_Lazy
+    def autocorrelation(self) -> np.ndarray:
+        """Normalize, merkezlenmiş 2D autocorrelation (spectrum'dan)"""
+        return spectral.autocorrelation(self.spectrum)
+    
+    @_Lazy
+    def gray_hist(self) -> np.ndarray:
+        """Gri ton histogramı (chi-square; image_stats ile paylaşılır)"""
+        return gray_histogram(self.gray)
+    
+    @_Lazy
+    def image_stats(self) -> ImageStats:
+        """Tek geçişte kanal kovaryansı, kanal/satürasyon/gri histogramları"""
+        return compute_image_stats(self.image, self.gray_hist)
+    
+    @_Lazy
+    def block_stats(self) -> BlockStats:
+        """Gri tonun integral image'ları - her blok boyutunda ortalama/varyans haritası"""
+        return BlockStats(self.gray)
+    
+    @_Lazy
+    def noise_residual(self) -> np.ndarray:
+        """Gaussian residual (float32, renkli)"""
+        return extract_noise_residual(self.image)
+    
+    @_Lazy
+    def edges(self) -> np.ndarray:
+        """Canny kenarları (50/150)"""
+        return cv2.Canny(self.gray, 50, 150)
+    
+    @_Lazy
+    def hsv(self) -> np.ndarray:
+        """HSV (OpenCV ölçeği)"""
+        return cv2.cvtColor(self.image, cv2.COLOR_RGB2HSV)
+    
+    def computed(self):
+        """Şu ana kadar hesaplanmış türevler (görünümlerinkiler 'working.gray' gibi)"""
+        names = []
+        for name, value in self._cache.items():
+            names.append(name)
+            if name == 'working' and value is not self:
+                names.extend(f"working.{child}" for child in value.computed())
+            elif name == 'tiles' and value[0] is not self:
+                names.extend(f"tiles.{child}" for child in value[0].computed())
+        return names
+
+
+def pooled(arrays: List[np.ndarray]) -> np.ndarray:
+    """Karolardan gelen dizileri tek örneklemde birleştir (tek karo aynen döner)"""
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.concatenate([array.ravel() for array in arrays])
+
+
+# Analyzer'ların requires ile bildirebileceği türev adları
+DERIVED_FIELDS = tuple(name for name, value in vars(AnalysisContext).items()
+                     if isinstance(value, _Lazy))
+
+
+class VideoFrameContext:
+    """
+    Tek video frame'i için temporal ve motion testlerinin paylaştığı bağlam
+    
+    Frame türevleri (gri ton, gürültü residual'ı ve toplamları, ortalama
+    intensity) ilk erişimde bir kez hesaplanır. Çift türevleri (optical flow)
+    önceki frame'in bağlamı verilerek istenir ve bu frame'de saklanır; bir
+    akışta her frame'in önceki frame'i tektir. Bağlam önceki frame'e referans
+    tutmaz, böylece akışta bellekte yalnızca tüketicilerin elindeki frame'ler
+    kalır.
+    """
+    
+    def __init__(self, image: np.ndarray):
+        self.image = image
+        self._cache: Dict[str, object] = {}
+        self._locks = {name: threading.Lock() for name in VIDEO_FRAME_FIELDS}
+    
+    @classmethod
+    def wrap(cls, image: Union[np.ndarray, "VideoFrameContext"]) -> "VideoFrameContext":
+        """ndarray verilirse bağlam oluştur, bağlam verilirse aynen döndür"""
+        if isinstance(image, cls):
+            return image
+        return cls(image)
+    
+    @_Lazy
+    def gray(self) -> np.ndarray:
+        """uint8 gri ton"""
+        return to_grayscale(self.image)
+    
+    @_Lazy
+    def noise_residual(self) -> np.ndarray:
+        """Gaussian residual (float32, düzleştirilmiş)"""
+        return extract_noise_residual(self.image).ravel()
+    
+    @_Lazy
+    def residual_sums(self) -> Tuple[int, float, float]:
+        """Residual'ın (eleman sayısı, toplam, kare toplam) - float64, kopyasız"""
+        residual = self.noise_residual
+        total = residual.sum(dtype=np.float64)
+        square = np.einsum('i,i->', residual, residual, dtype=np.float64)
+        return residual.size, total, square
+    
+    @_Lazy
+    def intensity(self) -> float:
+        """Ortalama gri ton"""
+        return cv2.mean(self.gray)[0]
+    
+    def _pair(self, name: str, previous: "VideoFrameContext", func: Callable):
+        cache = self._cache
+        if name in cache:
+            return cache[name]
+        with self._locks[name]:
+            if name not in cache:
+                cache[name] = func(previous)
+            return cache[name]
+    
+    def flow_magnitude(self, previous: "VideoFrameContext") -> np.ndarray:
+        """Önceki frame'den bu frame'e Farneback optical flow genliği"""
+        return self._pair('flow_magnitude', previous,
+                          lambda prev: compute_optical_flow(prev.gray, self.gray)[0])
+
+
+# Frame türevleri ve çift türevleri (kilit adları)
+VIDEO_FRAME_FIELDS = tuple(name for name, value in vars(VideoFrameContext).items()
+                           if isinstance(value, _Lazy)) + ('flow_magnitude',)
@@ -1,7 +1,9 @@
 """Decision engine - Scoring and verdict determination"""
 
-from typing import Dict, List, Tuple
-from .thresholds import SCORE_WEIGHTS, get_verdict, get_confidence
+from typing import Dict, Iterable, List, Tuple
+from .thresholds import (
+    SCORE_WEIGHTS, get_verdict, get_confidence, get_verdict_from_confidence
+)
 
 
 class DecisionEngine:
@@ -59,6 +61,34 @@ class DecisionEngine:
             'evidence': self.evidence
         }
     
+    def partial_verdict(self) -> Dict:
+        """Şu ana kadarki skor (ilerleme olayları için, kanıtlar hariç)"""
+        verdict_data = self.calculate_verdict()
+        return {
+            'verdict': verdict_data['verdict'],
+            'confidence': verdict_data['confidence'],
+            'total_score': verdict_data['total_score'],
+            'scores': dict(self.scores)
+        }
+    
+    def score_bounds(self, pending: Iterable[str]) -> Tuple[int, int]:
+        """
+        Ulaşılabilir (en düşük, en yüksek) toplam skor
+        
+        pending: henüz çalışmamış analyzer'ların tetikleyebileceği tespit tipleri.
+        Skorlar yalnızca eklenir, bu yüzden alt sınır mevcut skordur.
+        """
+        low = sum(self.scores.values())
+        high = low + sum(SCORE_WEIGHTS.get(detection, 0)
+                         for detection in set(pending) if detection not in self.scores)
+        return low, high
+    
+    def verdict_settled(self, pending: Iterable[str]) -> bool:
+        """Kalan tespitler hangi sonucu verirse versin karar bandı değişmiyorsa True"""
+        low, high = self.score_bounds(pending)
+        return (get_verdict_from_confidence(get_confidence(low)) ==
+                get_verdict_from_confidence(get_confidence(high)))
+    
     def reset(self):
         """Skorları sıfırla"""
         self.scores = {}
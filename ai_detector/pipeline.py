@@ -0,0 +1,548 @@
+"""Analiz pipeline'ı - görüntü ve video analiz akışları
+
+Bu modül FastAPI'den bağımsızdır; worker process'lerde çalıştırılır.
+"""
+
+import cv2
+import io
+import numpy as np
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .config import VIDEO_FRAME_SAMPLE_RATE, MAX_FRAMES_TO_ANALYZE, ANALYZER_THREADS
+from .analyzers.watermark import WatermarkDetector
+from .analyzers.metadata import MetadataAnalyzer
+from .analyzers.frequency import FrequencyAnalyzer
+from .analyzers.noise import NoiseAnalyzer
+from .analyzers.color import ColorAnalyzer
+from .analyzers.geometry import GeometryAnalyzer
+from .analyzers.video_temporal import VideoTemporalAnalyzer
+from .analyzers.video_motion import VideoMotionAnalyzer
+from .decision.scorer import DecisionEngine
+from .utils.image_utils import decode_image
+from .utils.video_io import FrameSampler, feed_frames
+from .video_segments import plan_segments, measure_segments
+from .context import AnalysisContext, VideoFrameContext, DERIVED_FIELDS
+from .scheduler import Node, run_graph
+from .planner import AnalysisPlan, IMAGE_DETECTIONS, VIDEO_DETECTIONS, expected_video_frames
+from .utils.profiler import NULL_PROFILER, make_profiler
+from .results import AnalysisResult, DETAIL_FULL
+
+# Analyzer'lar durumsuz - process başına tek instance paylaşılır (plan adlarıyla)
+_ANALYZERS = {
+    'metadata': MetadataAnalyzer(),
+    'watermark': WatermarkDetector(),
+    'frequency': FrequencyAnalyzer(),
+    'noise': NoiseAnalyzer(),
+    'color': ColorAnalyzer(),
+    'geometry': GeometryAnalyzer(),
+    'temporal': VideoTemporalAnalyzer(),
+    'motion': VideoMotionAnalyzer()
+}
+
+# Cascade sırası - ucuzdan pahalıya (büyük görüntülerde ölçülen ortalama süre)
+IMAGE_CASCADE_ORDER = ('metadata', 'decode', 'watermark', 'noise', 'color', 'frequency', 'geometry')
+
+
+class AnalysisError(Exception):
+    """Process sınırını geçebilen (picklable) analiz hatası"""
+    
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StageTimer:
+    """
+    Aşama süreleri (wall, saniye) - worker'da toplanır, sonuçla birlikte döner
+    
+    Sonuçtaki '_metrics' anahtarı API katmanında çıkarılıp metriklere yazılır.
+    """
+    
+    def __init__(self, profiler=NULL_PROFILER):
+        self.stages: Dict[str, float] = {}
+        self.analyzers: Dict[str, float] = {}  # Plan adıyla analyzer süreleri (maliyet modeli)
+        self.counters: Dict[str, float] = {}
+        self.profiler = profiler
+    
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            with self.profiler.measure(stage):
+                yield
+        finally:
+            self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+    
+    def attach(self, result: Dict) -> Dict:
+        result['_metrics'] = {'stages': self.stages, 'analyzers': self.analyzers, **self.counters}
+        if self.profiler.enabled:
+            result['timings'] = self.profiler.to_dict()
+        return result
+
+
+def report_progress(progress, stage: str, engine: Optional[DecisionEngine] = None,
+                    result=None, **extra):
+    """
+    İlerleme olayını kuyruğa yaz (progress None ise hiçbir şey yapmaz)
+    
+    progress, put() metodu olan herhangi bir kuyruk olabilir; process
+    havuzunda Manager().Queue() proxy'si, thread havuzunda queue.Queue.
+    """
+    if progress is None:
+        return
+    
+    event = {'stage': stage, **extra}
+    if result is not None:
+        event['result'] = result.to_dict()
+    if engine is not None:
+        event['partial'] = engine.partial_verdict()
+    progress.put(event)
+
+
+def _analyzer_node(name: str, analyzer, timer: StageTimer, inputs: Dict[str, str],
+                   *args, when=None, **kwargs) -> Node:
+    """
+    Analyzer'ı grafik düğümüne çevir
+    
+    analyzer.requires girdileri inputs ile üretici düğümlere eşlenir; eşlenmeyen
+    girdiler (ör. 'source') args ile doğrudan verilir. when(*deps) False ise
+    analyzer çalışmaz ve düğüm None döner.
+    """
+    deps = tuple(dict.fromkeys(inputs[item] for item in analyzer.requires if item in inputs))
+    stage = type(analyzer).__name__
+    analyzer = timer.profiler.instrument(analyzer)
+    
+    def run(*values):
+        if when is not None and not when(*values):
+            return None
+        start = time.perf_counter()
+        with timer.measure(stage):
+            result = analyzer.analyze(*values, *args, **kwargs)
+        timer.analyzers[name] = time.perf_counter() - start
+        return result
+    
+    return Node(name, run, deps)
+
+
+def _stream_consumer(name: str, analyzer, timer: StageTimer, **options):
+    """
+    Akış analyzer'ı için (frame tüketicisi, sonuç düğümü fonksiyonu, akış)
+    
+    Tüketici her frame'i analyzer stage'i altında ölçer; süreler name
+    (maliyet modelindeki ad) ile toplanır. options analyzer.stream'e geçer.
+    Sonuç en az iki frame işlendiyse üretilir, yoksa None. Akış, segmentli
+    çözümlemede ölçümleri doğrudan eklemek (add) için döner.
+    """
+    stage = type(analyzer).__name__
+    stream = timer.profiler.instrument(analyzer.stream(**options))
+    timer.analyzers[name] = 0.0
+    
+    def timed(func, *args):
+        start = time.perf_counter()
+        with timer.measure(stage):
+            value = func(*args)
+        timer.analyzers[name] += time.perf_counter() - start
+        return value
+    
+    def finish(_):
+        if stream.frames < 2:
+            return None
+        return timed(stream.result)
+    
+    return lambda frame: timed(stream.update, frame), finish, stream
+
+
+def _timed_frames(frames, timer: StageTimer):
+    """Frame iterator'ını decode aşaması altında ölçerek ilerlet"""
+    iterator = iter(frames)
+    while True:
+        with timer.measure('decode'):
+            frame = next(iterator, None)
+        if frame is None:
+            return
+        yield frame
+
+
+def _cascade_order(nodes: List[Node], order) -> List[Node]:
+    """Düğümleri cascade sırasına diz (planda olmayanlar atlanır)"""
+    by_name = {node.name: node for node in nodes}
+    return [by_name[name] for name in order if name in by_name]
+
+
+def _cascade_skip(engine: DecisionEngine, remaining: List[Node],
+                  detections: Dict[str, tuple]) -> Optional[List[str]]:
+    """Kalan analyzer'lar kararı değiştiremiyorsa atlanacak analyzer adları, değilse None"""
+    names = [node.name for node in remaining if node.name in detections]
+    pending = [detection for name in names for detection in detections[name]]
+    if engine.verdict_settled(pending):
+        return names
+    return None
+
+
+def _probe_image(data: bytes) -> float:
+    """Decode etmeden görüntü boyutu (megapiksel) - okunamazsa 0"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+    except Exception:
+        return 0.0
+    return width * height / 1e6
+
+
+def _probe_video(file_path: str) -> Tuple[float, int, int]:
+    """Decode etmeden (megapiksel, okunacak frame, örneklenecek frame) tahmini"""
+    cap = cv2.VideoCapture(file_path)
+    try:
+        megapixels = cap.get(cv2.CAP_PROP_FRAME_WIDTH) * cap.get(cv2.CAP_PROP_FRAME_HEIGHT) / 1e6
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+    return (megapixels, *expected_video_frames(max(total_frames, 0)))
+
+
+def analyze_image_file(file_path: str, fast_mode: bool = False, progress=None,
+                       timings: bool = False, detail: str = DETAIL_FULL, cascade: bool = False,
+                       plan: Optional[AnalysisPlan] = None):
+    """Görüntü dosyası analizi"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return analyze_image_bytes(data, Path(file_path).suffix.lower(), fast_mode, progress,
+                               timings, detail, cascade, plan)
+
+
+def analyze_image_bytes(data: bytes, file_ext: str, fast_mode: bool = False, progress=None,
+                        timings: bool = False, detail: str = DETAIL_FULL, cascade: bool = False,
+                        plan: Optional[AnalysisPlan] = None):
+    """
+    Bellekteki görüntü analizi - decode ve metadata aynı buffer üzerinden
+    
+    timings=True ise sonuca analyzer/alt test bazında süre ve bellek profili eklenir;
+    detail='summary' ise analysis_details üretilmez. cascade=True ise analyzer'lar
+    ucuzdan pahalıya sırayla çalışır ve karar bandı kesinleşince kalanlar atlanır.
+    plan verilirse fast_mode ve cascade yerine profil / seçim / bütçe plandan gelir.
+    """
+    plan = plan or AnalysisPlan.from_fast_mode(fast_mode, cascade)
+    profiler = make_profiler(timings)
+    try:
+        timer = StageTimer(profiler)
+        
+        # Bütçe varsa analyzer seçimi decode öncesi, başlıktan okunan boyutla yapılır
+        megapixels = _probe_image(data) if plan.uses_budget else 0.0
+        selected, budget_skipped, estimated_ms = plan.select('image', megapixels)
+        
+        def decode():
+            with timer.measure('decode'):
+                # Türev temsiller (gray, DCT, residual...) tüm analyzer'lar arasında paylaşılır
+                ctx = AnalysisContext(decode_image(data))
+            timer.counters['megapixels'] = ctx.shape[0] * ctx.shape[1] / 1e6
+            return ctx
+        
+        # Metadata yalnızca ham byte'lara bağlı - decode ile eşzamanlı çalışır
+        inputs = dict.fromkeys(('image',) + DERIVED_FIELDS, 'decode')
+        nodes = [Node('decode', decode)]
+        for name in selected:
+            if name == 'metadata':
+                nodes.append(_analyzer_node(name, _ANALYZERS[name], timer, inputs,
+                                            data, is_video=False, file_ext=file_ext))
+            else:
+                nodes.append(_analyzer_node(name, _ANALYZERS[name], timer, inputs))
+        if plan.uses_cascade:
+            nodes = _cascade_order(nodes, IMAGE_CASCADE_ORDER)
+        
+        # Decision engine - sonuçlar düğüm sırasıyla gelir, kanıt sırası sabittir
+        engine = DecisionEngine()
+        results = {}
+        skipped = budget_skipped if (plan.uses_cascade or plan.uses_budget) else None
+        
+        # Cascade her adımdan sonra karar verdiğinden sıralı çalışır
+        graph = run_graph(nodes, parallel=not (profiler.enabled or plan.uses_cascade))
+        for index, (name, result) in enumerate(graph):
+            results[name] = result
+            
+            if name == 'decode':
+                profiler.set_info('image', {
+                    'width': result.shape[1], 'height': result.shape[0], 'bytes': len(data)
+                })
+                continue
+            
+            # 1. Metadata & Watermark (ÖNCELİK #1)
+            if name == 'metadata':
+                if result.c2pa_synthetic:
+                    engine.add_detection('c2pa_synthetic', True, "C2PA metadata indicates synthetic origin")
+                
+                if result.metadata_suspicious:
+                    engine.add_detection('metadata_suspicious', True, "Suspicious metadata patterns")
+            
+            elif name == 'watermark':
+                if result.watermark_detected:
+                    engine.add_detection('watermark_detected', True, 
+                                       f"Watermark detected: {', '.join(result.detections)}")
+            
+            # 2. Frequency Analysis
+            elif name == 'frequency':
+                if result.freq_ratio_anomaly:
+                    engine.add_detection('freq_ratio_anomaly', True, "DCT frequency ratio anomaly")
+                
+                if result.checkerboard_pattern:
+                    engine.add_detection('checkboard_pattern', True, "Diffusion checkerboard pattern detected")
+            
+            # 3. Noise Analysis (skip in fast mode)
+            elif name == 'noise':
+                if result.noise_variance_low:
+                    engine.add_detection('noise_variance_low', True, "Unnaturally low noise variance")
+            
+            # 4. Color Analysis
+            elif name == 'color':
+                if result.rgb_correlation_high:
+                    engine.add_detection('rgb_correlation_high', True, "Abnormally high RGB channel correlation")
+            
+            # 5. Geometry Analysis (skip in fast mode)
+            elif name == 'geometry':
+                if result.edge_fragmented:
+                    engine.add_detection('edge_fragmented', True, "Fragmented edge patterns")
+            
+            report_progress(progress, name, engine, result)
+            
+            if plan.uses_cascade:
+                settled = _cascade_skip(engine, nodes[index + 1:], IMAGE_DETECTIONS)
+                if settled is not None:
+                    skipped = budget_skipped + settled
+                    break
+        
+        if 'decode' in results:
+            profiler.set_info('derived', results['decode'].computed())
+        
+        # Calculate verdict
+        with timer.measure('scoring'):
+            verdict_data = engine.calculate_verdict()
+        
+        result = AnalysisResult(
+            verdict=verdict_data['verdict'],
+            confidence=verdict_data['confidence'],
+            total_score=verdict_data['total_score'],
+            scores=verdict_data['scores'],
+            evidence=verdict_data['evidence'],
+            analysis_details={
+                name: results[name] for name in ('metadata', 'watermark', 'frequency', 'color')
+                if name in results
+            },
+            skipped_analyzers=skipped,
+            estimated_ms=estimated_ms if plan.uses_budget else None
+        )
+        
+        # Sığ dict - numpy skalerleri JSON kodlamasında (utils.serializer) çözülür;
+        # 'serialization' aşaması o kodlamayı API katmanında ölçer
+        result = result.to_dict(detail)
+        return timer.attach(result)
+    
+    except AnalysisError:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise AnalysisError(500, f"Analysis failed: {str(e)}")
+    finally:
+        profiler.stop()
+
+
+def analyze_video_file(file_path: str, fast_mode: bool = False, progress=None,
+                       timings: bool = False, detail: str = DETAIL_FULL, cascade: bool = False,
+                       plan: Optional[AnalysisPlan] = None):
+    """Video dosyası analizi (düğüm sırası zaten ucuzdan pahalıya)"""
+    plan = plan or AnalysisPlan.from_fast_mode(fast_mode, cascade)
+    profiler = make_profiler(timings)
+    try:
+        timer = StageTimer(profiler)
+        
+        units = _probe_video(file_path) if plan.uses_budget else (0.0, 0, 0)
+        selected, budget_skipped, estimated_ms = plan.select('video', *units)
+        
+        # Temporal frame korelasyonu renkli residual kullanır; yoksa frame'ler gri tutulur
+        gray_frames = 'temporal' not in selected
+        parallel = not (profiler.enabled or plan.uses_cascade)
+        opened: List[FrameSampler] = []
+        
+        def on_frames(sampled, frames_read, total_frames):
+            report_progress(progress, 'frames', frames_extracted=sampled,
+                            frames_read=frames_read, total_frames=total_frames)
+        
+        # Akış analyzer'ları frame'leri tek geçişte alır; frame listesi tutulmaz
+        consumers, finishers, streams, stream_options = [], {}, {}, {}
+        for name in selected:
+            if name in ('temporal', 'motion'):
+                options = {'engine': plan.resolved_motion_engine} if name == 'motion' else {}
+                consume, finishers[name], streams[name] = _stream_consumer(
+                    plan.cost_name(name), _ANALYZERS[name], timer, **options)
+                consumers.append(consume)
+                stream_options[name] = options
+        
+        def sampling_done(sampler):
+            first = sampler.first_frame
+            timer.counters['frames_decoded'] = sampler.frames_read
+            timer.counters['frames_sampled'] = sampler.frames_sampled
+            profiler.set_info('video', {
+                'frames_decoded': sampler.frames_read,
+                'frames_sampled': sampler.frames_sampled,
+                'width': first.shape[1],
+                'height': first.shape[0],
+                'gray': gray_frames,
+                'seek': sampler.seek
+            })
+            report_progress(progress, 'frames', frames_extracted=sampler.frames_sampled,
+                            frames_read=sampler.frames_read, total_frames=sampler.total_frames,
+                            done=True)
+        
+        def open_video():
+            with timer.measure('decode'):
+                sampler = FrameSampler(file_path, VIDEO_FRAME_SAMPLE_RATE, MAX_FRAMES_TO_ANALYZE,
+                                       gray=gray_frames, on_progress=on_frames)
+            opened.append(sampler)
+            
+            first = sampler.first_frame
+            if first is None:
+                raise AnalysisError(400, "Could not extract frames from video")
+            timer.counters['megapixels'] = first.shape[0] * first.shape[1] / 1e6
+            if not consumers:
+                sampling_done(sampler)  # Yalnızca tek kare testleri - ilk frame yeterli
+            return sampler
+        
+        def run_segments(sampler, segments):
+            # Segmentler worker process'lerde ölçülür, ölçümler zaman sırasıyla eklenir
+            frames_read = frames_sampled = 0
+            decode_work = measure_work = 0.0
+            opening = timer.stages.get('decode', 0.0)  # İlk frame bu process'te çözüldü
+            start = time.perf_counter()
+            for segment in measure_segments(file_path, VIDEO_FRAME_SAMPLE_RATE, segments,
+                                            gray_frames, stream_options):
+                for name, samples in segment.samples.items():
+                    for sample in samples:
+                        streams[name].add(sample)
+                    timer.analyzers[plan.cost_name(name)] += segment.seconds[name]
+                    measure_work += segment.seconds[name]
+                decode_work += segment.decode_seconds
+                frames_read = max(frames_read, segment.frames_read)
+                frames_sampled += segment.frames_sampled
+                on_frames(frames_sampled, frames_read, sampler.total_frames)
+            # Segmentler paralel: 'decode' aşaması wall süresinin decode payıdır (process
+            # toplamı isteğin süresini aşabilir); toplam maliyet modeli için ayrı raporlanır
+            wall = time.perf_counter() - start
+            work = decode_work + measure_work
+            timer.stages['decode'] = opening + (wall * decode_work / work if work > 0 else wall)
+            timer.counters['decode_work_seconds'] = opening + decode_work
+            # Örnekleyici yalnızca ilk frame'i okudu; sayaçlar segmentlerin toplamı
+            sampler.frames_read, sampler.frames_sampled = frames_read, frames_sampled
+            timer.counters['segments'] = len(segments)
+        
+        def run_streams(sampler):
+            # Örnek başına tahmini iş: adım kadar frame'in decode'u + akış ölçümleri
+            megapixels = timer.counters['megapixels']
+            sample_ms = plan.estimate('video', 'decode', megapixels,
+                                      frames_read=VIDEO_FRAME_SAMPLE_RATE)
+            sample_ms += sum(plan.estimate('video', plan.cost_name(name), megapixels,
+                                           frames_sampled=1) for name in stream_options)
+            segments = [] if profiler.enabled else plan_segments(
+                sampler.total_frames, VIDEO_FRAME_SAMPLE_RATE, MAX_FRAMES_TO_ANALYZE, sample_ms)
+            if segments:
+                run_segments(sampler, segments)
+            else:
+                # Tüketiciler aynı frame bağlamını paylaşır (gri ton, residual, flow bir kez)
+                frames = map(VideoFrameContext, _timed_frames(sampler, timer))
+                feed_frames(frames, consumers,
+                            parallel=parallel and ANALYZER_THREADS > 1)
+            sampling_done(sampler)
+        
+        # Metadata frame çıkarımıyla eşzamanlı; görüntü testleri ilk frame üzerinde
+        inputs = dict.fromkeys(('image',) + DERIVED_FIELDS, 'first_frame')
+        
+        nodes = []
+        if 'metadata' in selected:
+            nodes.append(_analyzer_node('metadata', _ANALYZERS['metadata'], timer, inputs,
+                                        file_path, is_video=True))
+        nodes.append(Node('open', open_video))
+        nodes.append(Node('first_frame', lambda sampler: AnalysisContext(sampler.first_frame),
+                          ('open',)))
+        for name in selected:
+            if name in ('watermark', 'frequency'):
+                nodes.append(_analyzer_node(name, _ANALYZERS[name], timer, inputs))
+        # Akış tek kare testlerinden sonra - cascade kararı oturursa hiç çözülmez
+        if consumers:
+            nodes.append(Node('stream', run_streams, ('open',)))
+        for name in finishers:
+            nodes.append(Node(name, finishers[name], ('stream',)))
+        
+        # Decision engine
+        engine = DecisionEngine()
+        results = {}
+        skipped = budget_skipped if (plan.uses_cascade or plan.uses_budget) else None
+        
+        graph = run_graph(nodes, parallel=parallel)
+        for index, (name, result) in enumerate(graph):
+            results[name] = result
+            if name in ('open', 'first_frame', 'stream') or result is None:
+                continue
+            
+            if name == 'metadata':
+                if result.metadata_suspicious:
+                    engine.add_detection('metadata_suspicious', True, "Suspicious video metadata")
+            
+            elif name == 'watermark':
+                if result.watermark_detected:
+                    engine.add_detection('watermark_detected', True, "Video watermark detected")
+            
+            elif name == 'frequency':
+                if result.checkerboard_pattern:
+                    engine.add_detection('checkboard_pattern', True, "Diffusion artifacts in video frames")
+            
+            elif name == 'temporal':
+                if result.temporal_flicker:
+                    engine.add_detection('temporal_flicker', True, "Diffusion flicker detected")
+            
+            elif name == 'motion':
+                if result.motion_vector_irregular:
+                    engine.add_detection('motion_vector_irregular', True, "Irregular motion vectors")
+            
+            report_progress(progress, name, engine, result)
+            
+            if plan.uses_cascade:
+                settled = _cascade_skip(engine, nodes[index + 1:], VIDEO_DETECTIONS)
+                if settled is not None:
+                    skipped = budget_skipped + settled
+                    break
+        
+        # Calculate verdict
+        with timer.measure('scoring'):
+            verdict_data = engine.calculate_verdict()
+        
+        result = AnalysisResult(
+            verdict=verdict_data['verdict'],
+            confidence=verdict_data['confidence'],
+            total_score=verdict_data['total_score'],
+            scores=verdict_data['scores'],
+            evidence=verdict_data['evidence'],
+            frames_analyzed=opened[0].frames_sampled if opened else 0,
+            analysis_details={
+                name: results[name] for name in ('metadata', 'watermark') if name in results
+            },
+            skipped_analyzers=skipped,
+            estimated_ms=estimated_ms if plan.uses_budget else None
+        )
+        
+        result = result.to_dict(detail)
+        return timer.attach(result)
+    
+    except AnalysisError:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise AnalysisError(500, f"Video analysis failed: {str(e)}")
+    finally:
+        for sampler in opened:
+            sampler.close()
+        profiler.stop()
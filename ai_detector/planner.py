@@ -0,0 +1,216 @@
+"""
+Analiz planı - profil, analyzer seçimi ve gecikme bütçesi
+
+Plan API katmanında kurulur ve worker'a gönderilir (picklable). Bütçe
+verilmişse worker, görüntü boyutu / frame sayısıyla ölçeklenen tahmini
+maliyetlere göre en yüksek değerli analyzer'ları seçer. Maliyetler API
+process'inde ölçülen sürelerle (CostModel) kalibre edilir.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .config import (
+    ANALYSIS_PROFILES, DEFAULT_PROFILE, EXHAUSTIVE_PROFILES, IMAGE_ANALYZERS, VIDEO_ANALYZERS,
+    DEFAULT_ANALYZER_COSTS, COST_MODEL_ALPHA, VIDEO_FRAME_SAMPLE_RATE, MAX_FRAMES_TO_ANALYZE,
+    WORKING_RESOLUTION_MP
+)
+from .decision.thresholds import SCORE_WEIGHTS
+
+# Her analyzer düğümünün tetikleyebileceği tespitler (değer ve cascade skor sınırları için)
+IMAGE_DETECTIONS = {
+    'metadata': ('c2pa_synthetic', 'metadata_suspicious'),
+    'watermark': ('watermark_detected',),
+    'frequency': ('freq_ratio_anomaly', 'checkboard_pattern'),
+    'noise': ('noise_variance_low',),
+    'color': ('rgb_correlation_high',),
+    'geometry': ('edge_fragmented',)
+}
+VIDEO_DETECTIONS = {
+    'metadata': ('metadata_suspicious',),
+    'watermark': ('watermark_detected',),
+    'frequency': ('checkboard_pattern',),
+    'temporal': ('temporal_flicker',),
+    'motion': ('motion_vector_irregular',)
+}
+
+ANALYZERS = {'image': IMAGE_ANALYZERS, 'video': VIDEO_ANALYZERS}
+DETECTIONS = {'image': IMAGE_DETECTIONS, 'video': VIDEO_DETECTIONS}
+
+
+def cost_units(media: str, name: str, megapixels: float, frames_read: int = 0,
+               frames_sampled: int = 0) -> float:
+    """Maliyetin ölçeklendiği birim sayısı (bkz. config.DEFAULT_ANALYZER_COSTS)"""
+    if name == 'metadata':
+        return 1.0
+    if media == 'video':
+        if name == 'decode':
+            return frames_read * megapixels
+        if name in ('temporal', 'motion', 'motion_sparse'):
+            return frames_sampled * megapixels
+    if name == 'decode':
+        return megapixels
+    # Tek kare analyzer'ları working seviyesi / karolar üzerinde çalışır
+    return min(megapixels, WORKING_RESOLUTION_MP)
+
+
+def expected_video_frames(total_frames: int) -> Tuple[int, int]:
+    """Decode öncesi (okunacak, örneklenecek) frame tahmini"""
+    frames_read = min(total_frames, MAX_FRAMES_TO_ANALYZE * VIDEO_FRAME_SAMPLE_RATE)
+    return frames_read, math.ceil(frames_read / VIDEO_FRAME_SAMPLE_RATE)
+
+
+@dataclass
+class AnalysisPlan:
+    """Bir isteğin analiz planı"""
+    profile: str = DEFAULT_PROFILE
+    analyzers: Optional[Tuple[str, ...]] = None  # Verilirse profil yerine tam olarak bunlar
+    budget_ms: Optional[float] = None
+    cascade: bool = False
+    costs: Optional[Dict[str, Dict[str, float]]] = None  # CostModel anlık görüntüsü
+    motion_engine: Optional[str] = None  # Verilmezse profilinki
+    
+    @classmethod
+    def from_fast_mode(cls, fast_mode: bool, cascade: bool = False) -> "AnalysisPlan":
+        """Eski fast_mode bayrağının karşılığı"""
+        return cls(profile='quick' if fast_mode else DEFAULT_PROFILE, cascade=cascade)
+    
+    @property
+    def exhaustive(self) -> bool:
+        return self.profile in EXHAUSTIVE_PROFILES
+    
+    @property
+    def uses_cascade(self) -> bool:
+        return self.cascade and not self.exhaustive
+    
+    @property
+    def uses_budget(self) -> bool:
+        return self.budget_ms is not None and not self.exhaustive
+    
+    def candidates(self, media: str) -> Tuple[str, ...]:
+        """Bütçe öncesi çalışacak analyzer'lar (çalışma sırasıyla)"""
+        if self.analyzers is not None:
+            return tuple(name for name in ANALYZERS[media] if name in self.analyzers)
+        return ANALYSIS_PROFILES[self.profile][media]
+    
+    @property
+    def resolved_motion_engine(self) -> str:
+        return self.motion_engine or ANALYSIS_PROFILES[self.profile]['motion_engine']
+    
+    def cost_name(self, name: str) -> str:
+        """Maliyet modelindeki ad (motion, motora göre ayrı kalibre edilir)"""
+        if name == 'motion' and self.resolved_motion_engine == 'sparse':
+            return 'motion_sparse'
+        return name
+    
+    def cache_options(self) -> Dict:
+        """Sonucu etkileyen seçenekler (cache anahtarı için; costs hariç)"""
+        return {
+            'profile': self.profile,
+            'analyzers': list(self.analyzers) if self.analyzers is not None else None,
+            'budget_ms': self.budget_ms,
+            'cascade': self.cascade,
+            'motion_engine': self.resolved_motion_engine
+        }
+    
+    def estimate(self, media: str, name: str, megapixels: float, frames_read: int = 0,
+                 frames_sampled: int = 0) -> float:
+        """Tek aşamanın tahmini süresi (ms)"""
+        costs = self.costs or DEFAULT_ANALYZER_COSTS
+        per_unit = costs[media].get(name, DEFAULT_ANALYZER_COSTS[media].get(name, 0.0))
+        return per_unit * cost_units(media, name, megapixels, frames_read, frames_sampled)
+    
+    def select(self, media: str, megapixels: float, frames_read: int = 0,
+               frames_sampled: int = 0) -> Tuple[Tuple[str, ...], List[str], float]:
+        """
+        Bütçeye sığan analyzer'ları seç
+        
+        Değer/maliyet oranı en yüksek olandan başlayarak sığanlar alınır; değer,
+        analyzer'ın tetikleyebileceği tespitlerin SCORE_WEIGHTS toplamıdır.
+        Döner: (çalışacaklar - çalışma sırasıyla, bütçe yüzünden atlananlar, tahmini ms)
+        """
+        candidates = self.candidates(media)
+        units = (megapixels, frames_read, frames_sampled)
+        estimates = {name: self.estimate(media, self.cost_name(name), *units) for name in candidates}
+        decode_ms = self.estimate(media, 'decode', *units)
+        
+        if not self.uses_budget:
+            return candidates, [], round(decode_ms + sum(estimates.values()), 1)
+        
+        def value(name):
+            return sum(SCORE_WEIGHTS.get(d, 0) for d in DETECTIONS[media].get(name, ()))
+        
+        remaining = self.budget_ms - decode_ms
+        chosen = set()
+        for name in sorted(candidates, key=lambda n: value(n) / max(estimates[n], 1e-3),
+                           reverse=True):
+            if estimates[name] <= remaining:
+                chosen.add(name)
+                remaining -= estimates[name]
+        
+        selected = tuple(name for name in candidates if name in chosen)
+        skipped = [name for name in candidates if name not in chosen]
+        estimated = decode_ms + sum(estimates[name] for name in selected)
+        return selected, skipped, round(estimated, 1)
+
+
+class CostModel:
+    """
+    Analyzer başına birim maliyet (ms) - worker'ın ölçtüğü sürelerle EWMA kalibrasyonu
+    
+    API process'inde yaşar; anlık görüntüsü her planla worker'a gönderilir.
+    """
+    
+    def __init__(self, defaults: Dict[str, Dict[str, float]] = DEFAULT_ANALYZER_COSTS,
+                 alpha: float = COST_MODEL_ALPHA):
+        self.alpha = alpha
+        self._costs = {media: dict(costs) for media, costs in defaults.items()}
+        self._samples = {media: dict.fromkeys(costs, 0) for media, costs in defaults.items()}
+        self._lock = threading.Lock()
+    
+    def observe(self, media: str, worker_metrics: Dict):
+        """StageTimer '_metrics' çıktısından birim maliyetleri güncelle"""
+        megapixels = worker_metrics.get('megapixels')
+        if not megapixels:
+            return
+        
+        timings = dict(worker_metrics.get('analyzers', {}))
+        if 'decode' in worker_metrics.get('stages', {}):
+            # Segmentli videoda aşama wall payıdır; birim maliyet process'lerin toplamından
+            timings['decode'] = worker_metrics.get('decode_work_seconds',
+                                                   worker_metrics['stages']['decode'])
+        
+        with self._lock:
+            for name, seconds in timings.items():
+                if name not in self._costs[media]:
+                    continue
+                units = cost_units(media, name, megapixels,
+                                   worker_metrics.get('frames_decoded', 0),
+                                   worker_metrics.get('frames_sampled', 0))
+                if units <= 0:
+                    continue
+                per_unit = seconds * 1000 / units
+                if self._samples[media][name] == 0:
+                    self._costs[media][name] = per_unit
+                else:
+                    self._costs[media][name] += self.alpha * (per_unit - self._costs[media][name])
+                self._samples[media][name] += 1
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {media: dict(costs) for media, costs in self._costs.items()}
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                media: {
+                    name: {'ms_per_unit': round(cost, 3), 'samples': self._samples[media][name]}
+                    for name, cost in costs.items()
+                }
+                for media, costs in self._costs.items()
+            }
+
+
+cost_model = CostModel()
@@ -0,0 +1,117 @@
+"""
+Tipli analiz sonuçları
+
+Analyzer bayrakları native bool/float; alt test detayları numpy skaler
+içerebilir, bunları utils.serializer doğrudan kodlar.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional
+
+
+class _ResultMixin:
+    """Sığ to_dict: None alanlar atlanır (özyinelemeli tip dönüşümü yok)"""
+    
+    def to_dict(self) -> Dict:
+        data = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is not None:
+                data[f.name] = value
+        return data
+
+
+@dataclass
+class MetadataResult(_ResultMixin):
+    metadata_suspicious: bool
+    c2pa_synthetic: Optional[bool] = None  # Sadece görüntülerde
+    indicators: List[str] = field(default_factory=list)
+    details: Optional[Dict] = None
+
+
+@dataclass
+class WatermarkResult(_ResultMixin):
+    watermark_detected: bool
+    confidence: float
+    detections: List[str]
+    details: Dict
+
+
+@dataclass
+class FrequencyResult(_ResultMixin):
+    freq_ratio_anomaly: bool
+    checkerboard_pattern: bool
+    gan_grid_artifacts: bool
+    details: Dict
+
+
+@dataclass
+class NoiseResult(_ResultMixin):
+    noise_variance_low: bool
+    details: Dict
+
+
+@dataclass
+class ColorResult(_ResultMixin):
+    rgb_correlation_high: bool
+    details: Dict
+
+
+@dataclass
+class GeometryResult(_ResultMixin):
+    edge_fragmented: bool
+    details: Dict
+
+
+@dataclass
+class TemporalResult(_ResultMixin):
+    temporal_flicker: bool
+    temporal_noise_anomaly: bool
+    details: Dict
+
+
+@dataclass
+class MotionResult(_ResultMixin):
+    motion_vector_irregular: bool
+    details: Dict
+
+
+# Yanıt detay seviyeleri
+DETAIL_FULL = 'full'
+DETAIL_SUMMARY = 'summary'  # analysis_details hiç üretilmez
+DETAIL_LEVELS = (DETAIL_FULL, DETAIL_SUMMARY)
+
+
+@dataclass
+class AnalysisResult(_ResultMixin):
+    """Pipeline çıktısı"""
+    
+    verdict: str
+    confidence: float
+    total_score: int
+    scores: Dict[str, int]
+    evidence: List[str]
+    frames_analyzed: Optional[int] = None
+    analysis_details: Dict[str, _ResultMixin] = field(default_factory=dict)
+    skipped_analyzers: Optional[List[str]] = None  # Sadece cascade / bütçe modunda
+    estimated_ms: Optional[float] = None  # Sadece budget_ms verildiğinde
+    
+    def to_dict(self, detail: str = DETAIL_FULL) -> Dict:
+        data = {
+            'verdict': self.verdict,
+            'confidence': self.confidence,
+            'total_score': self.total_score,
+            'scores': self.scores,
+            'evidence': self.evidence
+        }
+        if self.frames_analyzed is not None:
+            data['frames_analyzed'] = self.frames_analyzed
+        if self.skipped_analyzers is not None:
+            data['skipped_analyzers'] = self.skipped_analyzers
+        if self.estimated_ms is not None:
+            data['estimated_ms'] = self.estimated_ms
+        if detail != DETAIL_SUMMARY:
+            data['analysis_details'] = {
+                name: result.to_dict() for name, result in self.analysis_details.items()
+            }
+        return data
@@ -0,0 +1,96 @@
+"""
+Analyzer bağımlılık grafiği (DAG) zamanlayıcısı
+
+Bağımlılıkları hazır olan düğümler paylaşılan thread havuzunda eşzamanlı
+çalışır (OpenCV/NumPy çekirdekleri GIL'i bırakır). Sonuçlar ise düğüm
+listesindeki sırayla teslim edilir; böylece skorlama, kanıt sırası ve
+ilerleme olayları paralellikten bağımsız olarak deterministik kalır.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import ANALYZER_THREADS
+
+
+@dataclass
+class Node:
+    """Grafik düğümü - func bağımlılıkların değerleriyle (deps sırasıyla) çağrılır"""
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Process başına tek havuz - eşzamanlı istekler thread sayısını paylaşır"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=ANALYZER_THREADS,
+                                       thread_name_prefix='analyzer')
+        return _pool
+
+
+def _validate(nodes: List[Node]):
+    """Bilinmeyen bağımlılık veya ileri referans (döngü) varsa ValueError"""
+    seen = set()
+    for node in nodes:
+        for dep in node.deps:
+            if dep not in seen:
+                raise ValueError(f"Node '{node.name}' depends on '{dep}' which is not declared before it")
+        if node.name in seen:
+            raise ValueError(f"Duplicate node '{node.name}'")
+        seen.add(node.name)
+
+
+def run_graph(nodes: List[Node], parallel: bool = True) -> Iterator[Tuple[str, Any]]:
+    """
+    Düğümleri çalıştır, (isim, değer) çiftlerini liste sırasıyla üret
+    
+    Liste topolojik sırada olmalı. parallel=False (veya ANALYZER_THREADS=1)
+    ise düğümler çağıran thread'de sırayla çalışır. İlk hata bekleyen
+    düğümleri iptal eder ve çağırana aynen yükseltilir.
+    """
+    _validate(nodes)
+    
+    if not parallel or ANALYZER_THREADS <= 1:
+        values: Dict[str, Any] = {}
+        for node in nodes:
+            values[node.name] = node.func(*(values[dep] for dep in node.deps))
+            yield node.name, values[node.name]
+        return
+    
+    pool = _get_pool()
+    values = {}
+    waiting = list(nodes)
+    running = {}
+    next_index = 0
+    
+    try:
+        while next_index < len(nodes):
+            # Bağımlılıkları tamamlanan düğümleri başlat
+            for node in [n for n in waiting if all(dep in values for dep in n.deps)]:
+                waiting.remove(node)
+                args = [values[dep] for dep in node.deps]
+                running[pool.submit(node.func, *args)] = node
+            
+            # Sıradaki düğümler hazırsa teslim et
+            while next_index < len(nodes) and nodes[next_index].name in values:
+                name = nodes[next_index].name
+                next_index += 1
+                yield name, values[name]
+            
+            if next_index < len(nodes):
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    values[node.name] = future.result()
+    finally:
+        for future in running:
+            future.cancel()
@@ -0,0 +1,52 @@
+"""
+Blok istatistikleri - summed-area table (integral image)
+
+cv2.integral2 ile toplam ve kare toplam tabloları bir kez çıkarılır; her
+blok boyutu / adım için ortalama ve varyans haritası dört köşe okumasıyla
+O(piksel) sürede elde edilir. Aynı tablolar tüm blok boyutlarında paylaşılır.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class BlockStats:
+    """Tek kanallı görüntü için blok ortalama/varyans haritaları"""
+    
+    def __init__(self, image: np.ndarray):
+        self.shape = image.shape[:2]
+        # float64 tablolar uint8 görüntülerde ~9e15'e kadar tam sayı kesinliğinde
+        self.sum, self.sqsum = cv2.integral2(image, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    
+    def _box_sums(self, table: np.ndarray, size: int, stride: int) -> np.ndarray:
+        """Sol üst köşesi (i*stride, j*stride) olan size x size tam blokların toplamları
+        
+        Görüntüye sığmayan son kısmi bloklar dahil edilmez.
+        """
+        h, w = self.shape
+        if size > h or size > w:
+            return np.zeros((0, 0))
+        bottom, right = slice(size, h + 1, stride), slice(size, w + 1, stride)
+        top, left = slice(0, h - size + 1, stride), slice(0, w - size + 1, stride)
+        return table[bottom, right] - table[top, right] - table[bottom, left] + table[top, left]
+    
+    def region_sums(self, y0: int, y1: int, x0: int, x1: int) -> Tuple[float, float]:
+        """[y0, y1) x [x0, x1) bölgesinin toplamı ve kare toplamı (O(1))"""
+        def box(table):
+            return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+        return float(box(self.sum)), float(box(self.sqsum))
+    
+    def mean(self, size: int, stride: Optional[int] = None) -> np.ndarray:
+        """Blok ortalamaları (stride verilmezse örtüşmeyen bloklar)"""
+        return self._box_sums(self.sum, size, stride or size) / (size * size)
+    
+    def moments(self, size: int, stride: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Blok ortalama ve (popülasyon) varyans haritaları"""
+        stride = stride or size
+        area = size * size
+        mean = self._box_sums(self.sum, size, stride) / area
+        variance = self._box_sums(self.sqsum, size, stride) / area - mean ** 2
+        # Sayısal hata ile oluşabilecek küçük negatifleri sıfırla
+        return mean, np.maximum(variance, 0)
@@ -0,0 +1,94 @@
+"""
+Seyrek hareket motoru - piramidal Lucas-Kanade özellik takibi
+
+Tam kare Farneback yerine birkaç yüz köşe noktası (goodFeaturesToTrack)
+frame'den frame'e calcOpticalFlowPyrLK ile izlenir. Her noktanın kalıcı bir
+kimliği vardır; böylece ardışık çiftlerde aynı noktanın yer değiştirmesi
+karşılaştırılabilir. Noktaların izlenebilen oranı SPARSE_SCENE_CHANGE_RATIO
+altına düşerse sahne değişmiş sayılır ve tüm noktalar yeniden tespit
+edilir; kayıplar yarıyı geçerse eksik noktalar mevcutlardan uzakta tamamlanır.
+Bir nokta ileri-geri takipte başlangıcına _FB_MAX_ERROR pikselden uzak
+dönerse kaybedilmiş sayılır (sahne kesmelerinde LK yine de "bulundu" der).
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config import SPARSE_MAX_FEATURES, SPARSE_SCENE_CHANGE_RATIO
+
+_QUALITY_LEVEL = 0.01
+_MIN_DISTANCE = 8  # piksel
+_FB_MAX_ERROR = 2.0  # piksel - ileri-geri takip tutarlılığı
+_LK_PARAMS = dict(
+    winSize=(21, 21), maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+)
+
+
+class FeatureTracker:
+    """Gri ton frame akışında özellik noktası takibi"""
+    
+    def __init__(self, max_features: int = SPARSE_MAX_FEATURES):
+        self.max_features = max_features
+        self.redetections = 0  # Sahne değişimi sayısı
+        self._prev_gray: Optional[np.ndarray] = None
+        self._points = np.empty((0, 1, 2), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+    
+    def _detect(self, gray: np.ndarray, count: int, mask: Optional[np.ndarray] = None):
+        """En fazla count yeni nokta tespit edip yeni kimliklerle ekle"""
+        if count <= 0:
+            return
+        points = cv2.goodFeaturesToTrack(gray, count, _QUALITY_LEVEL, _MIN_DISTANCE, mask=mask)
+        if points is None:
+            return
+        ids = np.arange(self._next_id, self._next_id + len(points))
+        self._next_id += len(points)
+        self._points = np.concatenate([self._points, points.astype(np.float32)])
+        self._ids = np.concatenate([self._ids, ids])
+    
+    def _replenish(self, gray: np.ndarray):
+        """Eksik noktaları mevcut noktaların çevresi dışında tamamla"""
+        mask = np.full(gray.shape, 255, dtype=np.uint8)
+        for x, y in self._points.reshape(-1, 2):
+            cv2.circle(mask, (int(x), int(y)), _MIN_DISTANCE, 0, -1)
+        self._detect(gray, self.max_features - len(self._ids), mask)
+    
+    def update(self, gray: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Sıradaki frame'e ilerle
+        
+        Döner: önceki frame'den izlenen noktaların (kimlikleri, yer değiştirme
+        genlikleri); ilk frame'de None.
+        """
+        prev_gray, self._prev_gray = self._prev_gray, gray
+        if prev_gray is None:
+            self._detect(gray, self.max_features)
+            return None
+        
+        before = len(self._ids)
+        ids = self._ids
+        magnitudes = np.empty(0, dtype=np.float32)
+        if before:
+            points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, self._points, None,
+                                                         **_LK_PARAMS)
+            back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev_gray, points, None,
+                                                            **_LK_PARAMS)
+            error = np.linalg.norm((back - self._points).reshape(-1, 2), axis=1)
+            good = (status.ravel() == 1) & (back_status.ravel() == 1) & (error < _FB_MAX_ERROR)
+            ids = self._ids[good]
+            magnitudes = np.linalg.norm((points[good] - self._points[good]).reshape(-1, 2), axis=1)
+            self._points, self._ids = points[good], ids
+        
+        if len(ids) < SPARSE_SCENE_CHANGE_RATIO * before:
+            # Sahne değişimi - eski noktaları bırak, baştan tespit et
+            self.redetections += 1
+            self._points, self._ids = self._points[:0], self._ids[:0]
+            self._detect(gray, self.max_features)
+        elif len(self._ids) < self.max_features // 2:
+            self._replenish(gray)
+        
+        return ids, magnitudes
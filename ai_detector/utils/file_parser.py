@@ -1,15 +1,26 @@
 """Dosya parsing ve metadata okuma"""
 
+import io
 import struct
-from typing import Dict, Optional
+from typing import BinaryIO, Dict, Optional, Union
 from pathlib import Path
 
+# Dosya yolu veya bellekteki içerik (upload buffer)
+Source = Union[str, bytes, bytearray, memoryview]
 
-def read_png_chunks(file_path: str) -> Dict[str, bytes]:
+
+def open_source(source: Source) -> BinaryIO:
+    """Dosya yolu ya da bellekteki buffer için okunabilir akış aç"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return open(source, 'rb')
+
+
+def read_png_chunks(source: Source) -> Dict[str, bytes]:
     """PNG chunk'larını oku"""
     chunks = {}
     
-    with open(file_path, 'rb') as f:
+    with open_source(source) as f:
         # PNG signature kontrolü
         signature = f.read(8)
         if signature != b'\x89PNG\r\n\x1a\n':
@@ -75,11 +86,11 @@ def extract_png_text_chunks(chunks: Dict[str, bytes]) -> Dict[str, str]:
     return text_data
 
 
-def read_jpeg_segments(file_path: str) -> Dict[str, bytes]:
+def read_jpeg_segments(source: Source) -> Dict[str, bytes]:
     """JPEG APP segment'lerini oku"""
     segments = {}
     
-    with open(file_path, 'rb') as f:
+    with open_source(source) as f:
         # JPEG signature
         if f.read(2) != b'\xff\xd8':
             return segments
@@ -119,11 +130,11 @@ def read_jpeg_segments(file_path: str) -> Dict[str, bytes]:
     return segments
 
 
-def parse_mp4_atoms(file_path: str, max_read: int = 10 * 1024 * 1024) -> Dict[str, bytes]:
+def parse_mp4_atoms(source: Source, max_read: int = 10 * 1024 * 1024) -> Dict[str, bytes]:
     """MP4 atom'larını parse et (basitleştirilmiş)"""
     atoms = {}
     
-    with open(file_path, 'rb') as f:
+    with open_source(source) as f:
         data = f.read(max_read)
     
     # Basit atom arama
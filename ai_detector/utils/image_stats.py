@@ -0,0 +1,85 @@
+"""
+Birleşik görüntü istatistikleri - tek geçişte kanal kovaryansı ve histogramlar
+
+RGB görüntü satır blokları halinde bir kez taranır: 3x3 kanal kovaryansı
+(toplam ve çapraz çarpımlardan), kanal histogramları, satürasyon histogramı
+ve gri ton histogramı. Kopyalar blok boyutuyla sınırlıdır; renk, gürültü
+(chi-square) testleri metriklerini buradan türetir.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+_CHUNK_PIXELS = 1 << 18  # Blok başına ~6MB float64 ara bellek
+
+
+def _histogram(image: np.ndarray, channel: int = 0) -> np.ndarray:
+    return cv2.calcHist([image], [channel], None, [256], [0, 256]).ravel().astype(np.int64)
+
+
+def gray_histogram(gray: np.ndarray) -> np.ndarray:
+    """uint8 gri ton histogramı (256,)"""
+    return _histogram(gray)
+
+
+def _hist_mean_std(hist: np.ndarray) -> Tuple[float, float]:
+    """Histogramdan ortalama ve (popülasyon) standart sapma"""
+    levels = np.arange(hist.size, dtype=np.float64)
+    total = hist.sum()
+    mean = np.dot(hist, levels) / total
+    variance = np.dot(hist, levels ** 2) / total - mean ** 2
+    return float(mean), float(np.sqrt(max(variance, 0.0)))
+
+
+@dataclass
+class ImageStats:
+    """Tek RGB görüntünün özet istatistikleri"""
+    pixels: int
+    channel_mean: np.ndarray      # (3,)
+    channel_cov: np.ndarray       # (3, 3) popülasyon kovaryansı
+    channel_hist: np.ndarray      # (3, 256)
+    saturation_hist: np.ndarray   # (256,) - HSV S kanalı (OpenCV ölçeği)
+    gray_hist: np.ndarray         # (256,)
+    
+    def correlation(self) -> np.ndarray:
+        """3x3 Pearson korelasyon matrisi (np.corrcoef ile aynı)"""
+        std = np.sqrt(np.diag(self.channel_cov))
+        return self.channel_cov / np.outer(std, std)
+    
+    def saturation_mean_std(self) -> Tuple[float, float]:
+        return _hist_mean_std(self.saturation_hist)
+
+
+def compute_image_stats(image: np.ndarray, gray_hist: np.ndarray) -> ImageStats:
+    """RGB (uint8, HxWx3) görüntü ve gri ton histogramından ImageStats"""
+    h, w = image.shape[:2]
+    rows = max(1, _CHUNK_PIXELS // w)
+    
+    sums = np.zeros(3)
+    cross = np.zeros((3, 3))
+    saturation_hist = np.zeros(256, dtype=np.int64)
+    
+    for y in range(0, h, rows):
+        chunk = image[y:y + rows]
+        # float64'te tam sayı çarpım toplamları kesin kalır
+        values = chunk.reshape(-1, 3).astype(np.float64)
+        sums += values.sum(axis=0)
+        cross += values.T @ values
+        
+        saturation_hist += _histogram(cv2.cvtColor(chunk, cv2.COLOR_RGB2HSV), 1)
+    
+    pixels = h * w
+    mean = sums / pixels
+    cov = cross / pixels - np.outer(mean, mean)
+    
+    return ImageStats(
+        pixels=pixels,
+        channel_mean=mean,
+        channel_cov=cov,
+        channel_hist=np.stack([_histogram(image, c) for c in range(3)]),
+        saturation_hist=saturation_hist,
+        gray_hist=gray_hist
+    )
@@ -3,6 +3,7 @@
 import numpy as np
 import cv2
 from typing import Tuple
+from .spectral import power_spectrum, magnitude, autocorrelation
 
 
 def load_image(file_path: str) -> np.ndarray:
@@ -13,6 +14,15 @@ def load_image(file_path: str) -> np.ndarray:
     return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
 
+def decode_image(data: bytes) -> np.ndarray:
+    """Bellekteki encoded görüntüyü decode et (RGB format)"""
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    img = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Görüntü decode edilemedi")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
 def to_grayscale(image: np.ndarray) -> np.ndarray:
     """RGB'yi grayscale'e çevir"""
     if len(image.shape) == 3:
@@ -42,12 +52,9 @@ def compute_dct(image: np.ndarray) -> np.ndarray:
 
 
 def compute_fft(image: np.ndarray) -> np.ndarray:
-    """2D FFT hesapla"""
+    """Merkezlenmiş 2D FFT genliği (float32 rfft2, optimal boyuta doldurulmuş)"""
     gray = to_grayscale(image)
-    fft = np.fft.fft2(gray)
-    fft_shift = np.fft.fftshift(fft)
-    magnitude = np.abs(fft_shift)
-    return magnitude
+    return magnitude(power_spectrum(gray, pad=True))
 
 
 def detect_edges(image: np.ndarray, low_threshold: int = 50, 
@@ -78,13 +85,5 @@ def compute_autocorrelation_2d(image: np.ndarray) -> np.ndarray:
     """2D autocorrelation hesapla"""
     gray = to_grayscale(image)
     
-    # FFT ile autocorrelation
-    fft = np.fft.fft2(gray)
-    power_spectrum = np.abs(fft) ** 2
-    autocorr = np.fft.ifft2(power_spectrum)
-    autocorr = np.fft.fftshift(np.real(autocorr))
-    
-    # Normalize
-    autocorr = autocorr / autocorr.max()
-    
-    return autocorr
+    # Güç spektrumu üzerinden (Wiener-Khinchin), normalize ve merkezlenmiş
+    return autocorrelation(power_spectrum(gray))
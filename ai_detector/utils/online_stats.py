@@ -0,0 +1,51 @@
+"""Akış (online) istatistikleri - sabit bellekli sayaçlar ve halka tampon"""
+
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    """Welford ortalama/varyans (popülasyon, np.var ile aynı tanım)"""
+    
+    __slots__ = ('count', 'mean', '_m2')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+    
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class RingBuffer:
+    """Önceden ayrılmış sabit kapasiteli float tamponu - dolunca en eskinin üzerine yazar"""
+    
+    def __init__(self, capacity: int):
+        self._data = np.empty(capacity, dtype=np.float64)
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return min(self._count, self._data.size)
+    
+    def append(self, value: float):
+        self._data[self._count % self._data.size] = value
+        self._count += 1
+    
+    def values(self) -> np.ndarray:
+        """Eskiden yeniye sıralı kopya"""
+        if self._count <= self._data.size:
+            return self._data[:self._count].copy()
+        return np.roll(self._data, -(self._count % self._data.size))
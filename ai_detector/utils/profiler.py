@@ -0,0 +1,167 @@
+"""Analyzer profili - aşama ve alt test bazında wall/CPU süresi ve tepe bellek"""
+
+import copy
+import functools
+import inspect
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+# Alt test sayılmayan public metodlar
+_NON_SUBTEST_METHODS = {'analyze', 'stream', 'update', 'measure', 'add', 'result'}
+
+# tracemalloc process genelidir: eşzamanlı profiller izlemeyi birlikte kullanır,
+# son çıkan kapatır (yalnızca izlemeyi kendimiz başlattıysak)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class NullProfiler:
+    """Kapalı profiler - hiçbir şey ölçmez, analyzer'ları sarmalamaz"""
+    
+    enabled = False
+    
+    def measure(self, name: str):
+        return nullcontext()
+    
+    def instrument(self, analyzer):
+        return analyzer
+    
+    def set_info(self, key: str, value):
+        pass
+    
+    def stop(self):
+        pass
+    
+    def to_dict(self) -> Optional[Dict]:
+        return None
+
+
+class _Frame:
+    """Açık ölçüm - iç içe ölçümlerde tepe bellek üst frame'e taşınır"""
+    
+    __slots__ = ('entry', 'wall_start', 'cpu_start', 'mem_base', 'mem_peak')
+    
+    def __init__(self, entry: Dict, mem_base: int):
+        self.entry = entry
+        self.mem_base = mem_base
+        self.mem_peak = mem_base
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+
+class Profiler:
+    """
+    Aşama (decode, analyzer sınıfı, scoring) ve alt test (analyzer metodu) profili
+    
+    CPU süresi process_time ile ölçülür (OpenCV/numpy iç thread'leri dahil);
+    tepe bellek tracemalloc ile Python ve numpy tahsislerini kapsar. Her ikisi de
+    process geneli olduğundan yalnızca process havuzunda kesindir; thread
+    havuzunda eşzamanlı isteklerin tahsisleri de sayılır ve izleme açıkken
+    aynı process'teki diğer istekler de yavaşlar. İzleme referans sayımıyla
+    paylaşılır, bir profilin bitmesi diğerinin ölçümünü kesmez.
+    Profilli isteklerde analyzer'lar sırayla çalışır (ölçüm yığını tek thread'lidir).
+    """
+    
+    enabled = True
+    
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self.info: Dict = {}
+        self._stack: List[_Frame] = []
+        _acquire_tracing()
+        self._total_start = time.perf_counter()
+        self._total_ms: Optional[float] = None
+    
+    @contextmanager
+    def measure(self, name: str):
+        """Ölçüm aç; üstte açık aşama varsa alt test olarak kaydedilir"""
+        if self._stack:
+            parent = self._stack[-1]
+            parent.mem_peak = max(parent.mem_peak, tracemalloc.get_traced_memory()[1])
+            siblings = parent.entry.setdefault('subtests', {})
+        else:
+            siblings = self.stages
+        
+        tracemalloc.reset_peak()
+        entry = siblings.setdefault(name, {'wall_ms': 0.0, 'cpu_ms': 0.0, 'peak_kb': 0.0, 'calls': 0})
+        frame = _Frame(entry, tracemalloc.get_traced_memory()[0])
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.wall_start
+            cpu = time.process_time() - frame.cpu_start
+            peak = max(frame.mem_peak, tracemalloc.get_traced_memory()[1])
+            self._stack.pop()
+            
+            entry['wall_ms'] = round(entry['wall_ms'] + wall * 1000, 3)
+            entry['cpu_ms'] = round(entry['cpu_ms'] + cpu * 1000, 3)
+            entry['peak_kb'] = round(max(entry['peak_kb'], (peak - frame.mem_base) / 1024), 1)
+            entry['calls'] += 1
+            
+            if self._stack:
+                self._stack[-1].mem_peak = max(self._stack[-1].mem_peak, peak)
+    
+    def instrument(self, analyzer):
+        """Alt test metodları ölçümle sarılmış kopya döndür (paylaşılan instance değişmez)"""
+        analyzer = copy.copy(analyzer)
+        for name, method in inspect.getmembers(analyzer, inspect.ismethod):
+            if name.startswith('_') or name in _NON_SUBTEST_METHODS:
+                continue
+            setattr(analyzer, name, self._wrap(name, method))
+        return analyzer
+    
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.measure(name):
+                return method(*args, **kwargs)
+        return wrapper
+    
+    def set_info(self, key: str, value):
+        """Ek bilgi (ör. görüntü boyutları)"""
+        self.info[key] = value
+    
+    def stop(self):
+        """Toplam süreyi sabitle, tracemalloc kullanımını bırak"""
+        if self._total_ms is None:
+            self._total_ms = round((time.perf_counter() - self._total_start) * 1000, 3)
+            _release_tracing()
+    
+    def to_dict(self) -> Dict:
+        self.stop()
+        return {
+            'total_wall_ms': self._total_ms,
+            **self.info,
+            'stages': self.stages
+        }
+
+
+def make_profiler(enabled: bool):
+    """timings=true ise Profiler, değilse paylaşılan NullProfiler"""
+    return Profiler() if enabled else NULL_PROFILER
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,61 @@
+"""Hızlı JSON kodlayıcı - numpy skalerleri ve tipli sonuçları doğrudan kodlar"""
+
+import json
+import math
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson  # Opsiyonel: varsa ~5-10x daha hızlı
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any):
+    """json/orjson'un tanımadığı tipler"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/inf değerleri None yap (orjson ile aynı çıktı için json yedeğinde)"""
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if math.isfinite(obj) else None
+    if isinstance(obj, (np.generic, np.ndarray)) or hasattr(obj, 'to_dict'):
+        return _finite(_default(obj))
+    return obj
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Tek geçişte UTF-8 JSON
+    
+    NaN/inf her iki backend'de null yazılır (geçersiz JSON üretilmez): orjson
+    bunu kendisi yapar, json yedeği ise yalnızca gerektiğinde ikinci geçişte.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, allow_nan=False,
+                          separators=(',', ':'))
+    except ValueError:
+        text = json.dumps(_finite(obj), default=_default, ensure_ascii=False, allow_nan=False,
+                          separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
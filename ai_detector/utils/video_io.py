@@ -0,0 +1,172 @@
+"""
+Video frame örnekleyici ve akış dağıtıcısı
+
+Örneklenmeyen frame'ler cap.grab() ile geçilir: demux/decode yapılır ama
+retrieve() (renk dönüşümü ve kopya) atlanır. Adım VIDEO_SEEK_MIN_STEP'e
+ulaşırsa frame'ler arasında seek edilir; decoder yalnızca en yakın
+keyframe'den hedefe kadar çözer. gray=True ise örnekler doğrudan gri tona
+çevrilir (RGB ara kopyası yok); ilk örnek her zaman RGB de saklanır.
+
+Örnekler listede biriktirilmez: feed_frames her frame'i akış tüketicilerine
+verir, bellekte tüketici başına en fazla VIDEO_STREAM_WINDOW frame bulunur.
+"""
+
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from ..config import VIDEO_SEEK_MIN_STEP, VIDEO_STREAM_WINDOW, PROGRESS_FRAME_INTERVAL
+
+ProgressCallback = Callable[[int, int, int], None]  # (örneklenen, okunan, toplam)
+FrameConsumer = Callable[[np.ndarray], None]
+
+
+class FrameSampler:
+    """
+    Her step'inci frame'i (0, step, 2*step, ...) en fazla max_frames adet üretir
+    
+    start verilirse örnekleme start'ıncı örnekten (start*step. frame) başlar;
+    segmentli çözümlemede her segment kendi capture'ı ile başına seek eder.
+    İlk örnek açılışta okunur (first_frame, RGB) - tek kare testleri kalan
+    frame'leri beklemeden başlayabilir. İterasyon ilk örnekten başlar ve
+    yalnızca bir kez yapılabilir; iş bitince close() çağrılmalıdır.
+    """
+    
+    def __init__(self, file_path: str, step: int, max_frames: int, gray: bool = False,
+                 on_progress: Optional[ProgressCallback] = None, start: int = 0):
+        self.step = step
+        self.max_frames = max_frames
+        self.gray = gray
+        self.on_progress = on_progress
+        self.start = start
+        self.frames_read = start * step  # Dosyadaki konum (okunan son frame'in sonrası)
+        self.frames_sampled = 0   # Açılışta okunan ilk örnek dahil
+        
+        self._cap = cv2.VideoCapture(file_path)
+        # close() başka thread'den (ör. hata sonrası) gelebilir; okuma ile serileştirilir
+        self._lock = threading.Lock()
+        self._closed = False
+        # Container'ın bildirdiği frame sayısı (bilinmiyorsa <= 0)
+        self.total_frames = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # Seek, frame sayısı biliniyorsa ve adım tipik keyframe aralığına yaklaşıyorsa
+        self.seek = step >= VIDEO_SEEK_MIN_STEP and self.total_frames > 0
+        if start and not self.seek:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, self.frames_read)
+        
+        self._source = self._read_seek() if self.seek else self._read_grab()
+        self._first_bgr = next(self._source, None)
+        self.first_frame = None
+        if self._first_bgr is not None:
+            self.first_frame = cv2.cvtColor(self._first_bgr, cv2.COLOR_BGR2RGB)
+            self.frames_sampled = 1
+    
+    def _read_grab(self) -> Iterator[np.ndarray]:
+        yielded = 0
+        while yielded < self.max_frames:
+            with self._lock:
+                if self._closed or not self._cap.grab():
+                    return
+                
+                frame = None
+                if self.frames_read % self.step == 0:
+                    ret, frame = self._cap.retrieve()
+                    if not ret:
+                        return
+                self.frames_read += 1
+            
+            if frame is not None:
+                yielded += 1
+                yield frame
+    
+    def _read_seek(self) -> Iterator[np.ndarray]:
+        stop = min(self.total_frames, self.step * (self.start + self.max_frames))
+        for position in range(self.start * self.step, stop, self.step):
+            with self._lock:
+                if self._closed:
+                    return
+                self._cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+                ret, frame = self._cap.read()
+            if not ret:
+                return
+            self.frames_read = position + 1
+            yield frame
+    
+    def _sampled(self):
+        self.frames_sampled += 1
+        if self.on_progress is not None and self.frames_sampled % PROGRESS_FRAME_INTERVAL == 0:
+            self.on_progress(self.frames_sampled, self.frames_read, self.total_frames)
+    
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self._first_bgr is None:
+            return
+        first, self._first_bgr = self._first_bgr, None
+        yield cv2.cvtColor(first, cv2.COLOR_BGR2GRAY) if self.gray else self.first_frame
+        
+        code = cv2.COLOR_BGR2GRAY if self.gray else cv2.COLOR_BGR2RGB
+        for frame in self._source:
+            self._sampled()
+            yield cv2.cvtColor(frame, code)
+    
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._first_bgr = None
+            self._cap.release()
+
+
+_DONE = object()
+
+
+def feed_frames(frames: Iterable[np.ndarray], consumers: List[FrameConsumer],
+                parallel: bool = True):
+    """
+    Her frame'i sırayla tüm tüketicilere ver
+    
+    parallel ise her tüketici kendi thread'inde VIDEO_STREAM_WINDOW
+    uzunluğunda sınırlı bir kuyruktan okur: decode ile analiz örtüşür,
+    bellek sabit kalır. Tüketici hatası akışı durdurur ve yükseltilir.
+    """
+    if not parallel or not consumers:
+        for frame in frames:
+            for consume in consumers:
+                consume(frame)
+        return
+    
+    errors: List[BaseException] = []
+    
+    def worker(inbox: queue.Queue, consume: FrameConsumer):
+        while True:
+            frame = inbox.get()
+            if frame is _DONE:
+                return
+            if errors:
+                continue  # Üretici durana kadar kuyruğu boşalt
+            try:
+                consume(frame)
+            except BaseException as e:
+                errors.append(e)
+
+    inboxes = [queue.Queue(maxsize=VIDEO_STREAM_WINDOW) for _ in consumers]
+    threads = [threading.Thread(target=worker, args=(inbox, consume),
+                                name='video-stream', daemon=True)
+               for inbox, consume in zip(inboxes, consumers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for frame in frames:
+            if errors:
+                break
+            for inbox in inboxes:
+                inbox.put(frame)
+    finally:
+        for inbox in inboxes:
+            inbox.put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
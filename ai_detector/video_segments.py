@@ -0,0 +1,210 @@
+"""
+Segmentli video çözümleme - örnekler zaman segmentlerine bölünüp process'lerde ölçülür
+
+Örnek aralığı [0, N) VIDEO_SEGMENT_PROCESSES eşit segmente bölünür. Her
+segment kendi worker process'inde kendi capture'ı ile başına seek eder,
+frame'leri çözer ve akış analyzer'larının frame başına ölçümlerini
+(measure) üretir. Çift ölçümleri ve hareket farkı önceki iki örneğe
+dayandığından her segment _OVERLAP örnek önceden başlar; bu örneklerin
+ölçümleri atılır. Ana process ölçümleri segment (zaman) sırasıyla tek
+akışa ekler (add) - Welford sayaçları ve flicker serisi sıralı akışla aynı
+kalır. Seyrek motorda nokta takibi her segmentte yeniden başlar.
+
+Segment process'leri process başına tek, VIDEO_SEGMENT_PROCESSES ile sınırlı
+ve sıcak tutulan havuzda çalışır; VIDEO_SEGMENT_IDLE_TIMEOUT boyunca
+kullanılmazsa havuz kapatılır. Video yalnızca tahmini paralel kazanç,
+segmentleme maliyetini (soğuk havuzda process başlatma dahil) açıkça
+aştığında bölünür.
+"""
+
+import multiprocessing
+import multiprocessing.util
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+
+from .config import (
+    VIDEO_SEGMENT_PROCESSES, VIDEO_SEGMENT_MIN_SAMPLES, VIDEO_SEGMENT_IDLE_TIMEOUT,
+    VIDEO_SEGMENT_SPAWN_MS, VIDEO_SEGMENT_OVERHEAD_MS, VIDEO_SEGMENT_MIN_GAIN
+)
+from .analyzers.video_temporal import VideoTemporalAnalyzer
+from .analyzers.video_motion import VideoMotionAnalyzer
+from .context import VideoFrameContext
+from .utils.video_io import FrameSampler
+
+_OVERLAP = 2  # Segment başından önce ısınma için okunan örnek
+
+_ANALYZERS = {
+    'temporal': VideoTemporalAnalyzer(),
+    'motion': VideoMotionAnalyzer()
+}
+
+StreamOptions = Dict[str, Dict]  # Akış analyzer adı -> stream() seçenekleri
+
+
+@dataclass
+class SegmentResult:
+    """Bir segmentin frame başına ölçümleri ve süreleri"""
+    samples: Dict[str, List] = field(default_factory=dict)  # Analyzer adı -> ölçümler
+    frames_read: int = 0        # Dosyadaki konum (segment sonu)
+    frames_sampled: int = 0     # Isınma örnekleri hariç
+    decode_seconds: float = 0.0
+    seconds: Dict[str, float] = field(default_factory=dict)  # Analyzer adı -> ölçüm süresi
+
+
+def plan_segments(total_frames: int, step: int, max_frames: int, sample_ms: float,
+                  processes: int = VIDEO_SEGMENT_PROCESSES) -> List[Tuple[int, int]]:
+    """
+    Örnek aralıklarını [start, stop) segmentlerine böl
+    
+    sample_ms örnek başına tahmini iştir (step frame'in decode'u + akış
+    ölçümleri). Frame sayısı bilinmiyorsa, segment başına
+    VIDEO_SEGMENT_MIN_SAMPLES örnek düşmüyorsa ya da paralel kazanç
+    segmentleme maliyetinin VIDEO_SEGMENT_MIN_GAIN katından azsa boş liste
+    (sıralı çözümleme).
+    """
+    if total_frames <= 0:
+        return []
+    samples = min(max_frames, -(-total_frames // step))
+    count = min(processes, samples // VIDEO_SEGMENT_MIN_SAMPLES)
+    if count < 2:
+        return []
+    
+    # Segmentler paralel açılır: wall maliyeti tek açılış + ısınma örnekleri (+ soğuksa spawn)
+    gain = samples * sample_ms * (count - 1) / count
+    cost = VIDEO_SEGMENT_OVERHEAD_MS + _OVERLAP * sample_ms
+    if not pool_is_warm():
+        cost += VIDEO_SEGMENT_SPAWN_MS
+    if gain < VIDEO_SEGMENT_MIN_GAIN * cost:
+        return []
+    
+    bounds = [samples * i // count for i in range(count + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def measure_segment(file_path: str, step: int, start: int, stop: int, gray: bool,
+                    streams: StreamOptions) -> SegmentResult:
+    """[start, stop) örneklerini çöz ve akış ölçümlerini üret (worker'da çalışır)"""
+    first = max(0, start - _OVERLAP)
+    segment = SegmentResult(samples={name: [] for name in streams},
+                            seconds=dict.fromkeys(streams, 0.0))
+    active = {name: _ANALYZERS[name].stream(**options) for name, options in streams.items()}
+    
+    tick = time.perf_counter()
+    sampler = FrameSampler(file_path, step, stop - first, gray=gray, start=first)
+    segment.decode_seconds += time.perf_counter() - tick
+    try:
+        frames = iter(sampler)
+        for index in range(first, stop):
+            tick = time.perf_counter()
+            frame = next(frames, None)
+            segment.decode_seconds += time.perf_counter() - tick
+            if frame is None:
+                break
+            
+            # Akışlar aynı frame bağlamını paylaşır
+            frame = VideoFrameContext(frame)
+            for name, stream in active.items():
+                tick = time.perf_counter()
+                sample = stream.measure(frame)
+                segment.seconds[name] += time.perf_counter() - tick
+                if index >= start:
+                    segment.samples[name].append(sample)
+            if index >= start:
+                segment.frames_sampled += 1
+        segment.frames_read = sampler.frames_read
+    finally:
+        sampler.close()
+    return segment
+
+
+def _init_worker():
+    """Segment worker'ı: cv2 thread'leri process'lerle yarışmasın"""
+    cv2.setNumThreads(1)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_users = 0
+_idle_timer: Optional[threading.Timer] = None
+
+
+def pool_is_warm() -> bool:
+    """Bu process'te segment havuzu açık mı (process başlatma maliyeti ödendi mi)"""
+    return _pool is not None
+
+
+def _acquire_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_users
+    with _pool_lock:
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+        if _pool is None:
+            # spawn: analiz havuzu ile aynı; thread'li process'i fork etmekten kaçın
+            _pool = ProcessPoolExecutor(
+                max_workers=VIDEO_SEGMENT_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        _pool_users += 1
+        return _pool
+
+
+def _release_pool():
+    """Son kullanıcı bırakınca boşta kapanış sayacını başlat"""
+    global _pool_users, _idle_timer
+    with _pool_lock:
+        _pool_users -= 1
+        if _pool_users == 0 and _pool is not None:
+            _idle_timer = threading.Timer(VIDEO_SEGMENT_IDLE_TIMEOUT, _discard_pool,
+                                          kwargs={'idle_only': True})
+            _idle_timer.daemon = True
+            _idle_timer.start()
+
+
+def _discard_pool(wait: bool = False, idle_only: bool = False,
+                  broken: Optional[ProcessPoolExecutor] = None):
+    """Havuzu kapat - sonraki segmentli video yenisini açar"""
+    global _pool
+    with _pool_lock:
+        if idle_only and _pool_users:
+            return
+        if broken is not None and _pool is not broken:
+            return
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Process çıkışında çocuk process'ler beklenmeden (join) önce çalışır; boşta
+# bekleyen segment worker'ları kapatılmazsa analiz worker'ının çıkışı takılır.
+# Öncelik, havuz kuyruklarının kapanış finalizer'larından (10) yüksek olmalı.
+multiprocessing.util.Finalize(None, _discard_pool, kwargs={'wait': True}, exitpriority=100)
+
+
+def measure_segments(file_path: str, step: int, segments: List[Tuple[int, int]], gray: bool,
+                     streams: StreamOptions) -> Iterator[SegmentResult]:
+    """
+    Segmentleri paralel ölç, sonuçları segment sırasıyla üret
+    
+    Tüketici erken çıkarsa (hata) bekleyen segmentler iptal edilir.
+    """
+    pool = _acquire_pool()
+    futures = []
+    try:
+        futures = [pool.submit(measure_segment, file_path, step, start, stop, gray, streams)
+                   for start, stop in segments]
+        for future in futures:
+            yield future.result()
+    except BrokenProcessPool:
+        _discard_pool(broken=pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+        _release_pool()
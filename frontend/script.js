@@ -37,7 +37,7 @@ async function checkAPIStatus() {
         apiStatusElement.classList.add('offline');
         apiStatusElement.classList.remove('online');
         console.error('API Status Error:', error);
-        
+
         // Show warning banner
         showAPIWarning();
     }
@@ -47,7 +47,7 @@ async function checkAPIStatus() {
 function showAPIWarning() {
     const existingWarning = document.getElementById('apiWarning');
     if (existingWarning) return;
-    
+
     const warning = document.createElement('div');
     warning.id = 'apiWarning';
     warning.style.cssText = `
@@ -68,7 +68,7 @@ function showAPIWarning() {
         <span style="font-size: 0.9rem;">Lütfen terminalde <code style="background: rgba(0,0,0,0.2); padding: 0.2rem 0.5rem; border-radius: 0.25rem;">python run_server.py</code> komutunu çalıştırın</span>
     `;
     document.body.prepend(warning);
-    
+
     // Add animation
     const style = document.createElement('style');
     style.textContent = `
@@ -202,7 +202,9 @@ async function analyzeFiles() {
     try {
         if (selectedFiles.length === 1) {
             // Single file analysis
-            const result = await analyzeSingleFile(selectedFiles[0], fastMode);
+            const result = await analyzeSingleFile(selectedFiles[0], fastMode, event => {
+                btnLoader.textContent = formatProgress(event);
+            });
             displayResult(result);
         } else {
             // Batch analysis
@@ -224,17 +226,18 @@ async function analyzeFiles() {
         // Reset button state
         btnText.style.display = 'inline';
         btnLoader.style.display = 'none';
+        btnLoader.textContent = '⏳ Analyzing...';
         analyzeBtn.disabled = false;
     }
 }
 
-// Analyze Single File
-async function analyzeSingleFile(file, fastMode) {
+// Analyze Single File (Server-Sent Events ile ilerleme)
+async function analyzeSingleFile(file, fastMode, onProgress) {
     const formData = new FormData();
     formData.append('file', file);
     formData.append('fast_mode', fastMode);
 
-    const response = await fetch(`${API_BASE_URL}/api/v1/detect`, {
+    const response = await fetch(`${API_BASE_URL}/api/v1/detect/stream`, {
         method: 'POST',
         body: formData
     });
@@ -244,7 +247,51 @@ async function analyzeSingleFile(file, fastMode) {
         throw new Error(error.detail || 'Analysis failed');
     }
 
-    return await response.json();
+    // EventSource POST desteklemiyor - akışı elle parse et
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (!data) continue;
+
+            const payload = JSON.parse(data);
+            if (eventName === 'progress' && onProgress) {
+                onProgress(payload);
+            } else if (eventName === 'result') {
+                return payload;
+            } else if (eventName === 'error') {
+                throw new Error(payload.detail || 'Analysis failed');
+            }
+        }
+    }
+
+    throw new Error('Analysis stream ended unexpectedly');
+}
+
+// İlerleme olayını buton metnine çevir
+function formatProgress(event) {
+    if (event.stage === 'frames') {
+        const total = event.total_frames > 0 ? `/${event.total_frames}` : '';
+        return `⏳ Reading frames ${event.frames_read}${total}...`;
+    }
+    const score = event.partial ? ` (score: ${event.partial.total_score})` : '';
+    return `⏳ ${event.stage} done${score}...`;
 }
 
 // Analyze Batch Files